@@ -0,0 +1 @@
+"""PyDNGConverter benchmarks."""
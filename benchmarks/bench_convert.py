@@ -0,0 +1,186 @@
+"""Conversion throughput benchmark.
+
+Runs `DNGConverter.convert` against stub executables (see `stubs`)
+across a matrix of worker counts and batch sizes, without requiring
+Adobe DNG Converter, wine or exiftool to be installed.
+
+Usage:
+    python -m benchmarks.bench_convert --files 200 --workers 2 4 8 --batch-sizes 1 8 0
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import Dict, List, Optional, Sequence
+from pathlib import Path
+from dataclasses import field, dataclass
+
+from benchmarks import stubs
+from pydngconverter.timing import percentile
+
+
+@dataclass
+class BenchResult:
+    """Benchmark run result.
+
+    Attributes:
+        workers: Number of workers.
+        batch_size: Converter batch size (None for adaptive).
+        files: Number of converted files.
+        wall: Wall time of `convert` in seconds.
+        busy: Summed duration of converter batches in seconds.
+        latencies: Per-file completion time since start of `convert`.
+    """
+
+    workers: int
+    batch_size: Optional[int]
+    files: int
+    wall: float = 0.0
+    busy: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.wall if self.wall else 0.0
+
+    @property
+    def overhead_per_file(self) -> float:
+        """Worker time per file not spent within converter batches."""
+        return max(0.0, self.wall * self.workers - self.busy) / max(1, self.files)
+
+    def percentile(self, pct: float) -> float:
+        return percentile(self.latencies, pct)
+
+    def summary(self) -> str:
+        return (
+            f"workers={self.workers:<3} batch={self.batch_size or 'auto'!s:<5} "
+            f"files/s={self.files_per_sec:8.2f} overhead/file={self.overhead_per_file * 1e3:7.2f}ms "
+            f"p50={self.percentile(50):6.2f}s p95={self.percentile(95):6.2f}s "
+            f"p99={self.percentile(99):6.2f}s max={self.percentile(100):6.2f}s"
+        )
+
+
+def make_sources(directory: Path, count: int, size: int = 1024) -> Path:
+    """Create fake raw sources."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (directory / f"IMG_{i:05d}.CR2").write_bytes(bytes(size))
+    return directory
+
+
+async def run_once(
+    source: Path, dest: Path, workers: int, batch_size: Optional[int], **kwargs
+) -> BenchResult:
+    """Run and measure a single conversion."""
+    from pydngconverter import DNGConverter
+
+    result = BenchResult(workers=workers, batch_size=batch_size, files=0)
+    start = 0.0
+
+    class InstrumentedConverter(DNGConverter):
+        async def convert_batch(self, *, job=None, **kw):
+            batch_start = time.perf_counter()
+            paths = await super().convert_batch(job=job, **kw)
+            batch_end = time.perf_counter()
+            result.busy += batch_end - batch_start
+            result.latencies.extend([batch_end - start] * len(job))
+            return paths
+
+    dest.mkdir(parents=True, exist_ok=True)
+    converter = InstrumentedConverter(
+        source, dest=dest, max_workers=workers, batch_size=batch_size, **kwargs
+    )
+    start = time.perf_counter()
+    paths = await converter.convert()
+    result.wall = time.perf_counter() - start
+    result.files = len(paths)
+    return result
+
+
+def run_matrix(
+    files: int,
+    workers: Sequence[int],
+    batch_sizes: Sequence[Optional[int]],
+    env: Optional[Dict[str, str]] = None,
+    **kwargs,
+) -> List[BenchResult]:
+    """Run benchmark for each worker count and batch size combination.
+
+    Args:
+        files: Number of source files.
+        workers: Worker counts to measure.
+        batch_sizes: Batch sizes to measure (None for adaptive).
+        env: Stub configuration (see `stubs`).
+            Applied to the process environment (inherited by the stubs) while running.
+        **kwargs: Extra `DNGConverter` arguments.
+    """
+    results = []
+    saved_env = os.environ.copy()
+    try:
+        with tempfile.TemporaryDirectory(prefix="pydng-bench-") as tmp:
+            root = Path(tmp)
+            os.environ.update(env or {})
+            os.environ.update(stubs.install_stubs(root / "bin"))
+            source = make_sources(root / "source", files)
+            for n_workers in workers:
+                for batch_size in batch_sizes:
+                    dest = root / f"dest-{n_workers}-{batch_size}"
+                    result = asyncio.run(run_once(source, dest, n_workers, batch_size, **kwargs))
+                    results.append(result)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=200, help="number of source files")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 8, 0], help="0 for adaptive"
+    )
+    parser.add_argument("--startup", type=float, default=0.1, help="per process seconds")
+    parser.add_argument("--latency", type=float, default=0.01, help="per file seconds")
+    parser.add_argument("--cpu", type=float, default=0.0, help="per file cpu seconds")
+    parser.add_argument("--memory", type=float, default=0.0, help="per process megabytes")
+    parser.add_argument("--output-size", type=int, default=1024, help="per file bytes")
+    parser.add_argument(
+        "--poison", type=int, default=0, help="number of sources the converter hangs on"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0, help="per job timeout seconds")
+    args = parser.parse_args(argv)
+
+    if sys.platform == "win32":
+        parser.error("stub executables are not supported on windows.")
+    logging.getLogger("pydngconverter").setLevel(logging.WARNING)
+    env = {
+        "PYDNG_STUB_STARTUP": str(args.startup),
+        "PYDNG_STUB_LATENCY": str(args.latency),
+        "PYDNG_STUB_CPU": str(args.cpu),
+        "PYDNG_STUB_MEMORY": str(args.memory),
+        "PYDNG_STUB_OUTPUT_SIZE": str(args.output_size),
+    }
+    if args.poison:
+        env["PYDNG_STUB_POISON"] = ",".join(f"IMG_{i:05d}" for i in range(args.poison))
+    batch_sizes = [b or None for b in args.batch_sizes]
+    results = run_matrix(
+        args.files,
+        args.workers,
+        batch_sizes,
+        env=env,
+        job_timeout=args.timeout,
+        timeout_per_mb=0,
+        retries=0,
+    )
+    for result in results:
+        print(result.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Stub executables for benchmarking without Adobe DNG Converter.
+
+Each stub is installed as a small launcher script that re-enters this module,
+and is configured through environment variables:
+
+    PYDNG_STUB_STARTUP: Seconds slept once per process (i.e. wine startup).
+    PYDNG_STUB_LATENCY: Seconds slept per converted file.
+    PYDNG_STUB_CPU: Seconds of cpu burned per converted file.
+    PYDNG_STUB_MEMORY: Megabytes allocated per process.
+    PYDNG_STUB_OUTPUT_SIZE: Bytes written per output file.
+    PYDNG_STUB_PREVIEW: Path to jpeg returned by the exiftool stub.
+    PYDNG_STUB_POISON: Comma separated source stems the converter hangs on.
+
+Launchers rely on shebangs, so stubs are only supported on *nix.
+"""
+
+import os
+import sys
+import time
+import struct
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+# converter flags that consume a value.
+VALUE_FLAGS = {"-d", "-o", "-side", "-count"}
+
+# placeholder preview written by the exiftool stub,
+# unless PYDNG_STUB_PREVIEW points to a jpeg file.
+STUB_PREVIEW = b"\xff\xd8\xff\xd9"
+
+
+def minimal_dng(size: int) -> bytes:
+    """Build a structurally valid DNG of roughly size bytes (a single strip of zeros)."""
+    entries = [(0x0111, 4, 1, 8 + 2 + 12 * 3 + 4), (0x0117, 4, 1, 0), (0xC612, 1, 4, 0x0401)]
+    data_size = max(0, size - entries[0][3])
+    ifd = struct.pack("<H", len(entries))
+    for tag, typ, count, value in entries:
+        ifd += struct.pack("<HHLL", tag, typ, count, data_size if tag == 0x0117 else value)
+    return b"II" + struct.pack("<HL", 42, 8) + ifd + struct.pack("<L", 0) + bytes(data_size)
+
+
+def _env_float(name: str, default: float = 0.0) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _burn_cpu(seconds: float):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def _allocate(megabytes: float) -> bytearray:
+    buffer = bytearray(int(megabytes * 2**20))
+    # touch every page so memory is actually committed.
+    for i in range(0, len(buffer), 4096):
+        buffer[i] = 1
+    return buffer
+
+
+def parse_converter_args(args: List[str]) -> Tuple[Path, List[Path]]:
+    """Parse destination and sources from Adobe DNG Converter arguments."""
+    destination, sources = Path.cwd(), []
+    it = iter(args)
+    for arg in it:
+        if arg in VALUE_FLAGS:
+            value = next(it)
+            if arg == "-d":
+                destination = Path(value)
+        elif not arg.startswith("-"):
+            sources.append(Path(arg))
+    return destination, sources
+
+
+def converter(args: List[str]) -> int:
+    """Emulate Adobe DNG Converter."""
+    time.sleep(_env_float("PYDNG_STUB_STARTUP"))
+    _memory = _allocate(_env_float("PYDNG_STUB_MEMORY"))
+    output_size = int(_env_float("PYDNG_STUB_OUTPUT_SIZE", 1024))
+    destination, sources = parse_converter_args(args)
+    poison = set(filter(None, os.environ.get("PYDNG_STUB_POISON", "").split(",")))
+    for source in sources:
+        if source.stem in poison:
+            time.sleep(3600)
+        time.sleep(_env_float("PYDNG_STUB_LATENCY"))
+        _burn_cpu(_env_float("PYDNG_STUB_CPU"))
+        (destination / source.with_suffix(".dng").name).write_bytes(minimal_dng(output_size))
+    return 0
+
+
+def winepath(args: List[str]) -> int:
+    """Emulate winepath, returning paths as-is."""
+    for arg in args:
+        if not arg.startswith("-"):
+            print(arg)
+    return 0
+
+
+def exiftool(args: List[str]) -> int:
+    """Emulate exiftool's `-stay_open` mode, returning a stub preview."""
+    preview = STUB_PREVIEW
+    if os.environ.get("PYDNG_STUB_PREVIEW"):
+        preview = Path(os.environ["PYDNG_STUB_PREVIEW"]).read_bytes()
+    for line in sys.stdin:
+        line = line.strip()
+        if line.startswith("-execute"):
+            time.sleep(_env_float("PYDNG_STUB_LATENCY"))
+            sys.stdout.buffer.write(preview)
+            sys.stdout.buffer.write(f"{{ready{line[len('-execute'):]}}}\n".encode())
+            sys.stdout.flush()
+        elif line == "False":
+            break
+    return 0
+
+
+STUBS = {"dngconverter": converter, "winepath": winepath, "exiftool": exiftool}
+
+
+def install_stubs(directory: Path) -> Dict[str, str]:
+    """Install stub launchers into directory.
+
+    Returns:
+        Environment overrides pointing pydngconverter at the stubs.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    root = Path(__file__).resolve().parent.parent
+    for name in STUBS:
+        launcher = directory / name
+        launcher.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"sys.path.insert(0, {str(root)!r})\n"
+            "from benchmarks import stubs\n"
+            f"sys.exit(stubs.STUBS[{name!r}](sys.argv[1:]))\n"
+        )
+        launcher.chmod(0o755)
+    return {
+        "PYDNG_DNG_CONVERTER": str(directory / "dngconverter"),
+        "PYDNG_EXIF_TOOL": str(directory / "exiftool"),
+        "WINEPREFIX": str(directory / "wineprefix"),
+        "PATH": f"{directory}{os.pathsep}{os.environ.get('PATH', '')}",
+    }
@@ -0,0 +1,36 @@
+"""Conversion throughput benchmarks (requires pytest-benchmark).
+
+Run with:
+    pytest benchmarks --benchmark-only
+"""
+
+import sys
+
+import pytest
+
+from benchmarks.bench_convert import run_matrix
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Requires shebang stubs.")
+
+STUB_ENV = {
+    "PYDNG_STUB_STARTUP": "0.05",
+    "PYDNG_STUB_LATENCY": "0.005",
+}
+
+
+@pytest.mark.parametrize("batch_size", [1, 8, None])
+@pytest.mark.parametrize("workers", [2, 4])
+def test_convert_throughput(benchmark, workers, batch_size):
+    results = benchmark.pedantic(
+        run_matrix, args=(50, [workers], [batch_size]), kwargs=dict(env=STUB_ENV), rounds=3
+    )
+    result = results[0]
+    assert result.files == 50
+    benchmark.extra_info.update(
+        files_per_sec=result.files_per_sec,
+        overhead_per_file=result.overhead_per_file,
+        p95=result.percentile(95),
+        p99=result.percentile(99),
+    )
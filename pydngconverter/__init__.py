@@ -10,7 +10,13 @@ speed up the process of converting RAW images to DNG.
 __author__ = """Braden Mars"""
 __version__ = "0.3.0"
 
+import logging
+
 from pydngconverter import flags
-from pydngconverter.main import DNGConverter, DNGParameters
+from pydngconverter.main import DNGConverter, DNGParameters, setup_logging
+from pydngconverter.scheduler import SchedulePolicy
+
+# logging is configured by the host application (or `setup_logging`).
+logging.getLogger("pydngconverter").addHandler(logging.NullHandler())
 
-__all__ = ["DNGConverter", "DNGParameters", "flags"]
+__all__ = ["DNGConverter", "DNGParameters", "SchedulePolicy", "flags", "setup_logging"]
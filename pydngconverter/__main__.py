@@ -0,0 +1,7 @@
+"""Run PyDNGConverter's command line interface (`python -m pydngconverter`)."""
+
+import sys
+
+from pydngconverter.cli import main
+
+sys.exit(main())
@@ -0,0 +1,296 @@
+"""PyDNGConverter command line interface.
+
+Converts any number of source directories and raw files (including
+file lists read from stdin) within a single pool of workers.
+
+Example:
+    $ pydngconverter /mnt/card1 /mnt/card2 -d /dngfiles --jpeg-preview extract
+    $ find /archive -name '*.CR3' -newer /tmp/stamp | pydngconverter - -d /dngfiles
+"""
+
+import sys
+import time
+import signal
+import asyncio
+import logging
+import argparse
+from typing import IO, List, Optional, Sequence
+from pathlib import Path
+
+from pydngconverter import flags, watch, __version__, scheduler
+from pydngconverter.main import DNGConverter, setup_logging
+from pydngconverter.dngconverter import DNGJobResult
+
+logger = logging.getLogger("pydngconverter").getChild("cli")
+
+
+def _read_paths(stream: IO[str], null: bool = False) -> List[str]:
+    """Read newline (or NUL) separated paths from stream, ignoring blank entries."""
+    data = stream.read()
+    entries = data.split("\0") if null else data.splitlines()
+    return [e for e in (e.strip("\r\n") for e in entries) if e]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pydngconverter",
+        description="Convert raw images to DNG with Adobe DNG Converter.",
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        metavar="SOURCE",
+        help="source directories (scanned recursively) and raw files, '-' reads paths from stdin",
+    )
+    parser.add_argument(
+        "-f",
+        "--files-from",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="read source paths from file, one per line ('-' for stdin)",
+    )
+    parser.add_argument(
+        "-0", "--null", action="store_true", help="source paths read are NUL separated"
+    )
+    parser.add_argument("-d", "--dest", help="destination directory (defaults to source)")
+    parser.add_argument("--debug", action="store_true", help="enable debug logs")
+
+    run = parser.add_argument_group("execution")
+    run.add_argument("-j", "--workers", type=int, help="max concurrent converter processes")
+    run.add_argument("--adaptive", action="store_true", help="adapt concurrency to memory and load")
+    run.add_argument("--min-workers", type=int, help="min concurrent processes when adaptive")
+    run.add_argument(
+        "--batch-size", type=int, default=1, help="files per converter process (0 for auto)"
+    )
+    run.add_argument(
+        "--schedule",
+        choices=[p.name.lower() for p in scheduler.SchedulePolicy],
+        default=scheduler.SchedulePolicy.FIFO.name.lower(),
+        help="order jobs are handed to workers",
+    )
+    run.add_argument(
+        "--timeout", type=float, default=120.0, help="seconds per job until killed (0 disables)"
+    )
+    run.add_argument("--retries", type=int, default=2, help="retries of failed conversions")
+    run.add_argument("--no-verify", action="store_true", help="skip verification of outputs")
+    run.add_argument(
+        "--persistent-wine", action="store_true", help="keep a wineserver running (wine only)"
+    )
+    run.add_argument("--staging-dir", help="stage sources and outputs through this directory")
+    run.add_argument(
+        "--image-workers", type=int, help="size of executor for thumbnail decoding/resizing"
+    )
+    run.add_argument(
+        "--all-files", action="store_true", help="do not skip files that are not raw images"
+    )
+    run.add_argument("--lazy-scan", action="store_true", help="discover sources while converting")
+
+    state = parser.add_argument_group("incremental runs")
+    state.add_argument("--incremental", action="store_true", help="skip up-to-date outputs")
+    state.add_argument(
+        "--content-hash", action="store_true", help="compare content hashes when incremental"
+    )
+    state.add_argument("--journal", action="store_true", help="record progress in a journal")
+    state.add_argument(
+        "--resume", action="store_true", help="skip jobs completed by an interrupted run"
+    )
+    state.add_argument("--dedup", action="store_true", help="convert duplicate sources once")
+    state.add_argument(
+        "--copy-duplicates", action="store_true", help="copy outputs of duplicates, not hardlink"
+    )
+
+    watching = parser.add_argument_group("watch mode")
+    watching.add_argument(
+        "--watch", action="store_true", help="keep converting files written to source"
+    )
+    watching.add_argument(
+        "--debounce", type=float, default=2.0, help="seconds a new file must be stable"
+    )
+    watching.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls")
+    watching.add_argument(
+        "--watch-backend",
+        choices=[b.name.lower() for b in watch.WatchBackend],
+        default=watch.WatchBackend.AUTO.name.lower(),
+        help="method used to detect new files",
+    )
+
+    dng = parser.add_argument_group("converter parameters")
+    dng.add_argument("--no-compression", action="store_true", help="disable DNG compression")
+    dng.add_argument(
+        "--camera-raw",
+        type=float,
+        choices=[v.value for v in flags.CRawCompat],
+        default=flags.CRawCompat.latest().value,
+        help="camera raw compatibility version",
+    )
+    dng.add_argument(
+        "--dng-version",
+        type=float,
+        choices=[v.value for v in flags.DNGVersion],
+        default=flags.DNGVersion.latest().value,
+        help="DNG backwards compatible version",
+    )
+    dng.add_argument(
+        "--jpeg-preview",
+        # flag enums override `name` with the converter's flag.
+        choices=[name.lower() for name in flags.JPEGPreview.__members__],
+        default="medium",
+        help="JPEG preview size, or extract the raw's embedded preview as a thumbnail",
+    )
+    dng.add_argument("--fast-load", action="store_true", help="embed fast load data")
+    dng.add_argument("--linear", action="store_true", help="write linear DNGs")
+    dng.add_argument("--lossy", action="store_true", help="enable lossy compression")
+    dng.add_argument("--side", type=int, default=0, help="long side pixels (implies lossy)")
+    dng.add_argument("--count", type=int, default=0, help="megapixel limit (implies lossy)")
+    return parser
+
+
+def _sources(args: argparse.Namespace, stdin: IO[str]) -> List[str]:
+    sources = []
+    for source in args.sources:
+        if source == "-":
+            sources.extend(_read_paths(stdin, args.null))
+        else:
+            sources.append(source)
+    for path in args.files_from:
+        if path == "-":
+            sources.extend(_read_paths(stdin, args.null))
+            continue
+        with open(path) as f:
+            sources.extend(_read_paths(f, args.null))
+    return sources
+
+
+def create_converter(args: argparse.Namespace, sources: Sequence[str]) -> DNGConverter:
+    """Create converter from parsed arguments."""
+    return DNGConverter(
+        sources,
+        dest=args.dest,
+        max_workers=args.workers,
+        adaptive=args.adaptive,
+        min_workers=args.min_workers,
+        schedule=scheduler.SchedulePolicy[args.schedule.upper()],
+        batch_size=args.batch_size or None,
+        incremental=args.incremental,
+        content_hash=args.content_hash,
+        job_timeout=args.timeout or None,
+        retries=args.retries,
+        staging_dir=args.staging_dir,
+        verify_output=not args.no_verify,
+        persistent_wine=args.persistent_wine,
+        use_journal=args.journal,
+        resume=args.resume,
+        deduplicate=args.dedup,
+        hardlink_duplicates=not args.copy_duplicates,
+        raw_only=not args.all_files,
+        lazy_scan=args.lazy_scan,
+        image_workers=args.image_workers,
+        debug=args.debug,
+        compression=flags.Compression.NO if args.no_compression else flags.Compression.YES,
+        camera_raw=flags.CRawCompat(args.camera_raw),
+        dng_version=flags.DNGVersion(args.dng_version),
+        jpeg_preview=flags.JPEGPreview.__members__[args.jpeg_preview.upper()],
+        fast_load=args.fast_load,
+        linear=args.linear,
+        lossy=flags.LossyCompression.YES if args.lossy else flags.LossyCompression.NO,
+        side=args.side,
+        count=args.count,
+    )
+
+
+class Throughput:
+    """Tallies results and source bytes of a run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.converted = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def add(self, result: DNGJobResult):
+        if not result.ok:
+            self.failed += 1
+            return
+        self.converted += 1
+        try:
+            self.bytes += result.job.source.stat().st_size
+        except OSError:
+            pass
+
+    def report(self, log: logging.Logger = logger):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        megabytes = self.bytes / 2**20
+        log.info(
+            "[bold white]converted %s file(s) (%.1f MB) in %.1fs:[/] "
+            "%.2f files/s, %.1f MB/s, %s failed",
+            self.converted,
+            megabytes,
+            elapsed,
+            self.converted / elapsed,
+            megabytes / elapsed,
+            self.failed,
+        )
+
+
+async def run(args: argparse.Namespace, converter: DNGConverter) -> Throughput:
+    """Run converter until done (or until interrupted, when watching)."""
+    throughput = Throughput()
+    if not args.watch:
+        results = converter.iter_convert()
+    else:
+        until = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, until.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        results = converter.iter_watch(
+            debounce=args.debounce,
+            poll_interval=args.poll_interval,
+            backend=watch.WatchBackend[args.watch_backend.upper()],
+            until=until,
+        )
+    async with converter:
+        async for result in results:
+            throughput.add(result)
+    return throughput
+
+
+def main(argv: Optional[Sequence[str]] = None, stdin: Optional[IO[str]] = None) -> int:
+    """Command line entry point.
+
+    Returns:
+        Exit code: 0 on success, 1 if any job failed, 2 on usage errors
+        (including sources whose outputs would overwrite each other).
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    setup_logging(logging.DEBUG if args.debug else logging.INFO)
+    sources = _sources(args, stdin or sys.stdin)
+    if not sources:
+        parser.error("no sources given")
+    if args.watch and len(sources) > 1:
+        parser.error("only a single source directory can be watched")
+    try:
+        if args.dest:
+            Path(args.dest).mkdir(parents=True, exist_ok=True)
+        converter = create_converter(args, sources)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    # with lazy scanning, colliding jobs fail while converting instead.
+    collisions = converter.job.collisions()
+    if collisions:
+        details = "; ".join(
+            f"{dest}: {', '.join(str(j.source) for j in jobs)}"
+            for dest, jobs in list(collisions.items())[:5]
+        )
+        parser.error(
+            f"{len(collisions)} destination(s) shared by multiple sources "
+            f"(use separate --dest directories): {details}"
+        )
+    throughput = asyncio.run(run(args, converter))
+    throughput.report()
+    return 1 if throughput.failed else 0
@@ -4,18 +4,25 @@ Handles platform-specific operations.
 """
 
 import os
+import json
+import shutil
 import asyncio
 import logging
 import platform
-from copy import deepcopy
+import functools
+import subprocess
 from enum import Enum, auto
-from typing import List, Union, Optional
+from typing import Dict, List, Tuple, Union, Iterable, Optional, Sequence
+from collections import OrderedDict
 from pathlib import Path
 
 from pydngconverter import utils
 
 logger = logging.getLogger("pydngconverter").getChild("utils")
 
+# seconds an idle wineserver is kept alive for.
+WINESERVER_PERSIST = 60
+
 
 class Platform(Enum):
     UNKNOWN = auto()  # fallback
@@ -43,19 +50,111 @@ class Platform(Enum):
 
     @classmethod
     def get(cls) -> "Platform":
-        return getattr(cls, str(platform.system()).upper())
+        """Platform of this process, detected once."""
+        return _detect_platform()
 
 
-async def _exec_wine(winecmd: str, *args):
-    """Execute wine command.
+@functools.lru_cache(maxsize=None)
+def _detect_platform() -> Platform:
+    return getattr(Platform, str(platform.system()).upper(), Platform.UNKNOWN)
+
+
+# maximum number of translated directories to keep in memory.
+WINE_PATH_CACHE_SIZE = 4096
+
+# (wine prefix, unix directory) -> windows directory.
+_wine_dir_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+
+def get_wine_prefix() -> Path:
+    """Get wine prefix in use.
 
     Will check for WINEPREFIX in user env, defaulting to ~/.dngconverter
     (AUR package default path) if it is not provided.
+    The prefix is detected once per value of WINEPREFIX.
+    """
+    return _detect_wine_prefix(os.environ.get("WINEPREFIX"))
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_wine_prefix(env_prefix: Optional[str]) -> Path:
+    return Path(env_prefix) if env_prefix else Path.home() / ".dngconverter" / "wine"
+
+
+def wine_env() -> Dict[str, str]:
+    """Environment for running programs within the wine prefix."""
+    return dict(os.environ, WINEPREFIX=str(get_wine_prefix()))
+
+
+class WineServer:
+    """Persistent wineserver of a wine prefix.
+
+    Wine programs connect to the running wineserver of their prefix,
+    so keeping one alive (`wineserver -p<seconds>`) spares each converter and
+    winepath launch the server and prefix startup cost. The server is shared
+    with any other wine program of the prefix, so it is never killed, but exits
+    on its own once it has been idle for `persist` seconds.
+
+    Args:
+        prefix: Wine prefix.
+            Defaults to `get_wine_prefix()`.
+        persist: Seconds the server is kept alive after its last client exits.
     """
-    prefix = os.environ.get("WINEPREFIX", Path.home() / ".dngconverter" / "wine")
+
+    def __init__(self, prefix: Optional[Path] = None, persist: int = WINESERVER_PERSIST):
+        self.prefix = Path(prefix or get_wine_prefix())
+        self.persist = persist
+        self.executable = os.environ.get("WINESERVER") or shutil.which("wineserver")
+        self.running = False
+
+    @property
+    def env(self) -> Dict[str, str]:
+        return dict(os.environ, WINEPREFIX=str(self.prefix))
+
+    def _run(self, *args: str):
+        subprocess.run(
+            [self.executable, *args],
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            timeout=60,
+        )
+
+    def start(self) -> bool:
+        """Start persistent wineserver, if not already running.
+
+        Returns:
+            Whether the server is running.
+        """
+        if self.running:
+            return True
+        if not self.executable:
+            logger.warning("wineserver not found, cannot start persistent wineserver.")
+            return False
+        try:
+            # wineserver daemonizes itself once its socket is ready.
+            self._run(f"-p{self.persist}")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning("failed to start persistent wineserver: %s", e)
+            return False
+        logger.info("started persistent wineserver for prefix: %s", self.prefix)
+        self.running = True
+        return True
+
+    def stop(self):
+        """Release wineserver, leaving it to exit once idle."""
+        if not self.running:
+            return
+        self.running = False
+        logger.debug("released wineserver for prefix: %s", self.prefix)
+
+
+async def _exec_wine(winecmd: str, *args):
+    """Execute wine command within the wine prefix."""
+    prefix = get_wine_prefix()
     logger.debug("wine prefix: %s", prefix)
-    prefix = Path(prefix)
-    wineenv = dict(**deepcopy(os.environ), **dict(WINEPREFIX=str(prefix)))
+    wineenv = wine_env()
     logger.debug("Executing [italic white]%s %s[/]", winecmd, " ".join(args))
     proc = await asyncio.create_subprocess_exec(
         winecmd, *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=wineenv
@@ -64,40 +163,216 @@ async def _exec_wine(winecmd: str, *args):
     return stdout
 
 
+@functools.lru_cache(maxsize=None)
+def _dosdevices(prefix: str) -> List[Tuple[str, str]]:
+    """Read drive mappings of wine prefix.
+
+    Returns:
+        List of (unix root, drive letter), longest root first.
+    """
+    devices_dir = Path(prefix) / "dosdevices"
+    drives = []
+    try:
+        entries = list(os.scandir(devices_dir))
+    except OSError:
+        return drives
+    for entry in entries:
+        # skip raw devices (i.e. 'd::') and ports.
+        if len(entry.name) != 2 or not entry.name.endswith(":") or not entry.is_symlink():
+            continue
+        target = os.path.normpath(os.path.join(devices_dir, os.readlink(entry.path)))
+        drives.append((target, entry.name[0].upper()))
+    drives.sort(key=lambda d: len(d[0]), reverse=True)
+    logger.debug("wine drive mappings: %s", drives)
+    return drives
+
+
+def _dos_directory(prefix: str, unix_dir: str) -> Optional[str]:
+    """Translate unix directory to windows path using the prefix's drive mappings."""
+    for root, letter in _dosdevices(prefix):
+        if unix_dir == root or unix_dir.startswith(root.rstrip("/") + "/"):
+            rel = unix_dir[len(root) :].strip("/")
+            return f"{letter}:" + "".join("\\" + part for part in rel.split("/") if part)
+    return None
+
+
+def _cache_directory(key: Tuple[str, str], win_dir: str):
+    _wine_dir_cache[key] = win_dir
+    _wine_dir_cache.move_to_end(key)
+    while len(_wine_dir_cache) > WINE_PATH_CACHE_SIZE:
+        _wine_dir_cache.popitem(last=False)
+
+
+def _cached_directory(key: Tuple[str, str]) -> Optional[str]:
+    win_dir = _wine_dir_cache.get(key)
+    if win_dir is None:
+        win_dir = _dos_directory(*key)
+        if win_dir is None:
+            return None
+        _cache_directory(key, win_dir)
+    else:
+        _wine_dir_cache.move_to_end(key)
+    return win_dir
+
+
+async def wine_paths(unix_paths: Sequence[Path]) -> List[str]:
+    """Convert *nix paths to Windows paths.
+
+    Translations are cached per directory. Directories are first
+    resolved in-process via the prefix's `dosdevices` mappings,
+    any remaining paths are translated with a single `winepath` call.
+    """
+    prefix = str(get_wine_prefix())
+    paths = [Path(p) for p in unix_paths]
+    results: Dict[Path, str] = {}
+    pending: List[Path] = []
+    for path in paths:
+        win_dir = _cached_directory((prefix, str(path.parent)))
+        if win_dir is None:
+            pending.append(path)
+        else:
+            results[path] = f"{win_dir}\\{path.name}"
+    if pending:
+        pending = list(dict.fromkeys(pending))
+        win_paths = await _exec_wine("winepath", "-w", *map(str, pending))
+        win_paths = win_paths.decode().splitlines()
+        if len(win_paths) != len(pending):
+            raise RuntimeError(f"winepath failed to translate paths: {pending}")
+        for path, win_path in zip(pending, win_paths):
+            results[path] = win_path
+            if "\\" in win_path:
+                _cache_directory((prefix, str(path.parent)), win_path.rsplit("\\", 1)[0])
+    return [results[p] for p in paths]
+
+
 async def wine_path(unix_path: Path) -> str:
     """Convert *nix path to Windows path."""
-    win_path = await _exec_wine("winepath", "-w", str(unix_path))
-    win_path = win_path.decode().rstrip("\n")
-    return win_path
+    win_paths = await wine_paths([unix_path])
+    return win_paths[0]
 
 
-async def get_compat_path(path: Union[str, Path]) -> str:
-    """Convert given path to a DNGConverter compatible format.
+async def get_compat_paths(paths: Iterable[Union[str, Path]]) -> List[str]:
+    """Convert given paths to a DNGConverter compatible format.
 
-    DNGConverter requires Windows-like paths on *nix environments that
-    utilize wine.
+    Batch variant of `get_compat_path`.
     """
-    _path = Path(path)
+    _paths = [Path(p) for p in paths]
     plat = Platform.get()
 
     if plat.is_unknown:
         # at least try instead of failing.
         logger.warning("unable to determine platform! defaulting to linux.")
-        return str(_path)
+        return [str(p) for p in _paths]
 
     if plat.is_nix:
         # dngconverter runs in wine on *nix,
         # but it requires windows-type paths.
-        _path = await wine_path(_path)
-        logger.debug("converted unix to windows path: %s", _path)
-        return _path
+        win_paths = await wine_paths(_paths)
+        logger.debug("converted unix to windows paths: %s", win_paths)
+        return win_paths
+
+    return [str(p) for p in _paths]
+
+
+async def get_compat_path(path: Union[str, Path]) -> str:
+    """Convert given path to a DNGConverter compatible format.
+
+    DNGConverter requires Windows-like paths on *nix environments that
+    utilize wine.
+    """
+    compat_paths = await get_compat_paths([path])
+    return compat_paths[0]
+
+
+# environment variable naming a file to persist executable resolutions to.
+EXECUTABLE_CACHE_ENV = "PYDNG_EXECUTABLE_CACHE"
+
+# resolution key -> (executable path, executable mtime).
+_executable_cache: Dict[str, Tuple[str, int]] = {}
 
-    return str(_path)
+# path of disk cache -> its entries, loaded once per process.
+_executable_disk_cache: Dict[str, Dict[str, Tuple[str, int]]] = {}
+
+
+def clear_executable_cache():
+    """Forget in-memory executable resolutions (the disk cache is kept)."""
+    _executable_cache.clear()
+    _executable_disk_cache.clear()
+
+
+def _executable_key(name_variants: Sequence[str], env_override: Optional[str]) -> str:
+    """Key of resolution, which depends on the env override and PATH."""
+    override = os.environ.get(env_override) if env_override else None
+    return json.dumps(
+        [list(name_variants), env_override, override, os.environ.get("PATH"), Platform.get().name]
+    )
+
+
+def _mtime_ns(path: Union[str, Path]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_executable_cache(path: str) -> Dict[str, Tuple[str, int]]:
+    if path not in _executable_disk_cache:
+        try:
+            entries = json.loads(Path(path).read_text()).get("entries", {})
+            _executable_disk_cache[path] = {k: tuple(v) for k, v in entries.items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            _executable_disk_cache[path] = {}
+    return _executable_disk_cache[path]
+
+
+def _save_executable_cache(path: str, key: str, entry: Tuple[str, int]):
+    """Merge resolution into disk cache, replacing it atomically."""
+    _executable_disk_cache.pop(path, None)
+    entries = dict(_load_executable_cache(path), **{key: entry})
+    _executable_disk_cache[path] = entries
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(tmp_path).write_text(json.dumps(dict(entries=entries)))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug("failed to save executable cache %s: %s", path, e)
+
+
+def _cached_executable(key: str) -> Optional[Path]:
+    """Cached resolution of key, unless the executable changed since."""
+    entry = _executable_cache.get(key)
+    disk_path = os.environ.get(EXECUTABLE_CACHE_ENV)
+    if entry is None and disk_path:
+        entry = _load_executable_cache(disk_path).get(key)
+    if entry is None:
+        return None
+    exec_path, mtime_ns = entry
+    if _mtime_ns(exec_path) != mtime_ns:
+        _executable_cache.pop(key, None)
+        return None
+    _executable_cache[key] = entry
+    return Path(exec_path)
+
+
+def _cache_executable(key: str, exec_path: Path):
+    mtime_ns = _mtime_ns(exec_path)
+    if mtime_ns is None:
+        return
+    entry = (str(exec_path), mtime_ns)
+    _executable_cache[key] = entry
+    disk_path = os.environ.get(EXECUTABLE_CACHE_ENV)
+    if disk_path:
+        _save_executable_cache(disk_path, key, entry)
 
 
 def resolve_executable(name_variants: List[str], env_override: Optional[str] = None) -> str:
     """Resolve platform-specific path to given executable.
 
+    Resolutions are cached in memory (and, if `EXECUTABLE_CACHE_ENV` names
+    a file, on disk) keyed by the env override and PATH, until the
+    resolved executable's mtime changes.
+
     Args:
         name_variants: List of executable names to look for.
         env_override: Environment variable name to use as override if available.
@@ -125,6 +400,12 @@ def resolve_executable(name_variants: List[str], env_override: Optional[str] = N
             # allow use of env vars to override paths in case of resolution failure.
             return override_path
 
+    key = _executable_key(name_variants, env_override)
+    cached = _cached_executable(key)
+    if cached is not None:
+        logger.debug("using cached executable for: %s @ %s", name_variants[0], cached)
+        return cached
+
     def _resolve(names: List[str]) -> Path:
         for name in names:
             _app_root = app_map.get(plat, app_map[Platform.LINUX])
@@ -149,4 +430,5 @@ def resolve_executable(name_variants: List[str], env_override: Optional[str] = N
         ) from e
     else:
         logger.info("resolved executable for: %s @ %s", name, exec_path)
+        _cache_executable(key, exec_path)
         return exec_path
@@ -0,0 +1,184 @@
+"""PyDNGConverter dedup module.
+
+Groups jobs with identical source contents, so each unique
+source is converted once and its outputs are replicated
+(hardlinked or copied) to the destinations of its duplicates.
+
+Sources are fingerprinted progressively: by size first, then by a
+partial hash (head and tail) of same-sized sources, and only by a full
+content hash when partial hashes collide. Fingerprints are cached
+(keyed by path, size and mtime) between runs.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import Dict, List, Union, Callable, Iterable
+from pathlib import Path
+
+from pydngconverter import utils
+from pydngconverter.dngconverter import RESERVED_PREFIX, DNGJob
+
+logger = logging.getLogger("pydngconverter").getChild("dedup")
+
+FINGERPRINT_CACHE_FILENAME = f"{RESERVED_PREFIX}-fingerprints.json"
+FINGERPRINT_CACHE_VERSION = 1
+
+# bytes hashed from each end of a source for its partial hash.
+PARTIAL_HASH_SIZE = 64 * 1024
+
+
+def partial_hash(path: Union[str, Path], size: int) -> str:
+    """Hash head and tail of file."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL_HASH_SIZE))
+        if size > PARTIAL_HASH_SIZE:
+            f.seek(max(PARTIAL_HASH_SIZE, size - PARTIAL_HASH_SIZE))
+            digest.update(f.read(PARTIAL_HASH_SIZE))
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """Persistent cache of source fingerprints.
+
+    Args:
+        path: Path to cache file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        self._used: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FingerprintCache":
+        """Load cache from path.
+
+        A missing or unreadable cache results in an empty one.
+        """
+        cache = cls(path)
+        try:
+            data = json.loads(cache.path.read_text())
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError) as e:
+            logger.warning("ignoring unreadable fingerprint cache %s: %s", cache.path, e)
+            return cache
+        if data.get("version") == FINGERPRINT_CACHE_VERSION:
+            cache.entries = data.get("entries", {})
+        return cache
+
+    def save(self):
+        """Atomically write fingerprints used since loading to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(
+            json.dumps({"version": FINGERPRINT_CACHE_VERSION, "entries": self._used})
+        )
+        os.replace(tmp_path, self.path)
+        logger.debug("saved %s fingerprints to %s", len(self._used), self.path)
+
+    def _entry(self, path: Path) -> dict:
+        key = str(path)
+        if key in self._used:
+            return self._used[key]
+        stat = path.stat()
+        entry = self.entries.get(key)
+        if entry is None or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+            entry = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        self._used[key] = entry
+        return entry
+
+    def partial(self, path: Path) -> str:
+        """Partial hash of file."""
+        entry = self._entry(path)
+        if "partial" not in entry:
+            entry["partial"] = partial_hash(path, entry["size"])
+        return entry["partial"]
+
+    def full(self, path: Path) -> str:
+        """Full content hash of file."""
+        entry = self._entry(path)
+        if "full" not in entry:
+            entry["full"] = utils.hash_file(path)
+        return entry["full"]
+
+
+def _split(groups: Iterable[List[DNGJob]], key: Callable[[DNGJob], str]) -> List[List[DNGJob]]:
+    """Split groups of more than one job by key.
+
+    Jobs whose key cannot be computed (i.e. an unreadable source) are never grouped.
+    """
+    result = []
+    for group in groups:
+        if len(group) < 2:
+            result.append(group)
+            continue
+        by_key: Dict[str, List[DNGJob]] = {}
+        for job in group:
+            try:
+                by_key.setdefault(key(job), []).append(job)
+            except OSError as e:
+                logger.warning("failed to fingerprint %s: %s", job.source.name, e)
+                result.append([job])
+        result.extend(by_key.values())
+    return result
+
+
+def group_duplicates(jobs: Iterable[DNGJob], cache: FingerprintCache) -> List[List[DNGJob]]:
+    """Group jobs by identical source contents.
+
+    Args:
+        jobs: Jobs to group.
+        cache: Fingerprint cache.
+
+    Returns:
+        Groups of jobs, in order of first occurrence of each group.
+    """
+    jobs = list(jobs)
+    by_size: Dict[int, List[DNGJob]] = {}
+    unreadable: List[List[DNGJob]] = []
+    for job in jobs:
+        try:
+            size = job.source.stat().st_size
+        except OSError:
+            unreadable.append([job])  # never grouped.
+            continue
+        by_size.setdefault(size, []).append(job)
+    groups = _split(by_size.values(), lambda j: cache.partial(j.source))
+    groups = _split(groups, lambda j: cache.full(j.source))
+    order = {id(job): i for i, job in enumerate(jobs)}
+    return sorted([*groups, *unreadable], key=lambda g: order[id(g[0])])
+
+
+def replicate(source: Path, destination: Path, hardlink: bool = True):
+    """Replicate file to destination, replacing it atomically.
+
+    Args:
+        source: File to replicate.
+        destination: Destination path.
+        hardlink: Hardlink instead of copying where possible.
+    """
+    if source == destination:
+        return
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(f"{RESERVED_PREFIX}-{destination.name}.tmp")
+    try:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        try:
+            if not hardlink:
+                raise OSError("hardlinks disabled")
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
@@ -1,11 +1,25 @@
 """PyDNGConverter interface bridges for Adobe DNG Converter."""
 
-from typing import List, Iterator, Optional
+import os
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Set, Dict, List, Iterable, Iterator, Optional
 from pathlib import Path
 from dataclasses import field, dataclass
 
+from pydngconverter import formats
 from pydngconverter.flags import CRawCompat, DNGVersion, Compression, JPEGPreview, LossyCompression
 
+if TYPE_CHECKING:
+    from pydngconverter.timing import JobTimings
+    from pydngconverter.thumbnail import ThumbnailOptions
+
+logger = logging.getLogger("pydngconverter").getChild("dngconverter")
+
+# filename prefix of files managed by pydngconverter (i.e. manifests).
+# these are never picked up as source files.
+RESERVED_PREFIX = ".pydngconverter"
+
 
 @dataclass
 class DNGParameters:
@@ -59,9 +73,9 @@ class DNGParameters:
             yield self.fast_load_flag
         if self.linear_flag:
             yield self.linear_flag
-        if not self.lossy and (self.side or self.count):
+        if self.lossy == LossyCompression.YES or self.side or self.count:
             # implied lossy if side or count provided.
-            yield self.lossy.flag
+            yield LossyCompression.YES.flag
         if self.side:
             yield "-side"
             yield f"{self.side}"
@@ -73,6 +87,12 @@ class DNGParameters:
         else:
             yield self.jpeg_preview.flag
 
+    @property
+    def digest(self) -> str:
+        """Digest of converter arguments, used to detect parameter changes."""
+        args = [*self.iter_args, self.jpeg_preview.name]
+        return hashlib.sha1("\0".join(args).encode()).hexdigest()
+
 
 @dataclass
 class DNGJob:
@@ -82,12 +102,16 @@ class DNGJob:
         source: Job source image path.
         destination_root: Job destination directory.
             Defaults to source path root.
+        thumbnails: Thumbnail specs, all rendered from a single decode
+            of the extracted preview.
+            Defaults to a single default thumbnail.
         _parent: Parent Job.
             Defaults to None.
     """
 
     source: Path
     destination_root: Path = None
+    thumbnails: List["ThumbnailOptions"] = field(default_factory=list, repr=False)
     _parent: "DNGBatchJob" = field(default=None, repr=False)
 
     def __post_init__(self):
@@ -110,11 +134,47 @@ class DNGJob:
     def thumbnail_destination(self) -> Path:
         return self.destination_root / self.thumbnail_filename
 
+    def thumbnail_path(self, name: str) -> Path:
+        return self.destination_root / self.source.with_suffix(f".{name}.jpg").name
+
+    @property
+    def thumbnail_destinations(self) -> List[Path]:
+        if not self.thumbnails:
+            return [self.thumbnail_destination]
+        return [self.thumbnail_path(spec.name) for spec in self.thumbnails]
+
     @property
     def destination(self) -> Path:
         return self.destination_root / self.destination_filename
 
 
+@dataclass
+class DNGJobResult:
+    """Outcome of a DNG Conversion job.
+
+    Attributes:
+        job: Completed job.
+        destination: Converted DNG path, if conversion ran.
+        thumbnails: Paths of rendered thumbnails.
+        timings: Stage timings of job.
+        error: Exception raised while running job, if any.
+    """
+
+    job: DNGJob
+    destination: Optional[Path] = None
+    thumbnails: List[Path] = field(default_factory=list)
+    timings: Optional["JobTimings"] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def outputs(self) -> List[Path]:
+        return [p for p in (self.destination, *self.thumbnails) if p is not None]
+
+
 @dataclass
 class DNGBatchJob:
     """Batch DNG Conversion.
@@ -122,16 +182,122 @@ class DNGBatchJob:
     Attributes:
         source_directory: Directory of source images.
         jobs: Child jobs of this batch job.
-            Automatically populated based on source directory.
+            Automatically populated based on source directory,
+            unless the batch job is lazy.
         dest_directory: Destination directory.
             Defaults to source directory root.
+        lazy: Defer scanning of source directory until iterated with `iter_scan`.
+            Defaults to false.
+        raw_only: Skip files that are not raw images (see `formats`).
+            Defaults to true.
+        thumbnails: Thumbnail specs of child jobs.
+        sources: Source directories (scanned recursively) and files.
+            Defaults to the source directory.
+        skipped: Number of skipped non-raw files by extension.
+            Populated while scanning.
     """
 
     source_directory: Path
     jobs: List[DNGJob] = field(default_factory=list)
     dest_directory: Optional[Path] = None
+    lazy: bool = False
+    raw_only: bool = True
+    thumbnails: List["ThumbnailOptions"] = field(default_factory=list)
+    sources: List[Path] = field(default_factory=list)
+    skipped: Dict[str, int] = field(default_factory=dict)
 
     def __post_init__(self):
-        files = [f for f in self.source_directory.rglob("*") if f.is_file()]
-        self.jobs = [DNGJob(f, destination_root=self.dest_directory, _parent=self) for f in files]
+        if not self.lazy:
+            self.jobs = list(self.iter_scan())
         return self
+
+    def iter_scan(self) -> Iterator[DNGJob]:
+        """Recursively scan sources, yielding jobs as files are found.
+
+        Symlinked directories are not followed. Files found
+        through more than one source are only yielded once.
+        """
+        self.skipped.clear()
+        sources = self.sources or [self.source_directory]
+        seen: Set[Path] = set()
+        for source in sources:
+            if source.is_dir():
+                jobs = self._iter_directory(source)
+            else:
+                job = self.create_job(source)
+                jobs = [job] if job is not None else []
+            for job in jobs:
+                if len(sources) > 1:
+                    if job.source in seen:
+                        continue
+                    seen.add(job.source)
+                yield job
+
+    def _iter_directory(self, root: Path) -> Iterator[DNGJob]:
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                        elif entry.is_file():
+                            job = self.create_job(Path(entry.path))
+                            if job is not None:
+                                yield job
+            except OSError as e:
+                logger.warning("failed to scan directory %s: %s", directory, e)
+
+    def create_job(self, path: Path) -> Optional[DNGJob]:
+        """Create child job for source file.
+
+        Returns:
+            Job, or None if the file is reserved or skipped as a non-raw file.
+        """
+        if path.name.startswith(RESERVED_PREFIX):
+            return None
+        if self.raw_only and not formats.is_raw(path):
+            suffix = path.suffix.lower() or "<none>"
+            self.skipped[suffix] = self.skipped.get(suffix, 0) + 1
+            return None
+        return DNGJob(
+            path,
+            destination_root=self.dest_directory,
+            thumbnails=self.thumbnails,
+            _parent=self,
+        )
+
+    def collisions(self) -> Dict[Path, List[DNGJob]]:
+        """Find child jobs whose destinations collide.
+
+        Returns:
+            Jobs of each destination shared by more than one source.
+        """
+        by_destination: Dict[Path, List[DNGJob]] = {}
+        for job in self.jobs:
+            by_destination.setdefault(job.destination, []).append(job)
+        return {d: jobs for d, jobs in by_destination.items() if len(jobs) > 1}
+
+    def iter_batches(
+        self, size: int = 1, jobs: Optional[Iterable[DNGJob]] = None
+    ) -> Iterator[List[DNGJob]]:
+        """Iterate over child jobs in batches.
+
+        Jobs are only batched together when they share a destination root,
+        as the converter accepts a single output directory per invocation.
+
+        Args:
+            size: Maximum number of jobs per batch.
+            jobs: Subset of jobs to batch.
+                Defaults to all child jobs.
+        """
+        size = max(1, size)
+        batch: List[DNGJob] = []
+        for job in self.jobs if jobs is None else jobs:
+            if batch and (len(batch) >= size or job.destination_root != batch[0].destination_root):
+                yield batch
+                batch = []
+            batch.append(job)
+        if batch:
+            yield batch
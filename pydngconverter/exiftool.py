@@ -0,0 +1,147 @@
+"""PyDNGConverter ExifTool module.
+
+Manages long-lived exiftool processes (via `-stay_open`)
+to avoid paying perl interpreter startup for each image.
+"""
+
+import asyncio
+import logging
+import itertools
+import contextlib
+from typing import List, Union, Optional, AsyncIterator
+from pathlib import Path
+
+logger = logging.getLogger("pydngconverter").getChild("exiftool")
+
+# read size used when collecting exiftool output.
+READ_CHUNK_SIZE = 2**16
+
+
+class ExifTool:
+    """Persistent exiftool process.
+
+    Commands are written to exiftool's stdin as an argfile
+    and output is read until the `{readyN}` sentinel.
+
+    Args:
+        executable: Path to exiftool executable.
+    """
+
+    def __init__(self, executable: Union[str, Path]):
+        self.executable = executable
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._counter = itertools.count(1)
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self):
+        """Start exiftool process."""
+        if self.running:
+            return
+        logger.debug("starting exiftool process: %s", self.executable)
+        self._proc = await asyncio.create_subprocess_exec(
+            self.executable,
+            "-stay_open",
+            "True",
+            "-@",
+            "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def execute(self, *args: str) -> bytes:
+        """Execute exiftool command.
+
+        Args:
+            *args: exiftool arguments, one per argfile line.
+
+        Returns:
+            Output of command.
+        """
+        await self.start()
+        cmd_id = next(self._counter)
+        command = "\n".join([*args, f"-execute{cmd_id}", ""])
+        try:
+            self._proc.stdin.write(command.encode())
+            await self._proc.stdin.drain()
+            sentinel = f"{{ready{cmd_id}}}".encode()
+            buffer = bytearray()
+            while True:
+                chunk = await self._proc.stdout.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    await self.close()
+                    raise RuntimeError(f"exiftool exited unexpectedly while executing: {args}")
+                buffer.extend(chunk)
+                for ending in (b"\n", b"\r\n"):
+                    if buffer.endswith(sentinel + ending):
+                        return bytes(buffer[: -(len(sentinel) + len(ending))])
+        except (Exception, asyncio.CancelledError):
+            # the next command would read the output of the abandoned one.
+            self._kill()
+            raise
+
+    def _kill(self):
+        """Kill exiftool process; it is restarted on next use."""
+        if self.running:
+            logger.debug("killing exiftool process: %s", self._proc.pid)
+            self._proc.kill()
+        self._proc = None
+
+    async def close(self):
+        """Stop exiftool process."""
+        if not self.running:
+            self._proc = None
+            return
+        logger.debug("stopping exiftool process: %s", self._proc.pid)
+        try:
+            self._proc.stdin.write(b"-stay_open\nFalse\n")
+            await self._proc.stdin.drain()
+            await asyncio.wait_for(self._proc.wait(), timeout=5)
+        except (OSError, asyncio.TimeoutError):
+            self._proc.kill()
+            await self._proc.wait()
+        self._proc = None
+
+
+class ExifToolPool:
+    """Pool of persistent exiftool processes.
+
+    Processes are started lazily on first use and
+    each handles a single command at a time.
+
+    Args:
+        executable: Path to exiftool executable.
+        size: Number of exiftool processes.
+    """
+
+    def __init__(self, executable: Union[str, Path], size: int = 1):
+        self.executable = executable
+        self.size = max(1, size)
+        self._tools: List[ExifTool] = [ExifTool(executable) for _ in range(self.size)]
+        self._idle: Optional[asyncio.Queue] = None
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ExifTool]:
+        """Acquire an idle exiftool process."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for tool in self._tools:
+                self._idle.put_nowait(tool)
+        tool = await self._idle.get()
+        try:
+            yield tool
+        finally:
+            self._idle.put_nowait(tool)
+
+    async def execute(self, *args: str) -> bytes:
+        """Execute exiftool command on the next idle process."""
+        async with self.acquire() as tool:
+            return await tool.execute(*args)
+
+    async def close(self):
+        """Stop all exiftool processes."""
+        await asyncio.gather(*(tool.close() for tool in self._tools))
+        self._idle = None
@@ -90,6 +90,6 @@ class LossyCompression(CliFlag):
 
     @property
     def flag(self):
-        if self == Compression.YES:
+        if self == LossyCompression.YES:
             return "-lossy"
         return ""
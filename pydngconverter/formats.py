@@ -0,0 +1,153 @@
+"""PyDNGConverter formats module.
+
+Detects raw image formats, so non-raw files (sidecars, videos,
+previously converted DNGs, ...) are never handed to the converter.
+
+Known extensions are used as a fast path, all other files
+are identified by sniffing their header bytes.
+"""
+
+import struct
+import logging
+from typing import Union, Optional
+from pathlib import Path
+
+from pydngconverter import tiff
+from pydngconverter.tiff import Tag
+
+logger = logging.getLogger("pydngconverter").getChild("formats")
+
+# number of bytes read when sniffing a file.
+SNIFF_SIZE = 4096
+
+RAW_EXTENSIONS = {
+    ".3fr",
+    ".ari",
+    ".arw",
+    ".bay",
+    ".cr2",
+    ".cr3",
+    ".crw",
+    ".dcr",
+    ".erf",
+    ".fff",
+    ".iiq",
+    ".k25",
+    ".kdc",
+    ".mef",
+    ".mos",
+    ".mrw",
+    ".nef",
+    ".nrw",
+    ".orf",
+    ".pef",
+    ".raf",
+    ".rw2",
+    ".rwl",
+    ".sr2",
+    ".srf",
+    ".srw",
+    ".x3f",
+}
+
+NON_RAW_EXTENSIONS = {
+    ".dng",
+    ".xmp",
+    ".pp3",
+    ".dop",
+    ".thm",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".heic",
+    ".heif",
+    # exports and scans commonly carry camera make info, but are not raw.
+    ".tif",
+    ".tiff",
+    ".mov",
+    ".mp4",
+    ".m4v",
+    ".mts",
+    ".avi",
+    ".lrv",
+    ".wav",
+    ".mp3",
+    ".txt",
+    ".json",
+    ".xml",
+    ".db",
+    ".ini",
+}
+
+# (offset, magic bytes, format) of non-tiff raw containers.
+MAGIC_SIGNATURES = [
+    (0, b"FUJIFILMCCD-RAW ", "raf"),
+    (4, b"ftypcrx ", "cr3"),
+    (0, b"II\x1a\x00\x00\x00HEAPCCDR", "crw"),
+    (0, b"\x00MRM", "mrw"),
+    (0, b"FOVb", "x3f"),
+]
+
+
+def sniff(header: bytes) -> Optional[str]:
+    """Identify raw format from header bytes.
+
+    TIFF based files are considered raw if they carry
+    camera make info and are not DNGs. As plain TIFFs (i.e. exports)
+    may carry make info too, `detect` never sniffs `.tif` files.
+
+    Args:
+        header: Leading bytes of file.
+
+    Returns:
+        Raw format name, or None if not a raw image.
+    """
+    for offset, magic, name in MAGIC_SIGNATURES:
+        if header[offset : offset + len(magic)] == magic:
+            return name
+    try:
+        reader = tiff.TiffReader(header)
+    except tiff.TiffError:
+        return None
+    if reader.magic == 0x55:
+        return "rw2"
+    if reader.magic != 42:
+        return "orf"
+    if header[8:11] == b"CR\x02":
+        return "cr2"
+    try:
+        ifd, _ = reader.read_ifd(reader.first_ifd)
+    except struct.error:
+        return None
+    if Tag.DNG_VERSION in ifd or Tag.MAKE not in ifd:
+        return None
+    return "tiff"
+
+
+def detect(path: Union[str, Path]) -> Optional[str]:
+    """Detect raw format of file.
+
+    Args:
+        path: Path to file.
+
+    Returns:
+        Raw format name, or None if not a raw image.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in RAW_EXTENSIONS:
+        return suffix.lstrip(".")
+    if suffix in NON_RAW_EXTENSIONS:
+        return None
+    try:
+        with open(path, "rb") as f:
+            header = f.read(SNIFF_SIZE)
+    except OSError as e:
+        logger.warning("failed to read %s: %s", path, e)
+        return None
+    return sniff(header)
+
+
+def is_raw(path: Union[str, Path]) -> bool:
+    """Check if file is a raw image."""
+    return detect(path) is not None
@@ -0,0 +1,168 @@
+"""PyDNGConverter journal module.
+
+Append-only record of job progress, so an interrupted run
+can be resumed without redoing completed jobs.
+
+Each line of the journal is a JSON object holding a job's source,
+its new state and a timestamp. Entries are appended to a buffered
+file and fsync'ed in batches, bounding both the per-entry cost and the
+number of entries lost in a crash (which are simply redone on resume).
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from enum import Enum
+from typing import IO, Dict, Union, Optional
+from pathlib import Path
+
+from pydngconverter.dngconverter import RESERVED_PREFIX, DNGJob
+
+logger = logging.getLogger("pydngconverter").getChild("journal")
+
+JOURNAL_FILENAME = f"{RESERVED_PREFIX}-journal.jsonl"
+
+
+class JobState(str, Enum):
+    """Journaled job states."""
+
+    QUEUED = "queued"
+    STARTED = "started"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Journal:
+    """Append-only job journal.
+
+    Safe to write from multiple threads.
+
+    Args:
+        path: Path to journal file.
+        sync_every: Number of entries between fsyncs.
+            While `run` is running, these are done by it, off the event loop.
+        sync_interval: Seconds between fsyncs of pending entries (see `run`).
+    """
+
+    def __init__(self, path: Union[str, Path], sync_every: int = 1024, sync_interval: float = 1.0):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.states: Dict[str, JobState] = {}
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._due: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def replay(path: Union[str, Path]) -> Dict[str, JobState]:
+        """Read last state of each job from journal file.
+
+        A truncated trailing entry (i.e. from a crash mid-write) is ignored.
+        """
+        states: Dict[str, JobState] = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        states[entry["source"]] = JobState(entry["state"])
+                    except (ValueError, KeyError):
+                        logger.debug("ignoring malformed journal entry: %r", line)
+        except FileNotFoundError:
+            pass
+        return states
+
+    def open(self, resume: bool = False) -> "Journal":
+        """Open journal for appending.
+
+        Args:
+            resume: Keep state of previous run, compacting it to
+                a single entry per completed job. Otherwise, the journal is truncated.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.states = self.replay(self.path) if resume else {}
+        self.states = {s: state for s, state in self.states.items() if state == JobState.COMPLETED}
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            for source, state in self.states.items():
+                f.write(self._format(source, state) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a")
+        logger.debug("opened journal %s (%s completed)", self.path, len(self.states))
+        return self
+
+    def is_completed(self, job: DNGJob) -> bool:
+        """Check if job was completed by a previous run."""
+        return self.states.get(str(job.source)) == JobState.COMPLETED
+
+    @staticmethod
+    def _format(source: str, state: JobState, **extra) -> str:
+        return json.dumps(dict(source=source, state=state.value, time=time.time(), **extra))
+
+    def record(self, job: DNGJob, state: JobState, **extra):
+        """Append state change of job.
+
+        Args:
+            job: Journaled job.
+            state: New state of job.
+            **extra: Additional JSON serializable entry data.
+        """
+        line = self._format(str(job.source), state, **extra)
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("journal is not open!")
+            self._file.write(line + "\n")
+            self._unsynced += 1
+            if self._unsynced < self.sync_every:
+                return
+            if self._loop is None:
+                self._sync()
+            elif self._unsynced == self.sync_every:
+                self._loop.call_soon_threadsafe(self._due.set)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        """Flush and fsync pending entries."""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    async def run(self):
+        """Sync pending entries in the executor until cancelled.
+
+        Syncs every `sync_interval` seconds, or as soon as `sync_every` entries are pending.
+        """
+        loop = asyncio.get_running_loop()
+        self._due = asyncio.Event()
+        self._loop = loop
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._due.wait(), self.sync_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._due.clear()
+                if self._unsynced:
+                    await loop.run_in_executor(None, self.sync)
+        finally:
+            self._loop = None
+
+    def close(self):
+        """Sync and close journal."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._sync()
+            self._file.close()
+            self._file = None
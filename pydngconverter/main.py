@@ -1,31 +1,100 @@
 """PyDNGConverter main module."""
 
+import os
+import math
+import time
 import asyncio
+import hashlib
 import logging
-import itertools
+import threading
+import concurrent.futures
 from os import PathLike
-from typing import Union, Optional
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+    Iterable,
+    Awaitable,
+    Iterator,
+    Optional,
+    Sequence,
+    AsyncIterator,
+)
 from pathlib import Path
 
-import psutil
-from rich.logging import RichHandler
-
-from pydngconverter import flags, utils, compat, dngconverter
+from pydngconverter import (
+    flags,
+    utils,
+    watch,
+    compat,
+    dedup,
+    preview,
+    exiftool,
+    journal,
+    process,
+    manifest,
+    timing,
+    verify,
+    staging,
+    scheduler,
+    thumbnail,
+    dngconverter,
+)
 from pydngconverter.dngconverter import DNGParameters
 
-try:
-    from wand.image import Image
-except ImportError as e:
-    Image = e
+logger = logging.getLogger("pydngconverter")
 
+# upper bound for adaptive batch sizing.
+# keeps converter command lines well within platform limits.
+MAX_BATCH_SIZE = 64
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[bold bright_white]%(name)s:[/][bright_black] %(message)s[/]",
-    datefmt="[%X]",
-    handlers=[RichHandler(markup=True)],
-)
-logger = logging.getLogger("pydngconverter")
+# batch size used when sizing adaptively without knowing the job count upfront.
+STREAMING_BATCH_SIZE = 8
+
+# max queued items per worker, bounds memory while scanning.
+QUEUE_SIZE_PER_WORKER = 4
+
+# number of workers sharing a single persistent exiftool process.
+EXIFTOOL_WORKERS_PER_PROCESS = 4
+
+# seconds between manifest updates while running, so long (i.e. watch) runs
+# neither lose their progress when killed nor accumulate their results in memory.
+MANIFEST_FLUSH_INTERVAL = 30.0
+
+# timings of finished jobs kept for the summary when watching.
+WATCH_TIMING_HISTORY = 4096
+
+LOG_FORMAT = "[bold bright_white]%(name)s:[/][bright_black] %(message)s[/]"
+
+_log_handler: Optional[logging.Handler] = None
+
+
+def setup_logging(level: int = logging.INFO, handler: Optional[logging.Handler] = None):
+    """Log pydngconverter's progress to the console.
+
+    Logging is left to the host application unless this is called.
+    Calling it again replaces the previously installed handler.
+
+    Args:
+        level: Level of pydngconverter's logger.
+        handler: Handler to install.
+            Defaults to a `rich.logging.RichHandler` rendering log markup.
+    """
+    global _log_handler
+    if handler is None:
+        from rich.logging import RichHandler
+
+        handler = RichHandler(markup=True)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="[%X]"))
+    if _log_handler is not None:
+        logger.removeHandler(_log_handler)
+    _log_handler = handler
+    logger.addHandler(handler)
+    logger.setLevel(level)
 
 
 class DNGConverter:
@@ -35,13 +104,96 @@ class DNGConverter:
     enums and such to make it easier to use.
 
     Args:
-        source: Path to source directory containing raw files
+        source: Path to source directory containing raw files,
+            or a sequence of source directories and raw files.
+            All sources share a single pool of workers. State files
+            (i.e. manifests) are stored in the first source directory
+            (or the directory of the first source file) without `dest`.
 
     Keyword Args:
         dest: Path to destination.
             Defaults to source directory.
         max_workers: Set maximum number of workers.
             Defaults to CPU core count.
+        adaptive: Adapt the number of concurrent converter processes
+            to available memory, swap activity and system load.
+            Defaults to false.
+        min_workers: Lower bound of concurrent converter processes when adaptive.
+            Defaults to 1.
+        schedule: Order in which jobs are handed to workers.
+            Not applied when `lazy_scan` is used.
+            Defaults to `scheduler.SchedulePolicy.FIFO`.
+        batch_size: Number of files passed to each converter process.
+            Pass `None` to size batches based on job and worker count.
+            Defaults to 1.
+        native_preview: Extract thumbnails by parsing raw containers directly,
+            falling back to exiftool for unsupported formats.
+            Defaults to true.
+        incremental: Skip files whose outputs are up-to-date, as recorded
+            by a manifest stored in the destination (or source) directory.
+            Defaults to false.
+        content_hash: When incremental, compare content hashes of sources
+            whose mtime changed before reconverting them.
+            Defaults to false.
+        job_timeout: Seconds a converter process may take per job,
+            plus `timeout_per_mb` per megabyte of source.
+            The converter's process group is killed on timeout.
+            Pass `None` to disable timeouts.
+            Defaults to 120 seconds.
+        timeout_per_mb: Additional timeout seconds per source megabyte.
+            Defaults to 2 seconds.
+        retries: Number of retries of a failed conversion.
+            Files of a failed batch are retried individually, so
+            a single bad file cannot fail (or stall) its entire batch.
+            Defaults to 2.
+        retry_backoff: Seconds before the first retry, doubled on each subsequent retry.
+            Defaults to 1 second.
+        staging_dir: Stage sources and outputs through a scratch directory
+            within this local directory (i.e. tmpfs or SSD). Sources are copied
+            to scratch ahead of conversion, and outputs are moved to their
+            destinations (with an atomic rename) once finished.
+            Useful when sources or destinations are on network mounts.
+            Defaults to no staging.
+        staging_capacity: Maximum bytes of scratch space in use when staging.
+            Defaults to 4GiB.
+        verify_output: Verify the TIFF structure of each converted DNG (see `verify`),
+            failing and retrying jobs with missing or truncated outputs.
+            Defaults to true.
+        persistent_wine: Keep a persistent wineserver running for the wine prefix
+            while converting, so converter and winepath launches do not pay
+            wine's startup cost. Only applies to platforms using wine.
+            Defaults to false.
+        use_journal: Record progress of each job in an append-only journal
+            stored in the destination (or source) directory.
+            Defaults to false.
+        resume: Skip jobs completed by a previous, interrupted run
+            as recorded by its journal. Implies `use_journal`.
+            Defaults to false.
+        deduplicate: Convert sources with identical contents only once, replicating
+            the outputs to the destinations of all duplicates. Sources are
+            fingerprinted by size, then a partial hash and only then a full
+            hash (see `dedup`), cached in the destination (or source) directory.
+            Not applied when `lazy_scan` is used.
+            Defaults to false.
+        hardlink_duplicates: Hardlink outputs of duplicates instead of copying
+            them, where the filesystem allows it.
+            Defaults to true.
+        raw_only: Skip source files that are not raw images,
+            such as sidecars, videos or existing DNGs.
+            Defaults to true.
+        lazy_scan: Discover source files while converting, instead of
+            scanning the source directory upfront.
+            Defaults to false.
+        timing_hook: Called with each job's `timing.JobTimings` once it is done.
+        image_workers: Size of the executor shared by all CPU-bound image work
+            (thumbnail decoding/resizing).
+            Defaults to CPU core count.
+        image_executor: Kind of executor used for image work.
+            Defaults to `scheduler.ExecutorKind.THREAD`.
+        thumbnail_options: Size and quality of extracted thumbnails.
+            Pass a sequence to render multiple sizes from a single decode,
+            each with a distinct `name`.
+            Defaults to 10% of the embedded preview.
         debug: Enable debug logs and benchmarking.
             Defaults to false.
         compression (flags.DNGVersion): Enable DNG compression.
@@ -65,13 +217,41 @@ class DNGConverter:
         FileNotFoundError: Executable program cannot be found.
         NotADirectoryError: Source directory does not exist
              or is not a directory.
+        ValueError: No sources were given.
     """
 
     def __init__(
         self,
-        source: Union[str, Path],
+        source: Union[str, Path, Sequence[Union[str, Path]]],
         dest: Optional[PathLike] = None,
         max_workers=None,
+        adaptive: bool = False,
+        min_workers: Optional[int] = None,
+        schedule: scheduler.SchedulePolicy = scheduler.SchedulePolicy.FIFO,
+        batch_size: Optional[int] = 1,
+        native_preview: bool = True,
+        incremental: bool = False,
+        content_hash: bool = False,
+        job_timeout: Optional[float] = 120.0,
+        timeout_per_mb: float = 2.0,
+        retries: int = 2,
+        retry_backoff: float = 1.0,
+        staging_dir: Optional[PathLike] = None,
+        staging_capacity: int = 4 * 2**30,
+        verify_output: bool = True,
+        persistent_wine: bool = False,
+        use_journal: bool = False,
+        resume: bool = False,
+        deduplicate: bool = False,
+        hardlink_duplicates: bool = True,
+        raw_only: bool = True,
+        lazy_scan: bool = False,
+        timing_hook: Optional[Callable[[timing.JobTimings], Any]] = None,
+        image_workers: Optional[int] = None,
+        image_executor: scheduler.ExecutorKind = scheduler.ExecutorKind.THREAD,
+        thumbnail_options: Union[
+            thumbnail.ThumbnailOptions, Sequence[thumbnail.ThumbnailOptions], None
+        ] = None,
         debug=False,
         **params,
     ):
@@ -84,32 +264,180 @@ class DNGConverter:
         self.bin_exec = compat.resolve_executable(
             ["Adobe DNG Converter", "dngconverter"], "PYDNG_DNG_CONVERTER"
         )
+        self.native_preview = native_preview
+        if isinstance(thumbnail_options, thumbnail.ThumbnailOptions):
+            thumbnail_options = [thumbnail_options]
+        self.thumbnail_options = list(thumbnail_options or [thumbnail.ThumbnailOptions()])
+        if len({o.name for o in self.thumbnail_options}) != len(self.thumbnail_options):
+            raise ValueError("thumbnail options must have distinct names!")
+        self.exif_exec = None
         if self.will_extract:
-            self.exif_exec = compat.resolve_executable(["exiftool"], "PYDNG_EXIF_TOOL")
-            if isinstance(Image, ImportError):
+            try:
+                self.exif_exec = compat.resolve_executable(["exiftool"], "PYDNG_EXIF_TOOL")
+            except RuntimeError:
+                if not self.native_preview:
+                    raise
+                logger.warning(
+                    "exiftool not found, only natively supported raws will have thumbnails."
+                )
+            image_cls = thumbnail.load_wand()
+            if isinstance(image_cls, ImportError):
                 raise RuntimeError(
                     "Cannot use JPEG Preview EXTRACT because wand failed to import!"
-                ) from Image
-        self.source: Path = Path(source)
-        self.source = utils.ensure_existing_dir(self.source)
-        if not self.source:
-            raise NotADirectoryError(f"{source} does not exists or is not a directory!")
-        self.source = self.source.absolute()
+                ) from image_cls
+        sources = [source] if isinstance(source, (str, PathLike)) else list(source)
+        if not sources:
+            raise ValueError("no sources given!")
+        self.sources: List[Path] = []
+        for src in sources:
+            path = Path(src)
+            if not path.is_file():
+                path = utils.ensure_existing_dir(path)
+                if not path:
+                    raise NotADirectoryError(f"{src} does not exists or is not a directory!")
+            self.sources.append(path.absolute())
+        self.source: Path = self.sources[0]
+        if not self.source.is_dir():
+            self.source = self.source.parent
         self.job = dngconverter.DNGBatchJob(
-            source_directory=self.source, dest_directory=Path(dest) if dest else None
+            source_directory=self.source,
+            sources=self.sources,
+            dest_directory=Path(dest) if dest else None,
+            lazy=lazy_scan,
+            raw_only=raw_only,
+            thumbnails=self.thumbnail_options,
         )
-        self.max_workers = max_workers or psutil.cpu_count()
-        self._queue = asyncio.Queue()
+        self.max_workers = max_workers or os.cpu_count()
+        self.adaptive = adaptive
+        if self.adaptive:
+            self._limiter = scheduler.AdaptiveLimiter(
+                min_workers or 1, self.max_workers, initial=self.max_workers // 2
+            )
+        else:
+            self._limiter = scheduler.AdaptiveLimiter(self.max_workers, self.max_workers)
+        self.schedule = schedule
+        if self.job.lazy and self.schedule != scheduler.SchedulePolicy.FIFO:
+            logger.warning("scheduling policy %s is ignored with lazy scanning.", self.schedule)
+        self.deduplicate = deduplicate
+        if self.job.lazy and self.deduplicate:
+            logger.warning("dedup is ignored with lazy scanning.")
+        self.hardlink_duplicates = hardlink_duplicates
+        self._duplicates: Dict[Path, List[dngconverter.DNGJob]] = {}
+        self._in_flight: Set[Path] = set()
+        # destination -> source of the job queued first with it.
+        self._claims: Dict[Path, Path] = {}
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.timing_hook = timing_hook
+        self.timings = timing.TimingCollector(hook=timing_hook)
+        self._outcomes: Dict[Path, dngconverter.DNGJobResult] = {}
+        self._results: Optional[asyncio.Queue] = None
+        self.content_hash = content_hash
+        self.resume = resume
+        self._wineserver: Optional[compat.WineServer] = None
+        if persistent_wine and compat.Platform.get().is_nix:
+            self._wineserver = compat.WineServer()
+        self.job_timeout = job_timeout
+        self.timeout_per_mb = timeout_per_mb
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.verify_output = verify_output
+        self._stager: Optional[staging.Stager] = None
+        if staging_dir:
+            self._stager = staging.Stager(staging_dir, staging_capacity)
+        self._writes: Set[asyncio.Task] = set()
+        self.use_journal = use_journal or resume
+        self._journal: Optional[journal.Journal] = None
+        # created per run, so converters can be created outside of the event loop.
+        self._queue: Optional[asyncio.Queue] = None
+        self.image_workers = image_workers or os.cpu_count()
+        self.image_executor = image_executor
+        self._image_pool: Optional[concurrent.futures.Executor] = None
+        self._exif_pool: Optional[exiftool.ExifToolPool] = None
+        if self.exif_exec:
+            self._exif_pool = exiftool.ExifToolPool(
+                self.exif_exec, size=math.ceil(self.max_workers / EXIFTOOL_WORKERS_PER_PROCESS)
+            )
+
+    def _staged(self, job: dngconverter.DNGJob) -> Optional[staging.StagedJob]:
+        return self._stager.get(job) if self._stager is not None else None
+
+    def _output_path(self, job: dngconverter.DNGJob, destination: Optional[Path] = None) -> Path:
+        """Path that output (defaults to DNG) of job is written to, staged or final."""
+        destination = job.destination if destination is None else destination
+        staged = self._staged(job)
+        return staged.output(destination) if staged else destination
+
+    def _collision(self, job: dngconverter.DNGJob) -> Optional[FileExistsError]:
+        """Error of job if another source of this run has the same destination."""
+        claim = self._claims.get(job.destination)
+        if claim is None or claim == job.source:
+            return None
+        return FileExistsError(f"{job.destination} is also the destination of {claim}")
+
+    def _outcome(self, job: dngconverter.DNGJob) -> dngconverter.DNGJobResult:
+        if job.source not in self._outcomes:
+            self._outcomes[job.source] = dngconverter.DNGJobResult(job)
+        return self._outcomes[job.source]
 
     @property
     def will_extract(self) -> bool:
         """Whether to create thumbnail extraction jobs or not."""
         return self.parameters.jpeg_preview == flags.JPEGPreview.EXTRACT
 
+    @property
+    def digest(self) -> str:
+        """Digest of conversion parameters, including thumbnail specs when extracting."""
+        if not self.will_extract:
+            return self.parameters.digest
+        specs = [self.parameters.digest, *(repr(o) for o in self.thumbnail_options)]
+        return hashlib.sha1("\0".join(specs).encode()).hexdigest()
+
+    @property
+    def manifest_path(self) -> Path:
+        """Path to incremental conversion manifest."""
+        root = self.job.dest_directory or self.source
+        return root / manifest.MANIFEST_FILENAME
+
+    @property
+    def journal_path(self) -> Path:
+        """Path to job journal."""
+        root = self.job.dest_directory or self.source
+        return root / journal.JOURNAL_FILENAME
+
+    @property
+    def fingerprint_cache_path(self) -> Path:
+        """Path to dedup fingerprint cache."""
+        root = self.job.dest_directory or self.source
+        return root / dedup.FINGERPRINT_CACHE_FILENAME
+
+    def get_batch_size(self, job_count: Optional[int] = None) -> int:
+        """Determine number of files to pass per converter process.
+
+        If no batch size was provided, jobs are spread out so each
+        worker receives a few batches (to balance load), capped at `MAX_BATCH_SIZE`.
+
+        Args:
+            job_count: Number of jobs to batch.
+                Defaults to all jobs.
+        """
+        if self.batch_size:
+            return self.batch_size
+        if job_count is None and self.job.lazy:
+            return STREAMING_BATCH_SIZE
+        job_count = len(self.job.jobs) if job_count is None else job_count
+        per_worker = math.ceil(job_count / (self.max_workers * 4))
+        return max(1, min(per_worker, MAX_BATCH_SIZE))
+
+    async def _run_image_task(self, fn: Callable, *args):
+        """Run CPU-bound image work in the shared image executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._image_pool, fn, *args)
+
     async def _write_thumbnail(
         self, *, job: dngconverter.DNGJob = None, image_bytes=None, log=None, **kwargs
     ):
-        """Writes thumbnail from bytes extracted from raw image.
+        """Writes thumbnails from bytes extracted from raw image.
 
         Args:
             job: current conversion job.
@@ -119,56 +447,62 @@ class DNGConverter:
         log = log or logger
         log.debug("starting write thumbnail: %s", job.thumbnail_filename)
 
-        @utils.force_async
-        def _write(image_blob, img_dest):
-            with Image(blob=image_blob) as img:
-                img.resize(int(img.width * 0.10), int(img.height * 0.10))
-                img.save(filename=str(img_dest))
-
-        await _write(image_bytes, job.thumbnail_destination)
-        log.info("[bold cyan]wrote thumbnail:[/][bold white] %s[/]", job.thumbnail_filename)
+        destinations = job.thumbnail_destinations
+        paths = [self._output_path(job, dest) for dest in destinations]
+        outputs = list(zip(paths, job.thumbnails or self.thumbnail_options))
+        await self._run_image_task(thumbnail.render_pyramid, image_bytes, outputs)
+        if self._staged(job):
+            loop = asyncio.get_running_loop()
+            for path, dest in zip(paths, destinations):
+                await loop.run_in_executor(None, staging.Stager.commit, path, dest)
+        for dest in destinations:
+            log.info("[bold cyan]wrote thumbnail:[/][bold white] %s[/]", dest.name)
 
     async def extract_thumbnail(
         self, *, job: dngconverter.DNGJob = None, log=None, **kwargs
-    ) -> Path:
-        """Extract jpeg thumbnail from exif data.
+    ) -> List[Path]:
+        """Extract jpeg thumbnail from raw image.
 
-        Required `exiftool` to be installed.
+        The embedded preview is located natively (see `preview`) when possible.
+        Otherwise, `exiftool` is required. Commands are sent to
+        a pool of persistent exiftool processes shared by all workers.
 
         Args:
             job: DNG Converter job.
             log: Logger to use.
 
         Returns:
-            Path to thumbnail.
+            Paths to thumbnails, empty if no preview could be found.
         """
         log = log or logger
+        if self._collision(job) is not None:
+            return []
 
         log.info(
             "[bold white]extracting raw thumbnail:[/] [bold grey58]%s => %s[/]",
             job.source.name,
             job.thumbnail_filename,
         )
-        exif_args = ["-b", "-previewImage", str(job.source)]
-        exif_proc = await asyncio.create_subprocess_exec(
-            self.exif_exec,
-            *exif_args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await exif_proc.communicate()
-        self._queue.put_nowait(
-            (
-                job,
-                self._write_thumbnail,
-                dict(image_bytes=stdout),
-            )
-        )
-        log.info("[bright_black]queued thumbnail: %s[/]", job.thumbnail_filename)
-        return job.thumbnail_destination
+        image_bytes = None
+        staged = self._staged(job)
+        source = staged.source if staged else job.source
+        with self.timings.measure([job], timing.Stage.EXTRACT):
+            if self.native_preview:
+                loop = asyncio.get_running_loop()
+                image_bytes = await loop.run_in_executor(None, preview.extract_preview, source)
+            if not image_bytes and self._exif_pool:
+                log.debug("falling back to exiftool: %s", job.source.name)
+                image_bytes = await self._exif_pool.execute("-b", "-previewImage", str(source))
+        if not image_bytes:
+            log.warning("no embedded preview found: %s", job.source.name)
+            return []
+        with self.timings.measure([job], timing.Stage.THUMBNAIL):
+            await self._write_thumbnail(job=job, image_bytes=image_bytes, log=log)
+        self._outcome(job).thumbnails = job.thumbnail_destinations
+        return job.thumbnail_destinations
 
     async def convert_file(
-        self, *, destination: str = None, job: dngconverter.DNGJob = None, log=None
+        self, *, destination: Optional[str] = None, job: dngconverter.DNGJob = None, log=None
     ):
         """Execute provided conversion job.
 
@@ -176,59 +510,639 @@ class DNGConverter:
             destination: Output path.
             job: DNG Converter job to run.
             log: Logger to use.
+
+        Raises:
+            process.ProcessError: Conversion failed.
+        """
+        results = await self.convert_batch(destination=destination, job=[job], log=log)
+        if not results:
+            raise self._outcome(job).error
+        return results[0]
+
+    async def convert_batch(
+        self,
+        *,
+        destination: Optional[str] = None,
+        job: Optional[List[dngconverter.DNGJob]] = None,
+        log=None,
+    ) -> List[Path]:
+        """Execute provided conversion jobs within a single converter process.
+
+        Adobe DNG Converter accepts any number of source files,
+        so batching amortizes process (and wine) startup across jobs.
+
+        Args:
+            destination: Output path.
+            job: DNG Converter jobs to run.
+            log: Logger to use.
+
+        Returns:
+            Destination path of each job.
         """
         log = log or logger
-        log.debug("starting conversion: [b white]%s[/]", job.source.name)
-        source_path = await compat.get_compat_path(job.source)
-        log.debug("determined source path: [b white]%s[/]", source_path)
-        dng_args = [*self.parameters.iter_args, "-d", destination, str(source_path)]
+        log.debug("starting conversion of %s file(s)", len(job))
+        staged = [self._staged(j) for j in job]
+        with self.timings.measure(job, timing.Stage.PATH_TRANSLATION):
+            if destination is None:
+                root = staged[0].output_root if staged[0] else job[0].destination_root
+                destination = await compat.get_compat_path(root)
+            source_paths = await compat.get_compat_paths(
+                [s.source if s else j.source for j, s in zip(job, staged)]
+            )
+        log.debug("determined source paths: [b white]%s[/]", source_paths)
+        for _job in job:
+            log.info(
+                "[b white]converting:[/] [bold grey58]%s => %s[/]",
+                _job.source.name,
+                _job.destination_filename,
+            )
+        compat_paths = {j.source: str(p) for j, p in zip(job, source_paths)}
+        # never overwrite the output of another source.
+        errors = {j.source: e for j in job if (e := self._collision(j)) is not None}
+        pending = [j for j in job if j.source not in errors]
+        if pending:
+            errors.update(await self._convert_isolating(pending, destination, compat_paths, log))
+        for _job in job:
+            if _job.source in errors:
+                self._outcome(_job).error = errors[_job.source]
+                if self._stager is not None:
+                    self._complete(_job)
+                continue
+            if self._stager is not None:
+                task = asyncio.create_task(self._write_behind(_job, log))
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+                continue
+            self._outcome(_job).destination = _job.destination
+            log.info(
+                "[bold bright_green]finished conversion:[/][bold white] %s[/]",
+                _job.destination_filename,
+            )
+        return [_job.destination for _job in job if _job.source not in errors]
+
+    async def _write_behind(self, job: dngconverter.DNGJob, log: logging.Logger):
+        """Move staged output of job to its destination, completing the job's staging part."""
+        try:
+            path = self._output_path(job)
+            if path != job.destination:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, staging.Stager.commit, path, job.destination)
+            self._outcome(job).destination = job.destination
+            log.info(
+                "[bold bright_green]finished conversion:[/][bold white] %s[/]",
+                job.destination_filename,
+            )
+        except OSError as e:
+            log.error("[bold red]failed to move output:[/] %s (%s)", job.destination_filename, e)
+            self._outcome(job).error = e
+        finally:
+            self._complete(job)
+
+    def get_timeout(self, jobs: List[dngconverter.DNGJob]) -> Optional[float]:
+        """Determine converter timeout of jobs, scaled by their source sizes."""
+        if self.job_timeout is None:
+            return None
+        timeout = 0.0
+        for job in jobs:
+            try:
+                size = job.source.stat().st_size
+            except OSError:
+                size = 0
+            timeout += self.job_timeout + self.timeout_per_mb * size / 2**20
+        return timeout
+
+    async def _run_converter(
+        self,
+        jobs: List[dngconverter.DNGJob],
+        destination: str,
+        compat_paths: Dict[Path, str],
+        log: logging.Logger,
+    ) -> process.ProcessResult:
+        """Run a single converter process for jobs.
+
+        Raises:
+            process.ProcessError: Converter failed or timed out.
+        """
+        sources = [compat_paths[j.source] for j in jobs]
+        dng_args = [*self.parameters.iter_args, "-d", destination, *sources]
         log.debug("using converter args: %s %s", self.bin_exec, " ".join(dng_args))
-        log.info(
-            "[b white]converting:[/] [bold grey58]%s => %s[/]",
-            job.source.name,
-            job.destination_filename,
-        )
-        proc = await asyncio.create_subprocess_exec(
-            self.bin_exec, *dng_args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        await proc.wait()
-        log.info(
-            "[bold bright_green]finished conversion:[/][bold white] %s[/]", job.destination_filename
-        )
-        return job.destination
+        with self.timings.measure(jobs, timing.Stage.SLOT_WAIT):
+            await self._limiter.acquire()
+        try:
+            with self.timings.measure(jobs, timing.Stage.SPAWN):
+                if self._wineserver is not None and self._wineserver.running:
+                    # must share the persistent server's prefix.
+                    proc = await process.spawn(self.bin_exec, *dng_args, env=self._wineserver.env)
+                else:
+                    proc = await process.spawn(self.bin_exec, *dng_args)
+            with self.timings.measure(jobs, timing.Stage.CONVERT):
+                result = await process.wait(proc, timeout=self.get_timeout(jobs))
+        finally:
+            await self._limiter.release()
+        if result.stdout:
+            log.debug("converter output: %s", result.stdout.decode(errors="replace").strip())
+        return result.check()
+
+    async def _convert_isolating(
+        self,
+        jobs: List[dngconverter.DNGJob],
+        destination: str,
+        compat_paths: Dict[Path, str],
+        log: logging.Logger,
+    ) -> Dict[Path, Exception]:
+        """Convert jobs, isolating failures to individual jobs.
+
+        A failed batch is retried job by job (skipping jobs whose outputs were
+        completed before the failure), each job with up to `retries` retries
+        and exponential backoff. Jobs with invalid outputs are failed as well.
+
+        Returns:
+            Error of each failed job by source.
+        """
+        errors: Dict[Path, Exception] = {}
+        attempt = 0
+        while True:
+            started = time.time()
+            try:
+                await self._run_converter(jobs, destination, compat_paths, log)
+                failed = await self._verify_outputs(jobs, log=log)
+            except process.ProcessError as e:
+                since = started if len(jobs) > 1 else None
+                failed = {j.source: e for j in jobs}
+                if since is not None:
+                    incomplete = await self._verify_outputs(jobs, since=since)
+                    failed = dict.fromkeys(incomplete, e)
+            if not failed:
+                return errors
+            if len(jobs) > 1:
+                log.warning(
+                    "[bold yellow]batch failed (%s), retrying %s file(s) individually.[/]",
+                    next(iter(failed.values())),
+                    len(failed),
+                )
+                for _job in jobs:
+                    if _job.source in failed:
+                        errors.update(
+                            await self._convert_isolating([_job], destination, compat_paths, log)
+                        )
+                return errors
+            error = failed[jobs[0].source]
+            if attempt >= self.retries:
+                errors[jobs[0].source] = error
+                return errors
+            delay = self.retry_backoff * 2**attempt
+            attempt += 1
+            log.warning(
+                "[bold yellow]conversion failed:[/] %s (%s), retry %s/%s in %.1fs",
+                jobs[0].source.name,
+                error,
+                attempt,
+                self.retries,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def _verify_outputs(
+        self,
+        jobs: List[dngconverter.DNGJob],
+        since: Optional[float] = None,
+        log: Optional[logging.Logger] = None,
+    ) -> Dict[Path, Exception]:
+        """Verify outputs of jobs (see `verify`), when enabled.
+
+        Args:
+            jobs: Converted jobs.
+            since: Also fail outputs last modified before this timestamp.
+            log: Logger to use.
+
+        Returns:
+            Verification error of each job with an invalid output by source.
+        """
+        if not self.verify_output and since is None:
+            return {}
+
+        def _verify() -> Dict[Path, Exception]:
+            failed: Dict[Path, Exception] = {}
+            for job in jobs:
+                try:
+                    path = self._output_path(job)
+                    if since is not None and path.stat().st_mtime < since:
+                        raise verify.VerificationError("not converted")
+                    if self.verify_output:
+                        verify.verify_dng(path)
+                except (OSError, verify.VerificationError) as e:
+                    failed[job.source] = e
+            return failed
+
+        loop = asyncio.get_running_loop()
+        failed = await loop.run_in_executor(None, _verify)
+        if log is not None:
+            for source, error in failed.items():
+                log.warning("[bold red]invalid output:[/] %s (%s)", source.name, error)
+        return failed
+
+    def _complete(self, job: dngconverter.DNGJob):
+        """Publish result of job once all of its parts are done."""
+        if not self.timings.done(job):
+            return
+        result = self._outcomes.pop(job.source, None) or dngconverter.DNGJobResult(job)
+        result.timings = self.timings.pop(job)
+        if self._stager is not None:
+            self._stager.discard(job)
+        duplicates = self._duplicates.pop(job.source, None)
+        if duplicates:
+            task = asyncio.create_task(self._replicate(result, duplicates))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+        self._publish(result)
+
+    def _publish(self, result: dngconverter.DNGJobResult):
+        job = result.job
+        self._in_flight.discard(job.source)
+        if self._journal is not None:
+            if result.ok:
+                self._journal.record(job, journal.JobState.COMPLETED)
+            else:
+                self._journal.record(job, journal.JobState.FAILED, error=str(result.error))
+        if self._results is not None:
+            self._results.put_nowait(result)
+
+    async def _replicate(
+        self, result: dngconverter.DNGJobResult, duplicates: List[dngconverter.DNGJob]
+    ):
+        """Replicate outputs of job to its duplicates, publishing their results."""
+        loop = asyncio.get_running_loop()
+        for job in duplicates:
+            outcome = dngconverter.DNGJobResult(job, error=result.error)
+            if result.ok:
+                try:
+                    await loop.run_in_executor(None, self._replicate_outputs, result, outcome)
+                    logger.info(
+                        "[bold bright_green]replicated duplicate:[/][bold white] %s => %s[/]",
+                        result.job.destination_filename,
+                        job.destination,
+                    )
+                except OSError as e:
+                    logger.error(
+                        "[bold red]failed to replicate duplicate:[/] %s (%s)", job.source.name, e
+                    )
+                    outcome.error = e
+            outcome.timings = self.timings.pop(job)
+            self._publish(outcome)
+
+    def _replicate_outputs(
+        self, result: dngconverter.DNGJobResult, outcome: dngconverter.DNGJobResult
+    ):
+        job = outcome.job
+        dedup.replicate(result.destination, job.destination, self.hardlink_duplicates)
+        outcome.destination = job.destination
+        thumbnails = dict(zip(result.job.thumbnail_destinations, job.thumbnail_destinations))
+        for path in result.thumbnails:
+            dedup.replicate(path, thumbnails[path], self.hardlink_duplicates)
+            outcome.thumbnails.append(thumbnails[path])
 
     async def create_worker(self, name: str):
         """Create job execution worker.
 
+        Failures of a job are recorded on its result,
+        and do not affect other jobs.
+
         Args:
             name: friendly name for worker.
         """
         worker_log = logger.getChild(name)
-        results = []
         while True:
             try:
                 worker_log.debug("worker awaiting job (qsize: %s)...", self._queue.qsize())
                 item = await self._queue.get()
-                job, action, kwargs = item
-                worker_log.debug("received job: %s (%s)", job, action)
-                _result = await action(job=job, **kwargs, log=worker_log)
-                results.append(_result) if _result else None
-                worker_log.debug("worker finished job!")
-                self._queue.task_done()
             except asyncio.CancelledError:
                 worker_log.info("terminating...")
                 break
-        return results
+            job, action, kwargs = item
+            worker_log.debug("received job: %s (%s)", job, action)
+            jobs = job if isinstance(job, list) else [job]
+            queued_at = kwargs.pop("queued_at", None)
+            if queued_at is not None:
+                self.timings.add(jobs, timing.Stage.QUEUE_WAIT, time.perf_counter() - queued_at)
+            if self._journal is not None:
+                for _job in jobs:
+                    self._journal.record(_job, journal.JobState.STARTED)
+            try:
+                await action(job=job, **kwargs, log=worker_log)
+            except Exception as e:
+                worker_log.error(
+                    "[bold red]failed:[/] %s (%s)", ", ".join(j.source.name for j in jobs), e
+                )
+                for _job in jobs:
+                    self._outcome(_job).error = e
+            for _job in jobs:
+                self._complete(_job)
+            worker_log.debug("worker finished job!")
+            self._queue.task_done()
 
-    async def convert(self):
-        """Recursively convert all files in source directory."""
-        destination = await compat.get_compat_path(self.job.jobs[0].destination.parent)
-        # queue up jobs.
-        for job in self.job.jobs:
-            logger.debug("queueing job: %s", job.source.name)
-            self._queue.put_nowait((job, self.convert_file, dict(destination=destination)))
+    def _load_manifest(self) -> manifest.Manifest:
+        return manifest.Manifest.load(self.manifest_path, use_hash=self.content_hash)
+
+    def _update_manifest(
+        self, _manifest: manifest.Manifest, results: List[dngconverter.DNGJobResult]
+    ):
+        """Record outputs of successful jobs, forgetting failed ones.
+
+        Entries of failed jobs are discarded, as their existing
+        outputs (i.e. from a previous run) do not match their sources.
+        """
+        digest = self.digest
+        for result in results:
+            job = result.job
+            if not result.ok or not job.destination.exists():
+                _manifest.discard(job)
+                continue
+            # only the thumbnails actually written, as sources may lack a preview.
+            outputs = [job.destination, *(p for p in result.thumbnails if p.exists())]
+            _manifest.update(job, digest, outputs)
+        _manifest.save()
+
+    def _iter_pending(
+        self, _manifest: Optional[manifest.Manifest] = None
+    ) -> Iterator[dngconverter.DNGJob]:
+        """Iterate over jobs to convert.
+
+        Up-to-date jobs are skipped when incremental,
+        and jobs completed by a previous run when resuming.
+        """
+        jobs = self.job.iter_scan() if self.job.lazy else self.job.jobs
+        if self.resume and self._journal is not None:
+            jobs = self._iter_unfinished(jobs)
+        if _manifest is None:
+            yield from jobs
+            return
+        digest = self.digest
+        skipped = 0
+        for job in jobs:
+            if _manifest.is_current(job, digest):
+                skipped += 1
+            else:
+                yield job
+        logger.info("[bold white]skipped %s up-to-date file(s).[/]", skipped)
+
+    def _iter_unfinished(
+        self, jobs: Iterable[dngconverter.DNGJob]
+    ) -> Iterator[dngconverter.DNGJob]:
+        skipped = 0
+        for job in jobs:
+            if self._journal.is_completed(job):
+                skipped += 1
+            else:
+                yield job
+        logger.info("[bold white]resuming, skipped %s completed file(s).[/]", skipped)
+
+    def _dedup(self, jobs: Iterable[dngconverter.DNGJob]) -> List[dngconverter.DNGJob]:
+        """Group jobs by source contents.
+
+        Returns:
+            First job of each group, converted on behalf of its duplicates.
+        """
+        cache = dedup.FingerprintCache.load(self.fingerprint_cache_path)
+        unique, duplicates = [], 0
+        for group in dedup.group_duplicates(jobs, cache):
+            unique.append(group[0])
+            if len(group) > 1:
+                self._duplicates[group[0].source] = group[1:]
+                duplicates += len(group) - 1
+        try:
+            cache.save()
+        except OSError as e:
+            logger.warning("failed to save fingerprint cache: %s", e)
+        logger.info("[bold white]found %s duplicate file(s).[/]", duplicates)
+        return unique
+
+    def _iter_items(
+        self, jobs: Iterable[dngconverter.DNGJob], job_count: Optional[int] = None
+    ) -> Iterator[Tuple]:
+        """Iterate over queue items (job, action, kwargs) for given jobs."""
+        batch_size = self.get_batch_size(job_count)
+        logger.debug("using batch size: %s", batch_size)
+        for batch in self.job.iter_batches(batch_size, jobs=jobs):
+            logger.debug("queueing batch: %s", ", ".join(j.source.name for j in batch))
+            for job in batch:
+                self._claims.setdefault(job.destination, job.source)
+                # conversion, thumbnail extraction and staged output write-behind.
+                self.timings.expect(job, 1 + self.will_extract + (self._stager is not None))
+            yield batch, self.convert_batch, dict()
             if self.will_extract:
-                self._queue.put_nowait((job, self.extract_thumbnail, dict()))
+                for job in batch:
+                    yield job, self.extract_thumbnail, dict()
+
+    def _stage_batch(self, jobs: List[dngconverter.DNGJob], stop: threading.Event) -> bool:
+        """Copy sources of batch to scratch, blocking while scratch space is exhausted.
+
+        A batch is either staged entirely or not at all, as all
+        of its outputs are written to the same directory.
+
+        Returns:
+            False if stopped while waiting for scratch space.
+        """
+        try:
+            return self._stager.stage_batch(jobs, stop) is not None
+        except OSError as e:
+            names = ", ".join(j.source.name for j in jobs)
+            logger.warning("failed to stage %s, converting in place: %s", names, e)
+        return True
+
+    def _produce(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        stop: threading.Event,
+        _manifest: Optional[manifest.Manifest] = None,
+    ) -> List[dngconverter.DNGJob]:
+        """Feed worker queue with pending jobs.
+
+        Runs within a thread, as scanning and stat-ing sources may block (i.e. on NFS).
+        Blocks while the worker queue is full.
+
+        Returns:
+            Queued jobs.
+        """
+        pending = self._iter_pending(_manifest)
+        job_count = None
+        if not self.job.lazy:
+            if self.deduplicate:
+                pending = self._dedup(pending)
+            pending = scheduler.order_jobs(pending, self.schedule)
+            job_count = len(pending)
+        return self._feed(loop, stop, pending, job_count)
+
+    def _feed(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        stop: threading.Event,
+        jobs: Iterable[dngconverter.DNGJob],
+        job_count: Optional[int] = None,
+    ) -> List[dngconverter.DNGJob]:
+        """Stage, journal and queue jobs, blocking while the worker queue is full.
+
+        Returns:
+            Queued jobs, fewer than given if stopped.
+        """
+        queued = []
+        for item in self._iter_items(jobs, job_count):
+            if self._stager is not None and isinstance(item[0], list):
+                if not self._stage_batch(item[0], stop):
+                    return queued
+            if self._journal is not None and isinstance(item[0], list):
+                for job in item[0]:
+                    self._journal.record(job, journal.JobState.QUEUED)
+            item[2]["queued_at"] = time.perf_counter()
+            future = asyncio.run_coroutine_threadsafe(self._queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.25)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return queued
+            if isinstance(item[0], list):
+                queued.extend(item[0])
+        return queued
+
+    def _watch_jobs(
+        self, paths: List[Path], _manifest: Optional[manifest.Manifest] = None
+    ) -> List[dngconverter.DNGJob]:
+        """Create jobs for stable files reported by a watcher.
+
+        Files that are not raw, up-to-date (when incremental) or completed by
+        a previous run (when resuming) are skipped.
+        """
+        digest = self.digest
+        jobs = []
+        for path in paths:
+            job = self.job.create_job(path)
+            if job is None:
+                continue
+            if self.resume and self._journal is not None and self._journal.is_completed(job):
+                continue
+            if _manifest is not None and _manifest.is_current(job, digest):
+                continue
+            jobs.append(job)
+        return scheduler.order_jobs(jobs, self.schedule)
+
+    async def _watch(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        stop: threading.Event,
+        _manifest: Optional[manifest.Manifest],
+        debounce: float,
+        poll_interval: float,
+        backend: watch.WatchBackend,
+        until: Optional[asyncio.Event],
+    ):
+        """Feed worker queue with files written to the source directory, until stopped."""
+        debouncer = watch.Debouncer(debounce)
+        timeout = min(debounce, poll_interval)
+        async with watch.create_watcher(self.source, backend, poll_interval) as watcher:
+            logger.info("[bold white]watching for new files in:[/] %s", self.source)
+            while until is None or not until.is_set():
+                changed = await watcher.wait(timeout)
+                stable = await loop.run_in_executor(None, debouncer.update, changed)
+                # files still being converted are picked up again once their results are in.
+                busy = [p for p in stable if p in self._in_flight]
+                if busy:
+                    await loop.run_in_executor(None, debouncer.update, busy)
+                stable = [p for p in stable if p not in self._in_flight]
+                if not stable:
+                    continue
+                jobs = await loop.run_in_executor(None, self._watch_jobs, stable, _manifest)
+                if not jobs:
+                    continue
+                logger.debug("queueing %s new file(s)", len(jobs))
+                self._in_flight.update(j.source for j in jobs)
+                await loop.run_in_executor(None, self._feed, loop, stop, jobs, len(jobs))
+
+    async def iter_convert(self) -> AsyncIterator[dngconverter.DNGJobResult]:
+        """Recursively convert all files in source directory, yielding results.
+
+        Jobs are fed to workers while they are being discovered
+        (or filtered, when incremental), and each job's result is
+        yielded as soon as all of its parts are done.
+
+        Yields:
+            Result of each job, in order of completion.
+        """
+
+        async def _feed(loop, stop, _manifest):
+            await loop.run_in_executor(None, self._produce, loop, stop, _manifest)
+
+        async for result in self._iter_results(_feed):
+            yield result
+
+    async def iter_watch(
+        self,
+        debounce: float = 2.0,
+        poll_interval: float = 1.0,
+        backend: watch.WatchBackend = watch.WatchBackend.AUTO,
+        until: Optional[asyncio.Event] = None,
+    ) -> AsyncIterator[dngconverter.DNGJobResult]:
+        """Convert files as they are written to the source directory, yielding results.
+
+        Files already present are converted first. Afterwards, each new
+        or modified raw file is queued once it has been stable for `debounce`
+        seconds. Workers, the exiftool pool and the wineserver stay up
+        between arrivals. Dedup is not applied.
+
+        Only a single source directory can be watched.
+
+        Args:
+            debounce: Seconds a file's size and mtime must be unchanged before it is queued.
+            poll_interval: Seconds between rescans when polling.
+            backend: Method used to detect new files (see `watch`).
+            until: Stop watching once set, finishing queued jobs.
+                Otherwise, watches until the iteration is closed or cancelled.
+
+        Yields:
+            Result of each job, in order of completion.
+
+        Raises:
+            ValueError: Multiple sources, or a source file, were given.
+        """
+        if self.sources != [self.source]:
+            raise ValueError("only a single source directory can be watched!")
+
+        async def _feed(loop, stop, _manifest):
+            await self._watch(loop, stop, _manifest, debounce, poll_interval, backend, until)
+
+        async for result in self._iter_results(_feed, timing_history=WATCH_TIMING_HISTORY):
+            yield result
+
+    async def _iter_results(
+        self, feed: Callable[..., Awaitable], timing_history: Optional[int] = None
+    ) -> AsyncIterator[dngconverter.DNGJobResult]:
+        """Run workers fed by given coroutine function, yielding results.
+
+        Args:
+            feed: Called with the event loop, a stop event and the manifest (if incremental).
+                Feeds the worker queue, returning once all jobs are queued.
+            timing_history: Number of finished jobs whose timings are kept for the summary.
+                Defaults to all of them.
+        """
+        loop = asyncio.get_running_loop()
+        self.timings = timing.TimingCollector(hook=self.timing_hook, history=timing_history)
+        self._outcomes = {}
+        self._duplicates = {}
+        self._in_flight = set()
+        self._claims = {}
+        self._queue = asyncio.Queue(maxsize=self.max_workers * QUEUE_SIZE_PER_WORKER)
+        self._results = asyncio.Queue()
+        _manifest = None
+        if self.incremental:
+            _manifest = await loop.run_in_executor(None, self._load_manifest)
+        if self._wineserver is not None:
+            await loop.run_in_executor(None, self._wineserver.start)
+        if self._stager is not None:
+            await loop.run_in_executor(None, self._stager.open)
+        if self.use_journal:
+            self._journal = journal.Journal(self.journal_path)
+            await loop.run_in_executor(None, self._journal.open, self.resume)
 
         tasks = []
         logger.debug("creating %s workers!", self.max_workers)
@@ -237,17 +1151,114 @@ class DNGConverter:
             task = asyncio.create_task(self.create_worker(f"worker{i}"))
             tasks.append(task)
 
-        # wait for all jobs to be completed.
-        await self._queue.join()
+        if self.adaptive:
+            tasks.append(asyncio.create_task(self._limiter.run()))
+
+        if self._journal is not None:
+            tasks.append(asyncio.create_task(self._journal.run()))
+
+        if self.will_extract:
+            self._image_pool = scheduler.create_executor(self.image_executor, self.image_workers)
+
+        stop = threading.Event()
+        completed: List[dngconverter.DNGJobResult] = []
+
+        async def _flush_manifest():
+            while True:
+                await asyncio.sleep(MANIFEST_FLUSH_INTERVAL)
+                if not completed:
+                    continue
+                results = completed[:]
+                completed.clear()
+                update = loop.run_in_executor(None, self._update_manifest, _manifest, results)
+                try:
+                    await asyncio.shield(update)
+                except asyncio.CancelledError:
+                    # never race the final update.
+                    await update
+                    raise
 
-        logger.debug("queue empty! terminating workers...")
-        for task in tasks:
-            task.cancel()
+        if _manifest is not None:
+            tasks.append(asyncio.create_task(_flush_manifest()))
 
-        # wait until everything is cleaned up.
-        _results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def _run():
+            try:
+                # queue up jobs.
+                await feed(loop, stop, _manifest)
+                # wait for all jobs to be completed.
+                await self._queue.join()
+                # and all staged outputs to be moved, and duplicates replicated.
+                while self._writes:
+                    await asyncio.gather(*self._writes)
+            finally:
+                self._results.put_nowait(None)
+
+        runner = asyncio.create_task(_run())
+        tasks.append(runner)
+        try:
+            while True:
+                result = await self._results.get()
+                if result is None:
+                    break
+                completed.append(result)
+                yield result
+            await runner
+        finally:
+            stop.set()
+            logger.debug("queue empty! terminating workers...")
+            for task in [*tasks, *self._writes]:
+                task.cancel()
+            # wait until everything is cleaned up.
+            await asyncio.gather(*tasks, *self._writes, return_exceptions=True)
+            if self._exif_pool:
+                await self._exif_pool.close()
+            if self._image_pool:
+                await loop.run_in_executor(None, self._image_pool.shutdown)
+                self._image_pool = None
+            if _manifest is not None:
+                await loop.run_in_executor(None, self._update_manifest, _manifest, completed)
+            if self._journal is not None:
+                await loop.run_in_executor(None, self._journal.close)
+                self._journal = None
+            if self._wineserver is not None:
+                self._wineserver.stop()
+            if self._stager is not None:
+                await loop.run_in_executor(None, self._stager.close)
 
-        results = list(itertools.chain.from_iterable(_results))
+        self.timings.log_summary(logger)
+        if self.job.skipped:
+            logger.info(
+                "[bold white]skipped %s non-raw file(s):[/] %s",
+                sum(self.job.skipped.values()),
+                self.job.skipped,
+            )
+
+    async def close(self):
+        """Stop exiftool processes and release the wineserver.
+
+        Both are released when a run finishes, so this is only needed for runs
+        abandoned before cleaning up (i.e. a result iterator that was not exhausted).
+        """
+        if self._exif_pool:
+            await self._exif_pool.close()
+        if self._wineserver is not None:
+            self._wineserver.stop()
+
+    async def __aenter__(self) -> "DNGConverter":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def convert(self):
+        """Recursively convert all files in source directory.
+
+        Returns:
+            Paths of all generated files.
+        """
+        results = []
+        async for result in self.iter_convert():
+            results.extend(result.outputs)
         logger.debug("Job completed. Results: %s", results)
         logger.info(
             "[bold bright_green]Job completed.[/][bold white] %s files were generated.[/]",
@@ -0,0 +1,113 @@
+"""PyDNGConverter manifest module.
+
+Persists the state of completed conversions so
+up-to-date outputs can be skipped on subsequent runs.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Union
+from pathlib import Path
+
+from pydngconverter import utils
+from pydngconverter.dngconverter import RESERVED_PREFIX, DNGJob
+
+logger = logging.getLogger("pydngconverter").getChild("manifest")
+
+MANIFEST_FILENAME = f"{RESERVED_PREFIX}-manifest.json"
+MANIFEST_VERSION = 1
+
+
+class Manifest:
+    """Conversion manifest.
+
+    Each entry records the source's size, mtime (and optionally content hash),
+    the converter parameters digest, and the produced outputs.
+
+    Args:
+        path: Path to manifest file.
+        use_hash: Compare content hashes when a source's size or mtime changed.
+    """
+
+    def __init__(self, path: Union[str, Path], use_hash: bool = False):
+        self.path = Path(path)
+        self.use_hash = use_hash
+        self.entries: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path], use_hash: bool = False) -> "Manifest":
+        """Load manifest from path.
+
+        A missing or unreadable manifest results in an empty one.
+        """
+        manifest = cls(path, use_hash=use_hash)
+        try:
+            data = json.loads(manifest.path.read_text())
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as e:
+            logger.warning("ignoring unreadable manifest %s: %s", manifest.path, e)
+            return manifest
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("ignoring outdated manifest: %s", manifest.path)
+            return manifest
+        manifest.entries = data.get("entries", {})
+        logger.debug("loaded %s manifest entries from %s", len(manifest.entries), manifest.path)
+        return manifest
+
+    def save(self):
+        """Atomically write manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "entries": self.entries}))
+        os.replace(tmp_path, self.path)
+        logger.debug("saved %s manifest entries to %s", len(self.entries), self.path)
+
+    def is_current(self, job: DNGJob, digest: str) -> bool:
+        """Check if job's outputs are up-to-date.
+
+        Args:
+            job: Conversion job.
+            digest: Digest of converter parameters.
+        """
+        entry = self.entries.get(str(job.source))
+        if entry is None or entry["digest"] != digest:
+            return False
+        outputs = entry["outputs"]
+        if str(job.destination) not in outputs or not all(os.path.exists(o) for o in outputs):
+            return False
+        try:
+            stat = job.source.stat()
+        except OSError:
+            return False
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if not self.use_hash or stat.st_size != entry["size"] or not entry.get("hash"):
+            return False
+        # source was touched, but might be unchanged.
+        if utils.hash_file(job.source) != entry["hash"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def update(self, job: DNGJob, digest: str, outputs: List[Path]):
+        """Record completed job.
+
+        Args:
+            job: Conversion job.
+            digest: Digest of converter parameters.
+            outputs: Produced outputs of job.
+        """
+        stat = job.source.stat()
+        self.entries[str(job.source)] = dict(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            hash=utils.hash_file(job.source) if self.use_hash else None,
+            digest=digest,
+            outputs=[str(o) for o in outputs],
+        )
+
+    def discard(self, job: DNGJob):
+        """Remove job's entry from manifest."""
+        self.entries.pop(str(job.source), None)
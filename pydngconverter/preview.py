@@ -0,0 +1,227 @@
+"""PyDNGConverter preview module.
+
+Native extraction of embedded JPEG previews from raw images.
+
+Raw files are memory-mapped and only their container structure
+is walked, so previews can be located without spawning exiftool
+or reading the entire file.
+
+Supported containers:
+    - TIFF based raws (CR2, NEF, ARW, DNG, ORF, PEF, RW2, ...).
+    - Canon CR3 (ISO base media).
+    - Fujifilm RAF.
+"""
+
+import mmap
+import struct
+import logging
+import contextlib
+from typing import List, Tuple, Union, Iterator, Optional
+from pathlib import Path
+
+from pydngconverter import tiff
+from pydngconverter.tiff import Tag
+
+logger = logging.getLogger("pydngconverter").getChild("preview")
+
+# (offset, length) of preview within buffer.
+Span = Tuple[int, int]
+
+JPEG_SOI = b"\xff\xd8"
+
+# SOF markers of displayable (baseline, extended, progressive) jpegs.
+# lossless jpeg (SOF3) is used for raw data itself, so it is excluded.
+JPEG_DISPLAYABLE_SOF = {0xC0, 0xC1, 0xC2}
+
+RAF_MAGIC = b"FUJIFILMCCD-RAW "
+# canon uuid box containing the full size PRVW jpeg.
+CR3_PREVIEW_UUID = bytes.fromhex("eaf42b5e1c984b88b9fbb7dc406e4d16")
+OLYMPUS_MAKERNOTE = b"OLYMPUS\x00"
+
+
+def _find_sof(buffer, offset: int, length: int) -> Optional[int]:
+    """Find position of the first SOF marker of jpeg span.
+
+    Only marker segments up to the first SOF are inspected.
+    """
+    end = min(offset + length, len(buffer))
+    if length < 4 or buffer[offset : offset + 2] != JPEG_SOI:
+        return None
+    pos = offset + 2
+    while pos + 4 <= end:
+        if buffer[pos] != 0xFF:
+            return None
+        marker = buffer[pos + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return pos
+        (seg_len,) = struct.unpack_from(">H", buffer, pos + 2)
+        pos += 2 + seg_len
+    return None
+
+
+def is_displayable_jpeg(buffer, offset: int, length: int) -> bool:
+    """Check if span holds a displayable (non-lossless) jpeg."""
+    pos = _find_sof(buffer, offset, length)
+    return pos is not None and buffer[pos + 1] in JPEG_DISPLAYABLE_SOF
+
+
+def jpeg_size(buffer, offset: int = 0, length: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """Read (width, height) of jpeg span from its SOF header.
+
+    Returns:
+        Jpeg dimensions, or None if span is not a jpeg.
+    """
+    length = len(buffer) - offset if length is None else length
+    pos = _find_sof(buffer, offset, length)
+    if pos is None or pos + 9 > len(buffer):
+        return None
+    height, width = struct.unpack_from(">HH", buffer, pos + 5)
+    return width, height
+
+
+def _tiff_spans(buffer, base: int = 0) -> Iterator[Span]:
+    """Find candidate preview spans in TIFF structure."""
+    reader = tiff.TiffReader(buffer, base)
+    for ifd in reader.iter_ifds():
+        if Tag.JPEG_INTERCHANGE_FORMAT in ifd and Tag.JPEG_INTERCHANGE_FORMAT_LENGTH in ifd:
+            yield (
+                base + reader.value(ifd, Tag.JPEG_INTERCHANGE_FORMAT),
+                reader.value(ifd, Tag.JPEG_INTERCHANGE_FORMAT_LENGTH),
+            )
+        if reader.value(ifd, Tag.COMPRESSION) in (6, 7) and Tag.STRIP_OFFSETS in ifd:
+            offsets = reader.values(ifd[Tag.STRIP_OFFSETS])
+            counts = reader.values(ifd.get(Tag.STRIP_BYTE_COUNTS, ifd[Tag.STRIP_OFFSETS]))
+            if len(offsets) == 1:
+                yield base + offsets[0], counts[0]
+        if Tag.MAKER_NOTE in ifd:
+            yield from _olympus_spans(buffer, reader, ifd[Tag.MAKER_NOTE])
+
+
+def _olympus_spans(buffer, reader: tiff.TiffReader, entry: tiff.Entry) -> Iterator[Span]:
+    """Find preview span in Olympus makernotes.
+
+    Olympus stores its preview within the CameraSettings IFD,
+    with offsets relative to the start of the makernote.
+    """
+    start = entry.offset
+    if bytes(buffer[start : start + 8]) != OLYMPUS_MAKERNOTE:
+        return
+    byteorder = "<" if bytes(buffer[start + 8 : start + 10]) == b"II" else ">"
+    mn_reader = tiff.TiffReader.headerless(buffer, start, byteorder)
+    ifd, _ = mn_reader.read_ifd(12)
+    settings = ifd.get(0x2020)
+    if settings is None:
+        return
+    if settings.type == 7:
+        settings_offset = settings.offset - start
+    else:
+        settings_offset = mn_reader.values(settings)[0]
+    settings_ifd, _ = mn_reader.read_ifd(settings_offset)
+    preview_start = mn_reader.value(settings_ifd, 0x0101)
+    preview_length = mn_reader.value(settings_ifd, 0x0102)
+    if preview_start and preview_length:
+        yield start + preview_start, preview_length
+
+
+def _cr3_spans(buffer) -> Iterator[Span]:
+    """Find preview span in CR3 (ISO base media) container."""
+    pos = 0
+    size = len(buffer)
+    while pos + 8 <= size:
+        box_size, box_type = struct.unpack_from(">L4s", buffer, pos)
+        header = 8
+        if box_size == 1:
+            (box_size,) = struct.unpack_from(">Q", buffer, pos + 8)
+            header = 16
+        elif box_size == 0:
+            box_size = size - pos
+        if box_size < header:
+            return
+        if box_type == b"uuid" and bytes(buffer[pos + header : pos + header + 16]) == (
+            CR3_PREVIEW_UUID
+        ):
+            # uuid payload: 8 byte header followed by PRVW box.
+            prvw = pos + header + 16 + 8
+            if bytes(buffer[prvw + 4 : prvw + 8]) == b"PRVW":
+                (jpeg_length,) = struct.unpack_from(">L", buffer, prvw + 20)
+                yield prvw + 24, jpeg_length
+            return
+        pos += box_size
+
+
+def _raf_spans(buffer) -> Iterator[Span]:
+    """Find preview span in Fujifilm RAF header."""
+    offset, length = struct.unpack_from(">LL", buffer, 84)
+    yield offset, length
+
+
+def find_preview(buffer) -> Optional[Span]:
+    """Locate largest embedded JPEG preview within raw image buffer.
+
+    Args:
+        buffer: Raw image buffer.
+
+    Returns:
+        (offset, length) of preview, or None if none could be found.
+    """
+    head = bytes(buffer[:16])
+    if head.startswith(RAF_MAGIC):
+        finder = _raf_spans(buffer)
+    elif head[4:12] == b"ftypcrx ":
+        finder = _cr3_spans(buffer)
+    elif head[:2] in (b"II", b"MM"):
+        finder = _tiff_spans(buffer)
+    else:
+        return None
+    candidates: List[Span] = []
+    try:
+        for offset, length in finder:
+            if offset + length <= len(buffer) and is_displayable_jpeg(buffer, offset, length):
+                candidates.append((offset, length))
+    except (struct.error, tiff.TiffError, IndexError) as e:
+        logger.debug("failed to parse raw structure: %s", e)
+    if not candidates:
+        return None
+    return max(candidates, key=lambda span: span[1])
+
+
+@contextlib.contextmanager
+def open_preview(path: Union[str, Path]) -> Iterator[Optional[memoryview]]:
+    """Memory-map raw image and yield a view of its embedded preview.
+
+    The yielded view references the mapped file directly (no copy)
+    and is only valid within the context.
+
+    Args:
+        path: Path to raw image.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file.
+            yield None
+            return
+        with mapped:
+            span = find_preview(mapped)
+            if span is None:
+                yield None
+                return
+            offset, length = span
+            with memoryview(mapped) as view, view[offset : offset + length] as preview:
+                yield preview
+
+
+def extract_preview(path: Union[str, Path]) -> Optional[bytes]:
+    """Extract embedded JPEG preview from raw image.
+
+    Args:
+        path: Path to raw image.
+
+    Returns:
+        Preview jpeg data, or None if no preview could be found.
+    """
+    with open_preview(path) as preview:
+        if preview is None:
+            return None
+        return preview.tobytes()
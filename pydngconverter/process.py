@@ -0,0 +1,153 @@
+"""PyDNGConverter process module.
+
+Runs external programs with their output drained concurrently
+(so a chatty program never blocks on a full pipe), a capped capture
+buffer, and a timeout that kills the program's entire process group
+(i.e. wine and its children).
+"""
+
+import os
+import signal
+import asyncio
+import logging
+import subprocess
+from typing import Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger("pydngconverter").getChild("process")
+
+# maximum number of captured bytes per stream, the tail of the output is kept.
+CAPTURE_LIMIT = 64 * 1024
+READ_SIZE = 16 * 1024
+
+
+class ProcessError(RuntimeError):
+    """External program failed.
+
+    Args:
+        message: Error description.
+        result: Result of program, if it exited.
+    """
+
+    def __init__(self, message: str, result: Optional["ProcessResult"] = None):
+        super().__init__(message)
+        self.result = result
+
+
+class ProcessTimeout(ProcessError):
+    """External program timed out and was killed."""
+
+
+@dataclass
+class ProcessResult:
+    """Result of external program.
+
+    Attributes:
+        returncode: Exit code.
+        stdout: Captured tail of stdout.
+        stderr: Captured tail of stderr.
+    """
+
+    returncode: int
+    stdout: bytes = b""
+    stderr: bytes = b""
+
+    def check(self) -> "ProcessResult":
+        """Raise `ProcessError` if program exited unsuccessfully."""
+        if self.returncode != 0:
+            tail = self.stderr.decode(errors="replace").strip()[-500:]
+            raise ProcessError(f"exited with code {self.returncode}: {tail}", result=self)
+        return self
+
+
+class CappedBuffer:
+    """Byte buffer retaining only the last `limit` bytes written."""
+
+    def __init__(self, limit: int = CAPTURE_LIMIT):
+        self.limit = limit
+        self.dropped = 0
+        self._data = bytearray()
+
+    def write(self, chunk: bytes):
+        self._data += chunk
+        excess = len(self._data) - self.limit
+        if excess > 0:
+            del self._data[:excess]
+            self.dropped += excess
+
+    def getvalue(self) -> bytes:
+        return bytes(self._data)
+
+
+async def _drain(stream: Optional[asyncio.StreamReader], buffer: CappedBuffer):
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(READ_SIZE)
+        if not chunk:
+            break
+        buffer.write(chunk)
+
+
+def _kill_group(proc: asyncio.subprocess.Process):
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def spawn(program, *args, **kwargs) -> asyncio.subprocess.Process:
+    """Start program in a new process group, with piped output."""
+    if os.name == "posix":
+        kwargs.setdefault("start_new_session", True)
+    else:
+        kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+    return await asyncio.create_subprocess_exec(
+        program,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs,
+    )
+
+
+async def wait(
+    proc: asyncio.subprocess.Process,
+    timeout: Optional[float] = None,
+    capture_limit: int = CAPTURE_LIMIT,
+) -> ProcessResult:
+    """Wait for process to exit while draining its output.
+
+    Args:
+        proc: Spawned process (see `spawn`).
+        timeout: Seconds until the process group is killed.
+        capture_limit: Maximum number of captured bytes per stream.
+
+    Raises:
+        ProcessTimeout: Process did not exit in time.
+    """
+    stdout, stderr = CappedBuffer(capture_limit), CappedBuffer(capture_limit)
+    drains = asyncio.gather(_drain(proc.stdout, stdout), _drain(proc.stderr, stderr))
+    try:
+        await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("killing process group %s after %.0fs timeout", proc.pid, timeout)
+        _kill_group(proc)
+        await proc.wait()
+        raise ProcessTimeout(f"timed out after {timeout:.0f}s") from None
+    except asyncio.CancelledError:
+        _kill_group(proc)
+        raise
+    finally:
+        # descendants may hold on to the pipes, so do not wait on them forever.
+        try:
+            await asyncio.wait_for(drains, 1.0)
+        except asyncio.TimeoutError:
+            drains.cancel()
+        except asyncio.CancelledError:
+            drains.cancel()
+            raise
+    return ProcessResult(proc.returncode, stdout.getvalue(), stderr.getvalue())
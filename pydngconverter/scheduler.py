@@ -0,0 +1,200 @@
+"""PyDNGConverter scheduler module.
+
+Orders conversion jobs, limits the number of concurrent
+converter processes (adapting to available memory,
+swap activity and system load) and provides the executor
+for CPU-bound image work.
+"""
+
+import asyncio
+import logging
+import concurrent.futures
+from enum import Enum, auto
+from typing import Dict, List, Tuple, Iterable, Optional
+from pathlib import Path
+
+from pydngconverter import utils
+from pydngconverter.dngconverter import DNGJob
+
+psutil = utils.LazyModule("psutil")
+
+logger = logging.getLogger("pydngconverter").getChild("scheduler")
+
+# relative per-byte conversion cost of raw formats.
+# formats with heavier compression take longer to decode per byte.
+FORMAT_COST_WEIGHTS = {
+    ".cr3": 1.5,
+    ".raf": 1.3,
+    ".nef": 1.2,
+    ".orf": 1.2,
+    ".rw2": 1.2,
+    ".arw": 1.0,
+    ".cr2": 1.0,
+}
+
+
+class SchedulePolicy(Enum):
+    """Order in which jobs are handed to workers."""
+
+    FIFO = auto()  # filesystem order.
+    LARGEST_FIRST = auto()  # longest processing time first, by estimated cost.
+
+
+class ExecutorKind(Enum):
+    """Kind of executor used for CPU-bound image work."""
+
+    THREAD = auto()  # image libraries release the GIL while decoding/encoding.
+    PROCESS = auto()  # isolates image work from the event loop entirely.
+
+
+def create_executor(kind: ExecutorKind, size: int) -> concurrent.futures.Executor:
+    """Create bounded executor of given kind.
+
+    Args:
+        kind: Executor kind.
+        size: Maximum number of threads or processes.
+    """
+    if kind == ExecutorKind.PROCESS:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=size)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix="pydng-image")
+
+
+def estimate_cost(job: DNGJob) -> float:
+    """Estimate relative conversion cost of job from its size and format."""
+    try:
+        size = job.source.stat().st_size
+    except OSError:
+        size = 0
+    return size * FORMAT_COST_WEIGHTS.get(job.source_suffix.lower(), 1.0)
+
+
+def order_jobs(
+    jobs: Iterable[DNGJob], policy: SchedulePolicy = SchedulePolicy.FIFO
+) -> List[DNGJob]:
+    """Order jobs according to scheduling policy.
+
+    Scheduling the largest jobs first avoids a long single-worker
+    tail caused by a large file near the end of a batch.
+    Jobs are only sorted within their destination root, so jobs
+    of different roots are not interleaved (see `DNGBatchJob.iter_batches`).
+    """
+    if policy != SchedulePolicy.LARGEST_FIRST:
+        return list(jobs)
+    groups: Dict[Path, List[Tuple[float, DNGJob]]] = {}
+    for job in jobs:
+        groups.setdefault(job.destination_root, []).append((estimate_cost(job), job))
+    for group in groups.values():
+        group.sort(key=lambda item: item[0], reverse=True)
+    # groups holding the largest jobs go first.
+    ordered = sorted(groups.values(), key=lambda group: group[0][0], reverse=True)
+    return [job for group in ordered for _, job in group]
+
+
+class AdaptiveLimiter:
+    """Async concurrency limiter with an adaptive limit.
+
+    When monitoring (see `run`), the limit shrinks while memory is scarce
+    or the system is swapping, and grows while memory is plentiful
+    and the system load allows it.
+
+    Args:
+        min_limit: Lower bound of concurrency.
+        max_limit: Upper bound of concurrency.
+        initial: Initial limit.
+            Defaults to max limit.
+        interval: Seconds between system samples.
+        min_available: Fraction of available memory below which the limit shrinks.
+        target_available: Fraction of available memory required to grow the limit.
+        max_load: Load average per cpu above which the limit will not grow.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial: Optional[int] = None,
+        interval: float = 1.0,
+        min_available: float = 0.15,
+        target_available: float = 0.30,
+        max_load: float = 1.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = self._clamp(self.max_limit if initial is None else initial)
+        self.interval = interval
+        self.min_available = min_available
+        self.target_available = target_available
+        self.max_load = max_load
+        self.active = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._last_swap_out: Optional[int] = None
+
+    def _clamp(self, limit: int) -> int:
+        return max(self.min_limit, min(self.max_limit, limit))
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self):
+        """Acquire a slot, waiting while the limit is reached."""
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        """Release an acquired slot."""
+        async with self.cond:
+            self.active -= 1
+            self.cond.notify()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.release()
+
+    async def set_limit(self, limit: int):
+        """Update limit, waking up waiters if it grew."""
+        limit = self._clamp(limit)
+        if limit == self.limit:
+            return
+        logger.info("adjusting concurrency limit: %s -> %s", self.limit, limit)
+        async with self.cond:
+            self.limit = limit
+            self.cond.notify_all()
+
+    def sample(self) -> int:
+        """Sample system state and compute the next limit."""
+        memory = psutil.virtual_memory()
+        available = memory.available / memory.total
+        swap_out = psutil.swap_memory().sout
+        swapping = self._last_swap_out is not None and swap_out > self._last_swap_out
+        self._last_swap_out = swap_out
+        load = psutil.getloadavg()[0] / (psutil.cpu_count() or 1)
+        logger.debug(
+            "system sample: available=%.2f swapping=%s load=%.2f active=%s limit=%s",
+            available,
+            swapping,
+            load,
+            self.active,
+            self.limit,
+        )
+        if available < self.min_available or swapping:
+            return self._clamp(self.limit - 1)
+        if available >= self.target_available and load < self.max_load:
+            # only grow if current limit is actually utilized.
+            if self.active >= self.limit:
+                return self._clamp(self.limit + 1)
+        return self.limit
+
+    async def run(self):
+        """Periodically adapt limit until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            limit = await loop.run_in_executor(None, self.sample)
+            await self.set_limit(limit)
+            await asyncio.sleep(self.interval)
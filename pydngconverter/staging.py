@@ -0,0 +1,202 @@
+"""PyDNGConverter staging module.
+
+Stages sources and outputs through a local scratch directory
+(i.e. tmpfs or a local SSD), so the converter's small random reads
+and writes never hit network mounts.
+
+Sources are copied to scratch ahead of conversion (read-ahead is bounded
+by the scratch capacity and the worker queue), and finished outputs are
+moved to their destinations with an atomic rename.
+"""
+
+import os
+import errno
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Union, Optional
+from pathlib import Path
+from dataclasses import dataclass
+
+from pydngconverter.dngconverter import RESERVED_PREFIX, DNGJob
+
+logger = logging.getLogger("pydngconverter").getChild("staging")
+
+# scratch space reserved per source byte (staged source and its output).
+RESERVE_FACTOR = 2
+
+
+@dataclass
+class StagedJob:
+    """Scratch location of a job.
+
+    Attributes:
+        source: Staged copy of source.
+        output_root: Scratch directory outputs are written to.
+        reserved: Reserved scratch bytes.
+    """
+
+    source: Path
+    output_root: Path
+    reserved: int
+
+    def output(self, destination: Path) -> Path:
+        """Scratch path of output with given final destination."""
+        return self.output_root / destination.name
+
+
+class Stager:
+    """Local scratch staging area with a size cap.
+
+    Safe to use from multiple threads.
+
+    Args:
+        root: Directory to create scratch directory within.
+        capacity: Maximum bytes of scratch space in use.
+            A single job (or batch) larger than the capacity is still staged, on its own.
+    """
+
+    def __init__(self, root: Union[str, Path], capacity: int):
+        self.root = Path(root)
+        self.capacity = capacity
+        self.used = 0
+        self.directory: Optional[Path] = None
+        self._staged: Dict[Path, StagedJob] = {}
+        self._count = 0
+        self._cond = threading.Condition()
+
+    def open(self) -> "Stager":
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix=f"{RESERVED_PREFIX}-staging-", dir=self.root))
+        logger.debug("staging through: %s", self.directory)
+        return self
+
+    def close(self):
+        """Remove scratch directory, along with anything left in it."""
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+        self._staged.clear()
+        self.used = 0
+
+    def reserve(self, size: int, stop: Optional[threading.Event] = None) -> bool:
+        """Reserve scratch space, blocking until enough is available.
+
+        Returns:
+            Whether space was reserved (false if stopped while waiting).
+        """
+        with self._cond:
+            while self.used and self.used + size > self.capacity:
+                if stop is not None and stop.is_set():
+                    return False
+                self._cond.wait(0.25)
+            self.used += size
+        return True
+
+    def release(self, size: int):
+        with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+    def get(self, job: DNGJob) -> Optional[StagedJob]:
+        return self._staged.get(job.source)
+
+    def output_root(self, destination_root: Path) -> Path:
+        """Scratch directory for outputs of given destination root."""
+        digest = hashlib.sha1(str(destination_root).encode()).hexdigest()[:16]
+        return self.directory / "out" / digest
+
+    def stage(self, job: DNGJob, stop: Optional[threading.Event] = None) -> Optional[StagedJob]:
+        """Copy job's source to scratch.
+
+        Returns:
+            Staged job, or None if stopped while waiting for space.
+        """
+        staged = self.stage_batch([job], stop)
+        return None if staged is None else staged[0]
+
+    def stage_batch(
+        self, jobs: List[DNGJob], stop: Optional[threading.Event] = None
+    ) -> Optional[List[StagedJob]]:
+        """Copy sources of jobs to scratch, reserving space for all of them at once.
+
+        Like a single job, a batch larger than the capacity is still staged, on its own.
+
+        Returns:
+            Staged jobs, or None if stopped while waiting for space.
+
+        Raises:
+            OSError: A source could not be staged. Jobs staged before are discarded.
+        """
+        sizes = [job.source.stat().st_size * RESERVE_FACTOR for job in jobs]
+        if not self.reserve(sum(sizes), stop):
+            return None
+        staged = []
+        try:
+            for job, reserved in zip(jobs, sizes):
+                staged.append(self._copy(job, reserved))
+        except OSError:
+            for job in jobs[: len(staged)]:
+                self.discard(job)
+            self.release(sum(sizes[len(staged) :]))
+            raise
+        return staged
+
+    def _copy(self, job: DNGJob, reserved: int) -> StagedJob:
+        with self._cond:
+            self._count += 1
+            source_dir = self.directory / "in" / str(self._count)
+        try:
+            source_dir.mkdir(parents=True)
+            output_root = self.output_root(job.destination_root)
+            output_root.mkdir(parents=True, exist_ok=True)
+            source = source_dir / job.source.name
+            shutil.copyfile(job.source, source)
+        except OSError:
+            shutil.rmtree(source_dir, ignore_errors=True)
+            raise
+        staged = StagedJob(source=source, output_root=output_root, reserved=reserved)
+        self._staged[job.source] = staged
+        logger.debug("staged %s (%s bytes in use)", job.source.name, self.used)
+        return staged
+
+    @staticmethod
+    def commit(path: Path, destination: Path):
+        """Move staged output to its destination.
+
+        The destination is replaced atomically; across filesystems,
+        the output is copied next to the destination first.
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, destination)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        tmp_path = destination.with_name(f"{RESERVED_PREFIX}-{destination.name}.tmp")
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        os.unlink(path)
+
+    def discard(self, job: DNGJob):
+        """Remove job's staged source and leftover outputs, releasing its reserved space."""
+        staged = self._staged.pop(job.source, None)
+        if staged is None:
+            return
+        shutil.rmtree(staged.source.parent, ignore_errors=True)
+        for destination in (job.destination, *job.thumbnail_destinations):
+            try:
+                staged.output(destination).unlink()
+            except OSError:
+                pass
+        self.release(staged.reserved)
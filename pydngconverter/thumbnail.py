@@ -0,0 +1,138 @@
+"""PyDNGConverter thumbnail module.
+
+Renders thumbnails from embedded JPEG previews.
+
+Previews are decoded at reduced resolution where possible:
+libjpeg can scale by 1/2, 1/4 or 1/8 while decoding (in the DCT domain),
+so only a fraction of a multi-megapixel preview's pixels are ever
+materialized before the final resample to the target size.
+
+Multiple thumbnail sizes are rendered from a single decode,
+downscaling progressively from each size to the next.
+"""
+
+import math
+import logging
+from typing import Any, Tuple, Union, Optional, Sequence
+from pathlib import Path
+from dataclasses import dataclass
+
+from pydngconverter import preview
+
+# wand's Image class, or the error raised importing it.
+# imported on first use, as loading ImageMagick is slow (see `load_wand`).
+Image: Any = None
+
+logger = logging.getLogger("pydngconverter").getChild("thumbnail")
+
+# jpeg decoder scale denominators, largest first.
+DCT_SCALES = (8, 4, 2)
+
+
+def load_wand() -> Any:
+    """Import wand's Image class, once.
+
+    Returns:
+        wand's Image class, or the ImportError raised importing it.
+    """
+    global Image
+    if Image is None:
+        try:
+            from wand.image import Image
+        except ImportError as e:
+            Image = e
+    return Image
+
+
+@dataclass
+class ThumbnailOptions:
+    """Thumbnail rendering options.
+
+    Attributes:
+        scale: Thumbnail size relative to the preview.
+            Ignored when `max_size` is given.
+        max_size: Long-side pixels of thumbnail.
+        quality: JPEG quality (1-100).
+        name: Filename infix of thumbnail (`<source>.<name>.jpg`).
+    """
+
+    scale: float = 0.10
+    max_size: Optional[int] = None
+    quality: int = 85
+    name: str = "thumb"
+
+    def target_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Compute thumbnail dimensions for a preview of given dimensions."""
+        if self.max_size:
+            factor = min(1.0, self.max_size / max(width, height))
+        else:
+            factor = self.scale
+        return max(1, int(width * factor)), max(1, int(height * factor))
+
+
+def draft_scale(size: Tuple[int, int], target: Tuple[int, int]) -> int:
+    """Find the largest jpeg decoder scale denominator that still covers target.
+
+    Args:
+        size: Full jpeg dimensions.
+        target: Required minimum dimensions.
+
+    Returns:
+        Scale denominator (1 for a full decode).
+    """
+    width, height = size
+    for denom in DCT_SCALES:
+        if math.ceil(width / denom) >= target[0] and math.ceil(height / denom) >= target[1]:
+            return denom
+    return 1
+
+
+def render_pyramid(
+    image_bytes: bytes, outputs: Sequence[Tuple[Union[str, Path], ThumbnailOptions]]
+):
+    """Render multiple thumbnails of jpeg image from a single decode.
+
+    The image is decoded once, at the reduced scale covering the largest
+    thumbnail, then resized progressively from each size to the next smaller one.
+    Each thumbnail is written once, directly from the resized image.
+
+    Args:
+        image_bytes: JPEG image blob.
+        outputs: Output path and rendering options of each thumbnail.
+    """
+    if not outputs:
+        return
+    image_cls = load_wand()
+    if isinstance(image_cls, ImportError):
+        raise image_cls
+    size = preview.jpeg_size(image_bytes)
+    with image_cls() as img:
+        if size:
+            targets = [options.target_size(*size) for _, options in outputs]
+            largest = max(t[0] for t in targets), max(t[1] for t in targets)
+            denom = draft_scale(size, largest)
+            if denom > 1:
+                # hint libjpeg to decode at 1/denom scale.
+                draft = math.ceil(size[0] / denom), math.ceil(size[1] / denom)
+                img.options["jpeg:size"] = "{}x{}".format(*draft)
+            logger.debug("decoding %sx%s preview at 1/%s scale", *size, denom)
+        img.read(blob=image_bytes)
+        if not size:
+            targets = [options.target_size(img.width, img.height) for _, options in outputs]
+        # largest first, so each size is resized from the next larger one.
+        pyramid = sorted(zip(targets, outputs), key=lambda item: item[0], reverse=True)
+        for target, (dest, options) in pyramid:
+            img.resize(*target)
+            img.compression_quality = options.quality
+            img.save(filename=str(dest))
+
+
+def render(image_bytes: bytes, dest: Union[str, Path], options: Optional[ThumbnailOptions] = None):
+    """Render thumbnail of jpeg image to dest.
+
+    Args:
+        image_bytes: JPEG image blob.
+        dest: Output path.
+        options: Rendering options.
+    """
+    render_pyramid(image_bytes, [(dest, options or ThumbnailOptions())])
@@ -0,0 +1,216 @@
+"""PyDNGConverter TIFF module.
+
+Minimal, read-only TIFF structure parsing.
+
+Only the IFD structure is walked; image data is never decoded.
+Most raw formats (CR2, NEF, ARW, DNG, ORF, ...) are TIFF based.
+"""
+
+import struct
+import logging
+from typing import Dict, List, Tuple, Union, Iterator, Optional, NamedTuple
+
+logger = logging.getLogger("pydngconverter").getChild("tiff")
+
+# (size, struct format) of tiff field types.
+FIELD_TYPES = {
+    1: (1, "B"),  # BYTE
+    2: (1, "s"),  # ASCII
+    3: (2, "H"),  # SHORT
+    4: (4, "L"),  # LONG
+    5: (8, "LL"),  # RATIONAL
+    6: (1, "b"),  # SBYTE
+    7: (1, "s"),  # UNDEFINED
+    8: (2, "h"),  # SSHORT
+    9: (4, "l"),  # SLONG
+    10: (8, "ll"),  # SRATIONAL
+    11: (4, "f"),  # FLOAT
+    12: (8, "d"),  # DOUBLE
+    13: (4, "L"),  # IFD
+}
+
+# tiff magic numbers, including raw format variants.
+MAGIC_NUMBERS = {
+    42,  # TIFF
+    0x4F52,  # Olympus ORF ("RO")
+    0x5352,  # Olympus ORF ("RS")
+    0x55,  # Panasonic RW2
+}
+
+# upper bound of IFDs to visit, guards against malformed files.
+MAX_IFDS = 256
+
+
+class Tag:
+    """Commonly used TIFF tags."""
+
+    NEW_SUBFILE_TYPE = 0x00FE
+    IMAGE_WIDTH = 0x0100
+    IMAGE_LENGTH = 0x0101
+    COMPRESSION = 0x0103
+    MAKE = 0x010F
+    STRIP_OFFSETS = 0x0111
+    STRIP_BYTE_COUNTS = 0x0117
+    TILE_OFFSETS = 0x0144
+    TILE_BYTE_COUNTS = 0x0145
+    SUB_IFDS = 0x014A
+    JPEG_INTERCHANGE_FORMAT = 0x0201
+    JPEG_INTERCHANGE_FORMAT_LENGTH = 0x0202
+    EXIF_IFD = 0x8769
+    MAKER_NOTE = 0x927C
+    DNG_VERSION = 0xC612
+
+
+class Entry(NamedTuple):
+    """IFD entry.
+
+    Attributes:
+        tag: Entry tag id.
+        type: Field type.
+        count: Number of values.
+        offset: Absolute offset of value data within buffer.
+    """
+
+    tag: int
+    type: int
+    count: int
+    offset: int
+
+
+IFD = Dict[int, Entry]
+
+
+class TiffError(ValueError):
+    """Raised when a buffer is not a valid TIFF structure."""
+
+
+class TiffReader:
+    """Read TIFF structure from a buffer.
+
+    Args:
+        buffer: Buffer to read from (bytes, mmap, memoryview, ...).
+        base: Offset of TIFF header within buffer.
+            All offsets within the structure are relative to it.
+
+    Raises:
+        TiffError: Buffer does not contain a TIFF header at base.
+    """
+
+    def __init__(self, buffer: Union[bytes, memoryview], base: int = 0):
+        self.buffer = buffer
+        self.base = base
+        order = bytes(buffer[base : base + 2])
+        if order == b"II":
+            self.byteorder = "<"
+        elif order == b"MM":
+            self.byteorder = ">"
+        else:
+            raise TiffError(f"invalid byte order mark: {order!r}")
+        if len(buffer) < base + 8:
+            raise TiffError("truncated tiff header")
+        self.magic, self.first_ifd = self.unpack("HL", 2)
+        if self.magic not in MAGIC_NUMBERS:
+            raise TiffError(f"invalid tiff magic: {self.magic:#x}")
+
+    @classmethod
+    def headerless(cls, buffer, base: int, byteorder: str) -> "TiffReader":
+        """Create reader for IFDs without a TIFF header (i.e. makernotes).
+
+        Args:
+            buffer: Buffer to read from.
+            base: Offset that IFD offsets are relative to.
+            byteorder: struct byte order character.
+        """
+        reader = cls.__new__(cls)
+        reader.buffer = buffer
+        reader.base = base
+        reader.byteorder = byteorder
+        reader.magic, reader.first_ifd = None, 0
+        return reader
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer)
+
+    def unpack(self, fmt: str, offset: int) -> tuple:
+        """Unpack values at offset relative to base."""
+        return struct.unpack_from(self.byteorder + fmt, self.buffer, self.base + offset)
+
+    def read_ifd(self, offset: int) -> Tuple[IFD, int]:
+        """Read IFD at offset.
+
+        Returns:
+            IFD entries and offset of next IFD (0 if none).
+        """
+        (count,) = self.unpack("H", offset)
+        entries: IFD = {}
+        for i in range(count):
+            entry_offset = offset + 2 + i * 12
+            tag, typ, n = self.unpack("HHL", entry_offset)
+            if typ not in FIELD_TYPES:
+                continue
+            size = FIELD_TYPES[typ][0] * n
+            if size <= 4:
+                value_offset = self.base + entry_offset + 8
+            else:
+                (value_offset,) = self.unpack("L", entry_offset + 8)
+                value_offset += self.base
+            entries[tag] = Entry(tag, typ, n, value_offset)
+        (next_ifd,) = self.unpack("L", offset + 2 + count * 12)
+        return entries, next_ifd
+
+    def values(self, entry: Entry) -> tuple:
+        """Decode numeric values of entry."""
+        size, fmt = FIELD_TYPES[entry.type]
+        if fmt == "s":
+            return (self.data(entry),)
+        if entry.offset + size * entry.count > self.size:
+            raise TiffError(f"entry {entry.tag:#x} exceeds buffer")
+        return struct.unpack_from(
+            f"{self.byteorder}{entry.count * len(fmt)}{fmt[0]}", self.buffer, entry.offset
+        )
+
+    def value(self, ifd: IFD, tag: int, default=None):
+        """Get first value of tag in ifd."""
+        entry = ifd.get(tag)
+        if entry is None:
+            return default
+        return self.values(entry)[0]
+
+    def data(self, entry: Entry) -> memoryview:
+        """Raw value data of entry (no copy)."""
+        end = entry.offset + FIELD_TYPES[entry.type][0] * entry.count
+        if end > self.size:
+            raise TiffError(f"entry {entry.tag:#x} exceeds buffer")
+        return memoryview(self.buffer)[entry.offset : end]
+
+    def iter_ifds(self, follow: Optional[List[int]] = None) -> Iterator[IFD]:
+        """Iterate over all IFDs.
+
+        Walks the IFD chain, along with any child IFDs pointed to by `follow` tags.
+
+        Args:
+            follow: Tags pointing to child IFDs.
+                Defaults to SubIFDs and Exif IFD.
+        """
+        follow = [Tag.SUB_IFDS, Tag.EXIF_IFD] if follow is None else follow
+        pending = [self.first_ifd]
+        seen = set()
+        while pending and len(seen) < MAX_IFDS:
+            offset = pending.pop(0)
+            if not offset or offset in seen or self.base + offset + 2 > self.size:
+                continue
+            seen.add(offset)
+            try:
+                ifd, next_ifd = self.read_ifd(offset)
+            except struct.error:
+                logger.debug("truncated ifd @ %s", offset)
+                continue
+            yield ifd
+            pending.append(next_ifd)
+            for tag in follow:
+                if tag in ifd and ifd[tag].type in (4, 13):
+                    try:
+                        pending.extend(self.values(ifd[tag]))
+                    except TiffError:
+                        logger.debug("invalid child ifd pointer: %s", ifd[tag])
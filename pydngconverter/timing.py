@@ -0,0 +1,162 @@
+"""PyDNGConverter timing module.
+
+Collects per-job, per-stage timings of a conversion run.
+"""
+
+import time
+import logging
+import contextlib
+import collections
+from enum import Enum
+from typing import Any, Dict, List, Deque, Callable, Iterator, Optional, Sequence
+from pathlib import Path
+from dataclasses import field, dataclass
+
+from pydngconverter.dngconverter import DNGJob
+
+logger = logging.getLogger("pydngconverter").getChild("timing")
+
+
+class Stage(str, Enum):
+    """Job execution stages."""
+
+    QUEUE_WAIT = "queue_wait"  # queued until picked up by a worker.
+    PATH_TRANSLATION = "path_translation"  # `compat.get_compat_paths`.
+    SLOT_WAIT = "slot_wait"  # waiting on the converter concurrency limit.
+    SPAWN = "spawn"  # starting converter process.
+    CONVERT = "convert"  # converter process runtime.
+    EXTRACT = "extract"  # embedded preview extraction.
+    THUMBNAIL = "thumbnail"  # thumbnail resize/encode.
+
+
+@dataclass
+class JobTimings:
+    """Stage timings of a single job.
+
+    Stages shared by a batch of jobs (i.e. a converter process)
+    are split evenly between the jobs of the batch.
+
+    Attributes:
+        job: Timed job.
+        stages: Seconds spent per stage.
+    """
+
+    job: DNGJob
+    stages: Dict[Stage, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def add(self, stage: Stage, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class TimingCollector:
+    """Collects job timings.
+
+    Args:
+        hook: Called with a job's timings once all of its parts are done.
+        history: Number of finished jobs (see `pop`) whose timings are kept for the summary.
+            Defaults to all of them.
+    """
+
+    def __init__(
+        self, hook: Optional[Callable[[JobTimings], Any]] = None, history: Optional[int] = None
+    ):
+        self.hook = hook
+        self.records: Dict[Path, JobTimings] = {}
+        self.finished: Deque[JobTimings] = collections.deque(maxlen=history)
+        self._pending: Dict[Path, int] = {}
+
+    def record(self, job: DNGJob) -> JobTimings:
+        """Get (or create) timings of job."""
+        if job.source not in self.records:
+            self.records[job.source] = JobTimings(job)
+        return self.records[job.source]
+
+    def add(self, jobs: Sequence[DNGJob], stage: Stage, seconds: float):
+        """Add stage time, split evenly between jobs."""
+        share = seconds / max(1, len(jobs))
+        for job in jobs:
+            self.record(job).add(stage, share)
+
+    @contextlib.contextmanager
+    def measure(self, jobs: Sequence[DNGJob], stage: Stage) -> Iterator[None]:
+        """Measure duration of stage for given jobs."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(jobs, stage, time.perf_counter() - start)
+
+    def expect(self, job: DNGJob, parts: int):
+        """Set number of parts (queue items) job consists of."""
+        self.record(job)
+        self._pending[job.source] = parts
+
+    def done(self, job: DNGJob) -> bool:
+        """Mark part of job as done, calling hook once all parts are done.
+
+        Returns:
+            Whether all parts of job are done.
+        """
+        remaining = self._pending.get(job.source, 1) - 1
+        self._pending[job.source] = remaining
+        if remaining > 0:
+            return False
+        if self.hook is not None:
+            try:
+                self.hook(self.record(job))
+            except Exception:
+                logger.exception("timing hook failed for: %s", job.source.name)
+        return True
+
+    def pop(self, job: DNGJob) -> JobTimings:
+        """Remove timings of finished job, keeping up to `history` of them for the summary."""
+        self._pending.pop(job.source, None)
+        record = self.records.pop(job.source, None) or JobTimings(job)
+        self.finished.append(record)
+        return record
+
+    def summary(self) -> Dict[Stage, Dict[str, float]]:
+        """Summarize stage timings across all jobs.
+
+        Returns:
+            Mapping of stage to total, mean and p50/p95/p99 in seconds.
+        """
+        by_stage: Dict[Stage, List[float]] = {}
+        for record in [*self.records.values(), *self.finished]:
+            for stage, seconds in record.stages.items():
+                by_stage.setdefault(stage, []).append(seconds)
+        return {
+            stage: dict(
+                total=sum(values),
+                mean=sum(values) / len(values),
+                p50=percentile(values, 50),
+                p95=percentile(values, 95),
+                p99=percentile(values, 99),
+            )
+            for stage, values in by_stage.items()
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        log = log or logger
+        for stage, stats in self.summary().items():
+            log.info(
+                "[bold white]%-16s[/] total=%.2fs mean=%.3fs p50=%.3fs p95=%.3fs p99=%.3fs",
+                stage.value,
+                stats["total"],
+                stats["mean"],
+                stats["p50"],
+                stats["p95"],
+                stats["p99"],
+            )
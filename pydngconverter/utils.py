@@ -1,16 +1,35 @@
 """Utility functions for PyDNGConverter."""
 
 import time
+import types
 import shutil
 import asyncio
+import hashlib
 import logging
 import functools
+import importlib
 from typing import Union
 from pathlib import Path
 
 logger = logging.getLogger("pydngconverter").getChild("utils")
 
 
+class LazyModule(types.ModuleType):
+    """Module imported on first attribute access.
+
+    Keeps optional or slow-to-import dependencies off the import path
+    of pydngconverter until they are actually used.
+
+    Args:
+        name: Absolute name of module.
+    """
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
 def locate_program(name):
     """Locates program path by name.
 
@@ -45,6 +64,23 @@ def ensure_existing_dir(path: Union[str, Path]):
     return path
 
 
+def hash_file(path: Union[str, Path], chunk_size: int = 2**20) -> str:
+    """Compute content digest of file.
+
+    Args:
+        path: path to file.
+        chunk_size: read size.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def timeit(func):  # pragma: no cover
     """Async variant of timeit."""
 
@@ -0,0 +1,109 @@
+"""PyDNGConverter verify module.
+
+Fast structural verification of converted DNGs.
+
+Outputs are memory-mapped and only their TIFF structure is walked:
+the header, the DNGVersion tag, and the extents of all strips and tiles
+against the file size. Image data is never read, so a missing or
+truncated output is caught at the cost of a few page reads.
+"""
+
+import mmap
+import struct
+import logging
+from typing import Union
+from pathlib import Path
+
+from pydngconverter import tiff
+from pydngconverter.tiff import Tag
+
+logger = logging.getLogger("pydngconverter").getChild("verify")
+
+# (offsets, byte counts) tags of image data.
+IMAGE_DATA_TAGS = [
+    (Tag.STRIP_OFFSETS, Tag.STRIP_BYTE_COUNTS),
+    (Tag.TILE_OFFSETS, Tag.TILE_BYTE_COUNTS),
+]
+
+
+class VerificationError(ValueError):
+    """Raised when a converted DNG is missing or malformed."""
+
+
+def _check_extents(reader: tiff.TiffReader, ifd: tiff.IFD) -> bool:
+    """Check that image data of IFD lies within the buffer.
+
+    Returns:
+        Whether IFD holds image data.
+    """
+    for offsets_tag, counts_tag in IMAGE_DATA_TAGS:
+        if offsets_tag not in ifd:
+            continue
+        if counts_tag not in ifd:
+            raise VerificationError(f"missing byte counts of tag {offsets_tag:#x}")
+        offsets, counts = reader.values(ifd[offsets_tag]), reader.values(ifd[counts_tag])
+        if len(offsets) != len(counts):
+            raise VerificationError(f"mismatched offsets and byte counts of tag {offsets_tag:#x}")
+        end = max((o + c for o, c in zip(offsets, counts)), default=0)
+        if reader.base + end > reader.size:
+            raise VerificationError(f"image data exceeds file ({end} > {reader.size} bytes)")
+        return True
+    return False
+
+
+def check_dng(buffer) -> None:
+    """Verify DNG structure of buffer.
+
+    Args:
+        buffer: DNG contents (bytes, mmap, ...).
+
+    Raises:
+        VerificationError: Buffer is not a valid DNG.
+    """
+    try:
+        reader = tiff.TiffReader(buffer)
+        if reader.magic != 42:
+            raise VerificationError(f"unexpected tiff magic: {reader.magic:#x}")
+        pending, seen, images = [reader.first_ifd], set(), 0
+        while pending:
+            offset = pending.pop()
+            if offset in seen:
+                continue
+            if len(seen) >= tiff.MAX_IFDS:
+                raise VerificationError("too many ifds")
+            if not offset or offset + 2 > reader.size:
+                raise VerificationError(f"ifd offset {offset} exceeds file")
+            ifd, next_ifd = reader.read_ifd(offset)
+            if not seen and Tag.DNG_VERSION not in ifd:
+                raise VerificationError("missing DNGVersion tag")
+            seen.add(offset)
+            images += _check_extents(reader, ifd)
+            if next_ifd:
+                pending.append(next_ifd)
+            if Tag.SUB_IFDS in ifd:
+                pending.extend(reader.values(ifd[Tag.SUB_IFDS]))
+    except tiff.TiffError as e:
+        raise VerificationError(str(e)) from e
+    except struct.error as e:
+        raise VerificationError(f"truncated ifd: {e}") from e
+    if not images:
+        raise VerificationError("no image data")
+
+
+def verify_dng(path: Union[str, Path]) -> None:
+    """Verify DNG structure of file.
+
+    Args:
+        path: Path to DNG.
+
+    Raises:
+        VerificationError: File is missing, empty or not a valid DNG.
+    """
+    try:
+        with open(path, "rb") as f:
+            if not f.seek(0, 2):
+                raise VerificationError("empty file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                check_dng(buffer)
+    except OSError as e:
+        raise VerificationError(f"unreadable: {e}") from e
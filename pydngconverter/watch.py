@@ -0,0 +1,359 @@
+"""PyDNGConverter watch module.
+
+Detects files written to a directory tree, so they can be converted
+as they arrive instead of rescanning the tree on a schedule.
+
+On Linux, changes are reported by inotify (through ctypes).
+Elsewhere, or for network mounts where inotify sees no remote writes,
+the tree is polled instead. Either way, changed files are only reported
+once they have been stable (same size and mtime) for a debounce window,
+so partially written files are never picked up.
+"""
+
+import os
+import sys
+import stat
+import time
+import errno
+import ctypes
+import struct
+import asyncio
+import logging
+import functools
+import ctypes.util
+from enum import Enum, auto
+from typing import Set, Dict, List, Tuple, Union, Callable, Iterable, Optional
+from pathlib import Path
+
+logger = logging.getLogger("pydngconverter").getChild("watch")
+
+# inotify(7) flags.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+class WatchBackend(Enum):
+    """Method used to detect changed files."""
+
+    AUTO = auto()  # inotify where available, polling otherwise.
+    INOTIFY = auto()  # linux only, local filesystems only.
+    POLL = auto()  # periodic rescans, works anywhere.
+
+
+def _scan(root: Path) -> Dict[Path, Tuple[int, int]]:
+    """Recursively stat files of directory tree, not following symlinked directories."""
+    files = {}
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug("failed to scan directory %s: %s", directory, e)
+    return files
+
+
+class Debouncer:
+    """Tracks changed files until they are stable.
+
+    A file is stable once its size and mtime did not change for `window` seconds.
+    Empty files are never stable, as writers often create files before writing them.
+
+    Args:
+        window: Debounce window in seconds.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: Dict[Path, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update(self, changed: Iterable[Path] = (), now: Optional[float] = None) -> List[Path]:
+        """Track changed files and pop those that are stable.
+
+        Args:
+            changed: Files that changed, (re)starting their debounce window.
+            now: Current monotonic time.
+
+        Returns:
+            Stable files.
+        """
+        now = time.monotonic() if now is None else now
+        for path in changed:
+            self._pending[path] = (None, now)
+        stable = []
+        for path, (state, since) in list(self._pending.items()):
+            try:
+                st = path.stat()
+            except OSError:
+                del self._pending[path]
+                continue
+            if not stat.S_ISREG(st.st_mode) or not st.st_size:
+                del self._pending[path]
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != state:
+                self._pending[path] = (current, now)
+            elif now - since >= self.window:
+                del self._pending[path]
+                stable.append(path)
+        return sorted(stable)
+
+
+class PollingWatcher:
+    """Detects changed files by periodically rescanning a directory tree.
+
+    Files already present are reported by the first poll.
+
+    Args:
+        root: Directory to watch.
+        interval: Seconds between rescans.
+    """
+
+    def __init__(self, root: Union[str, Path], interval: float = 1.0):
+        self.root = Path(root)
+        self.interval = interval
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+        self._next_poll = 0.0
+
+    async def __aenter__(self) -> "PollingWatcher":
+        return self
+
+    async def __aexit__(self, *exc):
+        self._snapshot.clear()
+
+    def poll(self) -> List[Path]:
+        """Rescan tree, returning new or changed files."""
+        snapshot = _scan(self.root)
+        changed = [p for p, state in snapshot.items() if self._snapshot.get(p) != state]
+        self._snapshot = snapshot
+        return changed
+
+    async def wait(self, timeout: float) -> List[Path]:
+        """Wait up to timeout for changed files."""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            await asyncio.sleep(timeout)
+            return []
+        await asyncio.sleep(max(0.0, delay))
+        self._next_poll = time.monotonic() + self.interval
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.poll)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+class InotifyWatcher:
+    """Detects changed files with inotify.
+
+    Watches are added for each directory of the tree, including
+    directories created while watching. Files already present are reported
+    by the first wait.
+
+    Args:
+        root: Directory to watch.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._libc = _load_libc()
+        self._fd: Optional[int] = None
+        self._dirs: Dict[int, Path] = {}
+        self._changed: Set[Path] = set()
+        self._ready: Optional[asyncio.Event] = None
+        # tree walks running in the executor, and events of directories they are watching.
+        self._walks: Set[asyncio.Future] = set()
+        self._orphans: Dict[int, List[Tuple[int, bytes]]] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return _load_libc() is not None
+
+    async def __aenter__(self) -> "InotifyWatcher":
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._ready = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._walked(*await loop.run_in_executor(None, self._walk, self.root))
+        loop.add_reader(fd, self._read)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._fd is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._fd)
+        # walks still add watches to the descriptor.
+        await asyncio.gather(*self._walks, return_exceptions=True)
+        os.close(self._fd)
+        self._fd = None
+        self._dirs.clear()
+        self._orphans.clear()
+
+    def _walk(self, root: Path) -> Tuple[Dict[int, Path], List[Path]]:
+        """Watch directory tree.
+
+        Watches are added before listing each directory, so no file
+        created in between is missed.
+
+        Returns:
+            Watched directories by watch descriptor, and the files within them.
+        """
+        dirs, files = {}, []
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                logger.warning("failed to watch %s: %s", directory, os.strerror(ctypes.get_errno()))
+                continue
+            dirs[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                        elif entry.is_file():
+                            files.append(Path(entry.path))
+            except OSError as e:
+                logger.debug("failed to scan directory %s: %s", directory, e)
+        return dirs, files
+
+    def _rescan(self) -> Tuple[Dict[int, Path], List[Path]]:
+        return {}, list(_scan(self.root))
+
+    def _spawn(self, fn: Callable[..., Tuple[Dict[int, Path], List[Path]]], *args):
+        """Run walk of tree in executor, keeping the event loop responsive."""
+        walk = asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        self._walks.add(walk)
+        walk.add_done_callback(self._done_walking)
+
+    def _done_walking(self, walk: asyncio.Future):
+        self._walks.discard(walk)
+        if walk.cancelled() or self._fd is None:
+            return
+        try:
+            self._walked(*walk.result())
+        except Exception:
+            logger.exception("failed to walk %s", self.root)
+        if not self._walks:
+            # events of directories no longer watched.
+            self._orphans.clear()
+        if self._changed:
+            self._ready.set()
+
+    def _walked(self, dirs: Dict[int, Path], files: List[Path]):
+        self._dirs.update(dirs)
+        self._changed.update(files)
+        # replay events received before the directory's walk was done.
+        for wd in dirs:
+            for mask, name in self._orphans.pop(wd, ()):
+                self._event(wd, mask, name)
+
+    def _read(self):
+        while True:
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._handle(data)
+        if self._changed:
+            self._ready.set()
+
+    def _handle(self, data: bytes):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            self._event(wd, mask, name)
+
+    def _event(self, wd: int, mask: int, name: bytes):
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed, rescanning %s", self.root)
+            self._spawn(self._rescan)
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            self._orphans.pop(wd, None)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            if self._walks and name:
+                self._orphans.setdefault(wd, []).append((mask, name))
+            return
+        if not name:
+            return
+        path = directory / os.fsdecode(name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._spawn(self._walk, path)
+            return
+        self._changed.add(path)
+
+    async def wait(self, timeout: float) -> List[Path]:
+        """Wait up to timeout for changed files."""
+        if not self._changed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        changed, self._changed = list(self._changed), set()
+        return changed
+
+
+def create_watcher(
+    root: Union[str, Path], backend: WatchBackend = WatchBackend.AUTO, interval: float = 1.0
+) -> Union[InotifyWatcher, PollingWatcher]:
+    """Create watcher of directory tree.
+
+    Args:
+        root: Directory to watch.
+        backend: Method used to detect changes.
+        interval: Seconds between rescans when polling.
+    """
+    if backend == WatchBackend.AUTO:
+        backend = WatchBackend.INOTIFY if InotifyWatcher.available() else WatchBackend.POLL
+    logger.debug("watching %s with %s backend", root, backend.name.lower())
+    if backend == WatchBackend.INOTIFY:
+        return InotifyWatcher(root)
+    return PollingWatcher(root, interval)
@@ -1,9 +1,80 @@
 """PyDNGConverter test config."""
 
+import struct
+from pathlib import Path
+
 import pytest
 from pytest_mock import MockFixture
 
 
 @pytest.fixture(autouse=True, scope="session")
 def _mock_wand(session_mocker: MockFixture):
-    session_mocker.patch("pydngconverter.main.Image")
+    session_mocker.patch("pydngconverter.thumbnail.Image")
+
+
+def make_jpeg(sof: int = 0xC0, size: int = 64, dimensions=(0, 0)) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    width, height = dimensions
+    sof_seg = bytes([0xFF, sof]) + struct.pack(">HBHHB", 8, 8, height, width, 0)
+    body = b"\xff\xd8" + app0 + sof_seg
+    return body + bytes(size - len(body) - 2) + b"\xff\xd9"
+
+
+def make_dng(data_size: int = 64, dng_version: bool = True, tiled: bool = False) -> bytes:
+    """Build minimal little-endian DNG with a single strip (or tile) of image data."""
+    offsets_tag, counts_tag = (0x0144, 0x0145) if tiled else (0x0111, 0x0117)
+    entries = [
+        (0x0100, 4, 1, 8),  # ImageWidth
+        (0x0101, 4, 1, 8),  # ImageLength
+        (offsets_tag, 4, 1, None),
+        (counts_tag, 4, 1, data_size),
+    ]
+    if dng_version:
+        entries.append((0xC612, 1, 4, struct.unpack("<L", bytes([1, 4, 0, 0]))[0]))
+    entries.sort()
+    data_offset = 8 + 2 + 12 * len(entries) + 4
+    ifd = struct.pack("<H", len(entries))
+    for tag, typ, count, value in entries:
+        ifd += struct.pack("<HHLL", tag, typ, count, data_offset if value is None else value)
+    ifd += struct.pack("<L", 0)
+    return b"II" + struct.pack("<HL", 42, 8) + ifd + bytes(data_size)
+
+
+@pytest.fixture()
+def mock_converter(mocker: MockFixture):
+    mocker.patch("pydngconverter.compat.resolve_executable", return_value=Path("dngconverter"))
+    mocker.patch("pydngconverter.compat.get_compat_path", side_effect=lambda p: str(p))
+    mocker.patch(
+        "pydngconverter.compat.get_compat_paths", side_effect=lambda ps: [str(p) for p in ps]
+    )
+    mock_proc = mocker.patch("pydngconverter.main.asyncio.create_subprocess_exec")
+    mock_proc.side_effect = fake_converter(mocker)
+    return mock_proc
+
+
+def make_proc(mocker: MockFixture, returncode: int = 0):
+    proc = mocker.AsyncMock(returncode=returncode, stdout=None, stderr=None)
+    proc.wait.return_value = returncode
+    return proc
+
+
+def fake_converter(mocker: MockFixture, fail=lambda sources: None, corrupt=lambda source: False):
+    """Converter side effect writing a minimal DNG per source.
+
+    Args:
+        fail: Called with the sources of each invocation,
+            may raise or return a non-zero exit code.
+        corrupt: Whether to write a truncated DNG for source.
+    """
+
+    def _spawn(program, *args, **kwargs):
+        dest = Path(args[args.index("-d") + 1])
+        sources = [Path(a) for a in args[args.index("-d") + 2 :]]
+        returncode = fail(sources)
+        if not returncode:
+            for source in sources:
+                dng = make_dng()[:-1] if corrupt(source) else make_dng()
+                (dest / source.with_suffix(".dng").name).write_bytes(dng)
+        return make_proc(mocker, returncode or 0)
+
+    return _spawn
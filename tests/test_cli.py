@@ -0,0 +1,89 @@
+"""Command line interface tests."""
+
+import io
+
+import pytest
+
+from pydngconverter import cli, flags
+
+
+@pytest.fixture()
+def sources(tmp_path):
+    paths = []
+    for card in ("card1", "card2"):
+        (tmp_path / card).mkdir()
+        for i in range(2):
+            path = tmp_path / card / f"{card}_{i}.cr2"
+            path.write_bytes(b"raw")
+            paths.append(path)
+    return paths
+
+
+def test_create_converter(mock_converter, sources, tmp_path):
+    base = ["--dest", str(tmp_path / "dest"), "--jpeg-preview", "none", "--camera-raw", "13.2"]
+    args = cli.create_parser().parse_args(
+        [*base, "--batch-size", "0", "--no-compression", "--side", "2048", "--timeout", "0"]
+    )
+    converter = cli.create_converter(args, [str(sources[0].parent), str(sources[2])])
+    assert converter.parameters.jpeg_preview == flags.JPEGPreview.NONE
+    assert converter.parameters.camera_raw == flags.CRawCompat.THIRTEEN_TWO
+    assert converter.parameters.compression == flags.Compression.NO
+    assert converter.parameters.side == 2048
+    assert "-lossy" in converter.parameters.iter_args
+    assert converter.batch_size is None
+    assert converter.job_timeout is None
+    assert sorted(j.source for j in converter.job.jobs) == sources[:3]
+
+
+def test_create_converter_lossy(mock_converter, sources):
+    args = cli.create_parser().parse_args(["--lossy"])
+    converter = cli.create_converter(args, [str(sources[0])])
+    assert converter.parameters.lossy == flags.LossyCompression.YES
+    assert "-lossy" in converter.parameters.iter_args
+
+
+def test_main_shares_pool_across_sources(mock_converter, sources, tmp_path, mocker):
+    stdin = io.StringIO(f"{sources[2]}\n\n{sources[3]}\n")
+    run = mocker.spy(cli, "run")
+    code = cli.main([str(sources[0].parent), "-", "--dest", str(tmp_path / "dest")], stdin=stdin)
+    assert code == 0
+    # a single run (and worker pool) converts all sources.
+    run.assert_called_once()
+    assert mock_converter.call_count == 4
+    assert sorted(p.name for p in (tmp_path / "dest").glob("*.dng")) == [
+        "card1_0.dng",
+        "card1_1.dng",
+        "card2_0.dng",
+        "card2_1.dng",
+    ]
+
+
+def test_main_files_from(mock_converter, sources, tmp_path):
+    listing = tmp_path / "files.txt"
+    listing.write_text("\0".join(map(str, sources[1:3])))
+    assert cli.main(["-0", "--files-from", str(listing)]) == 0
+    assert mock_converter.call_count == 2
+    assert (sources[1].parent / "card1_1.dng").exists()
+    assert not (sources[0].parent / "card1_0.dng").exists()
+
+
+def test_main_usage_errors(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        cli.main([], stdin=io.StringIO(""))
+    assert exc.value.code == 2
+    with pytest.raises(SystemExit) as exc:
+        cli.main([str(tmp_path / "missing")])
+    assert exc.value.code == 2
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--watch", str(tmp_path / "a"), str(tmp_path / "b")])
+    assert exc.value.code == 2
+
+
+def test_main_rejects_colliding_destinations(mock_converter, sources, tmp_path):
+    (sources[2].parent / sources[0].name).write_bytes(b"raw")
+    with pytest.raises(SystemExit) as exc:
+        cli.main([str(sources[0].parent), str(sources[2].parent), "-d", str(tmp_path / "dest")])
+    assert exc.value.code == 2
+    mock_converter.assert_not_called()
@@ -50,8 +50,9 @@ def platform_apps(mock_platform):
 
 
 @pytest.mark.asyncio()
-async def test_get_compat_path(mocker: MockFixture, platform_paths):
+async def test_get_compat_path(mocker: MockFixture, platform_paths, tmp_path, monkeypatch):
     platform, in_path, expect_path = platform_paths
+    monkeypatch.setenv("WINEPREFIX", str(tmp_path))
     mock_proc = mocker.AsyncMock()
     mock_proc.return_value.communicate.return_value = expect_path.encode(), ""
     mocker.patch.object(compat.asyncio, "create_subprocess_exec", mock_proc)
@@ -63,6 +64,37 @@ async def test_get_compat_path(mocker: MockFixture, platform_paths):
         mock_proc.assert_not_called()
 
 
+@pytest.mark.asyncio()
+async def test_wine_paths_batched(mocker: MockFixture, tmp_path, monkeypatch):
+    monkeypatch.setenv("WINEPREFIX", str(tmp_path))
+    mock_proc = mocker.AsyncMock()
+    mock_proc.return_value.communicate.return_value = b"Z:\\raws\\a.cr2\nZ:\\raws\\b.cr2\n", ""
+    mocker.patch.object(compat.asyncio, "create_subprocess_exec", mock_proc)
+    in_paths = [Path("/raws/a.cr2"), Path("/raws/b.cr2")]
+    assert await compat.wine_paths(in_paths) == ["Z:\\raws\\a.cr2", "Z:\\raws\\b.cr2"]
+    mock_proc.assert_called_once()
+    assert mock_proc.call_args.args[-2:] == tuple(map(str, in_paths))
+    # translated directories are cached.
+    assert await compat.wine_paths([Path("/raws/c.cr2")]) == ["Z:\\raws\\c.cr2"]
+    mock_proc.assert_called_once()
+
+
+@pytest.mark.skipif(compat.platform.system() == "Windows", reason="Requires symlinks.")
+@pytest.mark.asyncio()
+async def test_wine_paths_dosdevices(mocker: MockFixture, tmp_path, monkeypatch):
+    monkeypatch.setenv("WINEPREFIX", str(tmp_path))
+    (tmp_path / "drive_c").mkdir()
+    (tmp_path / "dosdevices").mkdir()
+    (tmp_path / "dosdevices" / "c:").symlink_to("../drive_c")
+    (tmp_path / "dosdevices" / "z:").symlink_to("/")
+    mock_proc = mocker.patch.object(compat.asyncio, "create_subprocess_exec")
+    ret_paths = await compat.wine_paths(
+        [tmp_path / "drive_c" / "raws" / "a.cr2", Path("/raws/b.cr2"), Path("/c.cr2")]
+    )
+    assert ret_paths == ["C:\\raws\\a.cr2", "Z:\\raws\\b.cr2", "Z:\\c.cr2"]
+    mock_proc.assert_not_called()
+
+
 def test_resolve_executable(mocker: MockFixture, platform_apps):
     platform, expect_path = platform_apps
     mocker.patch("pydngconverter.compat.Path.exists", return_value=True)
@@ -85,3 +117,77 @@ def test_platform_enum(mock_platform):
         assert compat.Platform.get().is_nix
     if mock_platform == "Darwin":
         assert compat.Platform.get().is_darwin
+
+
+def test_wine_server(mocker: MockFixture, tmp_path, monkeypatch):
+    monkeypatch.setenv("WINEPREFIX", str(tmp_path))
+    monkeypatch.setenv("WINESERVER", "/opt/wine/bin/wineserver")
+    mock_run = mocker.patch.object(compat.subprocess, "run")
+    server = compat.WineServer()
+    assert server.start()
+    assert server.start()
+    server.stop()
+    server.stop()
+    assert not server.running
+    # the server is shared with other wine programs, so it is left to time out.
+    commands = [c.args[0] for c in mock_run.call_args_list]
+    assert commands == [["/opt/wine/bin/wineserver", f"-p{compat.WINESERVER_PERSIST}"]]
+    assert all(c.kwargs["env"]["WINEPREFIX"] == str(tmp_path) for c in mock_run.call_args_list)
+
+
+def test_wine_server_missing(mocker: MockFixture, monkeypatch):
+    monkeypatch.delenv("WINESERVER", raising=False)
+    mocker.patch.object(compat.shutil, "which", return_value=None)
+    server = compat.WineServer()
+    assert not server.start()
+    assert not server.running
+
+
+@pytest.fixture()
+def fake_executable(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    exec_path = bin_dir / "fakeconverter"
+    exec_path.write_text("#!/bin/sh\n")
+    exec_path.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.delenv(compat.EXECUTABLE_CACHE_ENV, raising=False)
+    compat.clear_executable_cache()
+    yield exec_path
+    compat.clear_executable_cache()
+
+
+@pytest.mark.skipif(compat.platform.system() == "Windows", reason="Requires unix PATH.")
+def test_resolve_executable_cached(mocker: MockFixture, fake_executable):
+    locate = mocker.spy(compat.utils, "locate_program")
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    assert locate.call_count == 1
+    # a replaced binary is resolved again.
+    os.utime(fake_executable, ns=(0, 0))
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    assert locate.call_count == 2
+
+
+@pytest.mark.skipif(compat.platform.system() == "Windows", reason="Requires unix PATH.")
+def test_resolve_executable_disk_cache(mocker: MockFixture, fake_executable, tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache" / "executables.json"
+    monkeypatch.setenv(compat.EXECUTABLE_CACHE_ENV, str(cache_path))
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    assert cache_path.exists()
+    # i.e. a new process.
+    compat.clear_executable_cache()
+    locate = mocker.spy(compat.utils, "locate_program")
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    locate.assert_not_called()
+    # resolutions are keyed by PATH.
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{fake_executable.parent}")
+    assert compat.resolve_executable(["fakeconverter"]) == fake_executable
+    locate.assert_called_once()
+
+
+def test_platform_detected_once(mocker: MockFixture):
+    compat._detect_platform.cache_clear()
+    system = mocker.spy(compat.platform, "system")
+    assert compat.Platform.get() == compat.Platform.get()
+    system.assert_called_once()
@@ -0,0 +1,79 @@
+"""Dedup module unit tests."""
+
+from pydngconverter import dedup
+from pydngconverter.dngconverter import DNGJob
+
+
+def make_jobs(tmp_path, contents):
+    jobs = []
+    for i, content in enumerate(contents):
+        source = tmp_path / f"IMG_{i:04}.CR2"
+        source.write_bytes(content)
+        jobs.append(DNGJob(source, destination_root=tmp_path / "dest"))
+    return jobs
+
+
+def test_group_duplicates(tmp_path, mocker):
+    size = dedup.PARTIAL_HASH_SIZE * 3
+    middle = size // 2
+    base = bytes(size)
+    changed = base[:middle] + b"x" + base[middle + 1 :]
+    jobs = make_jobs(tmp_path, [base, b"short", changed, base, b"other"])
+    cache = dedup.FingerprintCache(tmp_path / "cache.json")
+    full = mocker.spy(dedup.utils, "hash_file")
+    groups = dedup.group_duplicates(jobs, cache)
+    assert [[j.source.name for j in g] for g in groups] == [
+        ["IMG_0000.CR2", "IMG_0003.CR2"],
+        ["IMG_0001.CR2"],
+        ["IMG_0002.CR2"],
+        ["IMG_0004.CR2"],
+    ]
+    # only sources with colliding size and partial hash are hashed entirely.
+    assert sorted(c.args[0].name for c in full.call_args_list) == [
+        "IMG_0000.CR2",
+        "IMG_0002.CR2",
+        "IMG_0003.CR2",
+    ]
+
+
+def test_group_duplicates_unreadable(tmp_path):
+    jobs = make_jobs(tmp_path, [b"raw", b"raw", b"raw"])
+    missing = [DNGJob(tmp_path / f"missing{i}.CR2") for i in range(2)]
+    groups = dedup.group_duplicates(
+        [missing[0], *jobs[:2], missing[1], jobs[2]],
+        dedup.FingerprintCache(tmp_path / "cache.json"),
+    )
+    # unreadable sources are neither grouped with each other nor with readable ones.
+    assert groups == [[missing[0]], jobs, [missing[1]]]
+
+
+def test_fingerprint_cache_persists(tmp_path, mocker):
+    jobs = make_jobs(tmp_path, [b"raw", b"raw"])
+    path = tmp_path / dedup.FINGERPRINT_CACHE_FILENAME
+    cache = dedup.FingerprintCache.load(path)
+    dedup.group_duplicates(jobs, cache)
+    cache.save()
+    full = mocker.spy(dedup.utils, "hash_file")
+    cache = dedup.FingerprintCache.load(path)
+    assert len(dedup.group_duplicates(jobs, cache)) == 1
+    full.assert_not_called()
+    # modified sources are fingerprinted again.
+    partial = mocker.spy(dedup, "partial_hash")
+    jobs[1].source.write_bytes(b"RAW")
+    cache = dedup.FingerprintCache.load(path)
+    assert len(dedup.group_duplicates(jobs, cache)) == 2
+    partial.assert_called_once_with(jobs[1].source, 3)
+
+
+def test_replicate(tmp_path):
+    source = tmp_path / "a.dng"
+    source.write_bytes(b"dng")
+    linked = tmp_path / "linked" / "b.dng"
+    dedup.replicate(source, linked)
+    assert linked.stat().st_ino == source.stat().st_ino
+    copied = tmp_path / "copied" / "b.dng"
+    copied.parent.mkdir()
+    copied.write_bytes(b"stale")
+    dedup.replicate(source, copied, hardlink=False)
+    assert copied.read_bytes() == b"dng"
+    assert copied.stat().st_ino != source.stat().st_ino
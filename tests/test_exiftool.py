@@ -0,0 +1,76 @@
+"""ExifTool module unit tests."""
+
+import os
+import sys
+import asyncio
+import textwrap
+
+import pytest
+
+from pydngconverter import exiftool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Requires shebang scripts.")
+
+FAKE_EXIFTOOL = """
+import sys
+
+args = []
+for line in sys.stdin:
+    line = line.rstrip("\\n")
+    if line.startswith("-execute"):
+        with open(args[-1], "rb") as f:
+            sys.stdout.buffer.write(f.read())
+        sys.stdout.buffer.write(("{ready%s}\\n" % line[len("-execute"):]).encode())
+        sys.stdout.flush()
+        args = []
+    elif args[-2:] == ["-stay_open"] and line == "False":
+        break
+    else:
+        args.append(line)
+"""
+
+
+@pytest.fixture()
+def fake_exiftool(tmp_path):
+    script = tmp_path / "exiftool"
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent(FAKE_EXIFTOOL))
+    script.chmod(0o755)
+    return script
+
+
+@pytest.mark.asyncio()
+async def test_exiftool_pool_execute(tmp_path, fake_exiftool):
+    payloads = {tmp_path / f"image{i}.cr2": bytes([i]) * (i * 50_000) for i in range(1, 5)}
+    for path, data in payloads.items():
+        path.write_bytes(data)
+    pool = exiftool.ExifToolPool(fake_exiftool, size=2)
+    try:
+        for path, data in payloads.items():
+            assert await pool.execute("-b", "-previewImage", str(path)) == data
+    finally:
+        await pool.close()
+    assert not any(tool.running for tool in pool._tools)
+
+
+@pytest.mark.asyncio()
+async def test_exiftool_cancelled_execute(tmp_path, fake_exiftool):
+    image = tmp_path / "image.cr2"
+    image.write_bytes(b"preview")
+    # blocks exiftool until written to.
+    fifo = tmp_path / "blocking.cr2"
+    os.mkfifo(fifo)
+    tool = exiftool.ExifTool(fake_exiftool)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(tool.execute("-b", "-previewImage", str(fifo)), 0.5)
+        try:
+            fd = os.open(fifo, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            pass
+        else:
+            os.write(fd, b"stale")
+            os.close(fd)
+        # output of the abandoned command is not mistaken for the next one's.
+        assert await tool.execute("-b", "-previewImage", str(image)) == b"preview"
+    finally:
+        await tool.close()
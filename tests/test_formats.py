@@ -0,0 +1,47 @@
+"""Formats module unit tests."""
+
+import struct
+
+import pytest
+
+from pydngconverter import formats
+
+
+def make_tiff_header(*tags: int, prefix: bytes = b"") -> bytes:
+    ifd = struct.pack("<H", len(tags))
+    for tag in tags:
+        ifd += struct.pack("<HHLL", tag, 4, 1, 0)
+    return b"II" + struct.pack("<HL", 42, 8 + len(prefix)) + prefix + ifd + bytes(4)
+
+
+@pytest.mark.parametrize(
+    ("header", "expect"),
+    [
+        pytest.param(b"FUJIFILMCCD-RAW 0201", "raf", id="raf"),
+        pytest.param(struct.pack(">L", 24) + b"ftypcrx " + bytes(8), "cr3", id="cr3"),
+        pytest.param(b"IIRO\x08\x00\x00\x00" + bytes(8), "orf", id="orf"),
+        pytest.param(b"IIU\x00\x08\x00\x00\x00" + bytes(8), "rw2", id="rw2"),
+        pytest.param(make_tiff_header(0x010F, prefix=b"CR\x02\x00"), "cr2", id="cr2"),
+        pytest.param(make_tiff_header(0x010F), "tiff", id="tiff-raw"),
+        pytest.param(make_tiff_header(0x010F, 0xC612), None, id="dng"),
+        pytest.param(make_tiff_header(0x0100), None, id="tiff-no-make"),
+        pytest.param(b"\xff\xd8\xff\xe0" + bytes(12), None, id="jpeg"),
+        pytest.param(b"", None, id="empty"),
+    ],
+)
+def test_sniff(header, expect):
+    assert formats.sniff(header) == expect
+
+
+def test_detect_fast_path(tmp_path, mocker):
+    real_open = open
+    mock_open = mocker.patch("builtins.open")
+    assert formats.detect(tmp_path / "image.NEF") == "nef"
+    assert formats.detect(tmp_path / "image.xmp") is None
+    mock_open.assert_not_called()
+    (tmp_path / "image.unknown").write_bytes(make_tiff_header(0x010F))
+    mock_open.side_effect = real_open
+    assert formats.detect(tmp_path / "image.unknown") == "tiff"
+    # plain tiffs are never sniffed as raw, even with camera make info.
+    (tmp_path / "export.TIF").write_bytes(make_tiff_header(0x010F))
+    assert formats.detect(tmp_path / "export.TIF") is None
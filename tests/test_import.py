@@ -0,0 +1,41 @@
+"""Import time tests."""
+
+import os
+import sys
+import json
+import subprocess
+
+# generous, as CI machines are slow; catches eagerly imported heavy dependencies.
+IMPORT_BUDGET = float(os.environ.get("PYDNG_IMPORT_BUDGET", "1.0"))
+
+PROBE = """
+import sys, json, time, logging
+start = time.perf_counter()
+import pydngconverter
+elapsed = time.perf_counter() - start
+print(json.dumps(dict(
+    elapsed=elapsed,
+    modules=[m for m in ("wand", "rich", "psutil") if m in sys.modules],
+    root_handlers=len(logging.getLogger().handlers),
+)))
+"""
+
+
+def probe_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_is_lazy():
+    result = probe_import()
+    assert result["modules"] == []
+    # logging is opt-in (see `setup_logging`).
+    assert result["root_handlers"] == 0
+
+
+def test_import_time_budget():
+    # best of a few runs, to not fail on a single slow (cold cache) import.
+    elapsed = min(probe_import()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET, f"import took {elapsed:.3f}s (budget: {IMPORT_BUDGET}s)"
@@ -0,0 +1,69 @@
+"""Journal module unit tests."""
+
+import json
+import asyncio
+import threading
+
+import pytest
+
+from pydngconverter import journal
+from pydngconverter.dngconverter import DNGJob
+
+
+def test_journal_replay_and_compact(tmp_path):
+    path = tmp_path / journal.JOURNAL_FILENAME
+    jobs = [DNGJob(tmp_path / f"IMG_{i}.CR2") for i in range(3)]
+    jrnl = journal.Journal(path, sync_every=2).open()
+    for job in jobs:
+        jrnl.record(job, journal.JobState.QUEUED)
+        jrnl.record(job, journal.JobState.STARTED)
+    jrnl.record(jobs[0], journal.JobState.COMPLETED)
+    jrnl.record(jobs[1], journal.JobState.FAILED, error="boom")
+    jrnl.close()
+    # simulate crash mid-write.
+    with open(path, "a") as f:
+        f.write('{"source": "trunc')
+
+    states = journal.Journal.replay(path)
+    assert states == {
+        str(jobs[0].source): journal.JobState.COMPLETED,
+        str(jobs[1].source): journal.JobState.FAILED,
+        str(jobs[2].source): journal.JobState.STARTED,
+    }
+    resumed = journal.Journal(path).open(resume=True)
+    assert [resumed.is_completed(j) for j in jobs] == [True, False, False]
+    resumed.close()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["source"] for line in lines] == [str(jobs[0].source)]
+    # without resume, journal is truncated.
+    journal.Journal(path).open().close()
+    assert path.read_text() == ""
+
+
+@pytest.mark.asyncio()
+async def test_journal_syncs_off_loop(tmp_path, mocker):
+    jrnl = journal.Journal(tmp_path / journal.JOURNAL_FILENAME, sync_every=2, sync_interval=60)
+    await asyncio.get_running_loop().run_in_executor(None, jrnl.open)
+    threads = []
+    fsync = journal.os.fsync
+    mocker.patch.object(
+        journal.os,
+        "fsync",
+        side_effect=lambda fd: threads.append(threading.get_ident()) or fsync(fd),
+    )
+    runner = asyncio.create_task(jrnl.run())
+    await asyncio.sleep(0)
+    jobs = [DNGJob(tmp_path / f"IMG_{i}.CR2") for i in range(2)]
+    for job in jobs:
+        jrnl.record(job, journal.JobState.QUEUED)
+    assert threads == []
+    # a full batch wakes the runner early, which syncs in the executor.
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if threads:
+            break
+    assert len(threads) == 1
+    assert threads[0] != threading.get_ident()
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    jrnl.close()
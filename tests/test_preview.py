@@ -0,0 +1,77 @@
+"""Preview module unit tests."""
+
+import struct
+
+import pytest
+
+from pydngconverter import preview
+from tests.conftest import make_jpeg
+
+
+def make_tiff(*jpegs: bytes, byteorder: str = "<") -> bytes:
+    """Build tiff with an IFD per jpeg, each using JPEGInterchangeFormat."""
+    mark = b"II" if byteorder == "<" else b"MM"
+    header = mark + struct.pack(byteorder + "HL", 42, 8)
+    ifd_size = 2 + 2 * 12 + 4
+    data_offset = 8 + ifd_size * len(jpegs)
+    ifds, data = b"", b""
+    for i, jpeg in enumerate(jpegs):
+        next_ifd = 8 + ifd_size * (i + 1) if i + 1 < len(jpegs) else 0
+        ifds += struct.pack(byteorder + "H", 2)
+        ifds += struct.pack(byteorder + "HHLL", 0x0201, 4, 1, data_offset + len(data))
+        ifds += struct.pack(byteorder + "HHLL", 0x0202, 4, 1, len(jpeg))
+        ifds += struct.pack(byteorder + "L", next_ifd)
+        data += jpeg
+    return header + ifds + data
+
+
+def make_raf(jpeg: bytes) -> bytes:
+    header = preview.RAF_MAGIC.ljust(84, b"\x00") + struct.pack(">LL", 100, len(jpeg))
+    return header.ljust(100, b"\x00") + jpeg
+
+
+def make_cr3(jpeg: bytes) -> bytes:
+    ftyp = struct.pack(">L4s4s", 16, b"ftyp", b"crx ") + bytes(4)
+    prvw = struct.pack(">L4sLHHHHL", 24 + len(jpeg), b"PRVW", 0, 1, 160, 120, 1, len(jpeg))
+    payload = preview.CR3_PREVIEW_UUID + bytes(8) + prvw + jpeg
+    return ftyp + struct.pack(">L4s", 8 + len(payload), b"uuid") + payload
+
+
+LARGE_JPEG = make_jpeg(size=4096)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        pytest.param(make_tiff(make_jpeg(), LARGE_JPEG), id="tiff-le"),
+        pytest.param(make_tiff(LARGE_JPEG, make_jpeg(), byteorder=">"), id="tiff-be"),
+        pytest.param(make_tiff(LARGE_JPEG, make_jpeg(0xC3, size=8192)), id="tiff-lossless"),
+        pytest.param(make_raf(LARGE_JPEG), id="raf"),
+        pytest.param(make_cr3(LARGE_JPEG), id="cr3"),
+    ],
+)
+def test_extract_preview(tmp_path, raw):
+    path = tmp_path / "image.raw"
+    path.write_bytes(raw)
+    assert preview.extract_preview(path) == LARGE_JPEG
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"not a raw image", id="unknown"),
+        pytest.param(make_tiff(make_jpeg(0xC3)), id="lossless-only"),
+    ],
+)
+def test_extract_preview_missing(tmp_path, raw):
+    path = tmp_path / "image.raw"
+    path.write_bytes(raw)
+    assert preview.extract_preview(path) is None
+
+
+def test_jpeg_size():
+    jpeg = make_jpeg(dimensions=(6000, 4000))
+    assert preview.jpeg_size(jpeg) == (6000, 4000)
+    assert preview.jpeg_size(b"\x00" + jpeg, offset=1) == (6000, 4000)
+    assert preview.jpeg_size(b"not a jpeg") is None
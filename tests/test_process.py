@@ -0,0 +1,62 @@
+"""Process module unit tests."""
+
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+from pydngconverter import process
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Requires process groups.")
+
+CHATTY = "import sys; sys.stdout.write('x' * 2**20); sys.stderr.write('failed'); sys.exit(3)"
+
+# spawns a grandchild that outlives its parent unless the group is killed.
+HANGING = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+print(child.pid, flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.mark.asyncio()
+async def test_wait_drains_capped_output():
+    proc = await process.spawn(sys.executable, "-c", CHATTY)
+    result = await process.wait(proc, timeout=30, capture_limit=1024)
+    assert result.returncode == 3
+    assert result.stdout == b"x" * 1024
+    with pytest.raises(process.ProcessError, match="failed"):
+        result.check()
+
+
+@pytest.mark.asyncio()
+async def test_wait_timeout_kills_process_group():
+    proc = await process.spawn(sys.executable, "-c", HANGING)
+    child_pid = int(await proc.stdout.readline())
+    start = time.monotonic()
+    with pytest.raises(process.ProcessTimeout):
+        await process.wait(proc, timeout=0.5)
+    assert time.monotonic() - start < 10
+    for _ in range(50):
+        try:
+            os.kill(child_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("grandchild survived timeout")
+
+
+@pytest.mark.asyncio()
+async def test_wait_cancelled_while_draining(mocker):
+    # exited, but its pipes are held open (i.e. by a descendant).
+    proc = mocker.AsyncMock(pid=0, returncode=0)
+    proc.stdout, proc.stderr = asyncio.StreamReader(), asyncio.StreamReader()
+    task = asyncio.create_task(process.wait(proc))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
@@ -1,6 +1,12 @@
 """PyDNGConverter tests."""
 from __future__ import annotations
 
+import json
+import time
+import asyncio
+import logging
+import itertools
+import threading
 from pathlib import Path
 
 import pytest
@@ -8,8 +14,11 @@ from pytest_mock import MockFixture
 from typing_extensions import NamedTuple
 
 import pydngconverter as pydng
-from pydngconverter import flags
-from pydngconverter.dngconverter import DNGParameters
+from pydngconverter import flags, watch, compat, process, manifest
+from pydngconverter.timing import Stage, TimingCollector
+from pydngconverter.thumbnail import ThumbnailOptions
+from pydngconverter.dngconverter import DNGJob, DNGBatchJob, DNGParameters
+from tests.conftest import make_dng, fake_converter
 
 ARG_SCENARIOS = [
     # no thumbnail.
@@ -80,25 +89,30 @@ ParameterCases = [
         params=DNGParameters(linear=True),
         expect_args=[*default_args[:-1], "-l", "-p1"],
     ),
+    # lossy
+    DNGParamCase(
+        params=DNGParameters(lossy=flags.LossyCompression.YES),
+        expect_args=[*default_args[:-1], "-lossy", "-p1"],
+    ),
     # implied lossy side only
     DNGParamCase(
         params=DNGParameters(side=1),
-        expect_args=[*default_args[:-1], "-side", "1", "-p1"],
+        expect_args=[*default_args[:-1], "-lossy", "-side", "1", "-p1"],
     ),
     # implied lossy count only
     DNGParamCase(
         params=DNGParameters(count=1),
-        expect_args=[*default_args[:-1], "-count", "1", "-p1"],
+        expect_args=[*default_args[:-1], "-lossy", "-count", "1", "-p1"],
     ),
     # implied lossy side/count
     DNGParamCase(
         params=DNGParameters(side=1, count=1),
-        expect_args=[*default_args[:-1], "-side", "1", "-count", "1", "-p1"],
+        expect_args=[*default_args[:-1], "-lossy", "-side", "1", "-count", "1", "-p1"],
     ),
     # explicit lossy side/count
     DNGParamCase(
-        params=DNGParameters(side=1, count=1, lossy=flags.LossyCompression.NO),
-        expect_args=[*default_args[:-1], "-side", "1", "-count", "1", "-p1"],
+        params=DNGParameters(side=1, count=1, lossy=flags.LossyCompression.YES),
+        expect_args=[*default_args[:-1], "-lossy", "-side", "1", "-count", "1", "-p1"],
     ),
     # dng converter jpeg
     DNGParamCase(
@@ -121,3 +135,428 @@ ParameterCases = [
 @pytest.mark.parametrize("case", ParameterCases)
 def test_dng_parameters_args(case: DNGParamCase):
     assert list(case.params.iter_args) == case.expect_args
+
+
+def test_batch_job_iter_batches(with_mock_source):
+    batch_job = DNGBatchJob(source_directory=with_mock_source)
+    batches = list(batch_job.iter_batches(3))
+    assert [len(b) for b in batches] == [3, 1]
+    assert list(itertools.chain.from_iterable(batches)) == batch_job.jobs
+
+
+@pytest.mark.parametrize(("batch_size", "expect_calls"), [(1, 4), (2, 2), (4, 1), (None, 4)])
+@pytest.mark.asyncio()
+async def test_convert_batches(with_mock_source, mock_converter, batch_size, expect_calls):
+    dng = pydng.DNGConverter(with_mock_source, max_workers=2, batch_size=batch_size)
+    results = await dng.convert()
+    assert mock_converter.call_count == expect_calls
+    assert sorted(results) == sorted(j.destination for j in dng.job.jobs)
+
+
+@pytest.mark.asyncio()
+async def test_convert_incremental(with_mock_source, mock_converter):
+    dng = pydng.DNGConverter(with_mock_source, incremental=True)
+    for job in dng.job.jobs:
+        job.destination.touch()
+    await dng.convert()
+    assert mock_converter.call_count == 4
+    assert dng.manifest_path.exists()
+    # up-to-date outputs are skipped.
+    mock_converter.reset_mock()
+    await dng.convert()
+    mock_converter.assert_not_called()
+    # modified sources are reconverted.
+    dng.job.jobs[0].source.write_bytes(b"changed")
+    await dng.convert()
+    assert mock_converter.call_count == 1
+    # parameter changes invalidate all entries.
+    mock_converter.reset_mock()
+    dng.parameters.fast_load = True
+    await dng.convert()
+    assert mock_converter.call_count == 4
+
+
+def test_incremental_thumbnails(with_mock_source, mock_converter, tmp_path):
+    dng = pydng.DNGConverter(with_mock_source, jpeg_preview=flags.JPEGPreview.EXTRACT)
+    resized = pydng.DNGConverter(
+        with_mock_source,
+        jpeg_preview=flags.JPEGPreview.EXTRACT,
+        thumbnail_options=ThumbnailOptions(max_size=256),
+    )
+    # thumbnail specs are part of the digest, but only when extracting.
+    assert dng.digest != resized.digest
+    assert dng.digest != dng.parameters.digest
+    assert pydng.DNGConverter(with_mock_source).digest == DNGParameters().digest
+    _manifest = manifest.Manifest(tmp_path / manifest.MANIFEST_FILENAME)
+    job = dng.job.jobs[0]
+    job.destination.touch()
+    for path in job.thumbnail_destinations:
+        path.touch()
+    _manifest.update(job, dng.digest, [job.destination, *job.thumbnail_destinations])
+    assert _manifest.is_current(job, dng.digest)
+    # recorded thumbnails that were removed are stale.
+    job.thumbnail_destinations[0].unlink()
+    assert not _manifest.is_current(job, dng.digest)
+
+
+@pytest.mark.asyncio()
+async def test_incremental_without_preview(with_mock_source, mock_converter, mocker):
+    dng = pydng.DNGConverter(
+        with_mock_source, incremental=True, jpeg_preview=flags.JPEGPreview.EXTRACT
+    )
+    mocker.patch.object(dng._exif_pool, "execute", return_value=b"")
+    results = [r async for r in dng.iter_convert()]
+    assert mock_converter.call_count == 4
+    assert not any(r.thumbnails for r in results)
+    # sources without an embedded preview are not reconverted.
+    mock_converter.reset_mock()
+    await dng.convert()
+    mock_converter.assert_not_called()
+
+
+def test_convert_outside_event_loop(with_mock_source, mock_converter):
+    # created before (and reused across) event loops, as the cli does.
+    dng = pydng.DNGConverter(with_mock_source, max_workers=2)
+    assert len(asyncio.run(dng.convert())) == 4
+    assert len(asyncio.run(dng.convert())) == 4
+
+
+@pytest.mark.asyncio()
+async def test_convert_lazy_scan(with_mock_source, mock_converter):
+    nested = with_mock_source / "nested"
+    nested.mkdir()
+    (nested / "mockfile.cr2").touch()
+    dng = pydng.DNGConverter(with_mock_source, lazy_scan=True, batch_size=None)
+    assert dng.job.jobs == []
+    results = await dng.convert()
+    assert len(results) == 5
+    # jobs are batched per destination directory.
+    assert mock_converter.call_count == 2
+
+
+def test_batch_job_skips_non_raw(with_mock_source):
+    (with_mock_source / "mockfile0.xmp").touch()
+    (with_mock_source / "mockfile0.dng").touch()
+    (with_mock_source / "notes.txt").touch()
+    batch_job = DNGBatchJob(source_directory=with_mock_source)
+    assert len(batch_job.jobs) == 4
+    assert batch_job.skipped == {".xmp": 1, ".dng": 1, ".txt": 1}
+    assert len(DNGBatchJob(source_directory=with_mock_source, raw_only=False).jobs) == 7
+
+
+@pytest.mark.asyncio()
+async def test_convert_timings(with_mock_source, mock_converter):
+    records = []
+    dng = pydng.DNGConverter(with_mock_source, batch_size=2, timing_hook=records.append)
+    await dng.convert()
+    assert sorted(r.job.source for r in records) == sorted(j.source for j in dng.job.jobs)
+    for record in records:
+        assert {Stage.QUEUE_WAIT, Stage.SPAWN, Stage.CONVERT} <= set(record.stages)
+    summary = dng.timings.summary()
+    assert summary[Stage.CONVERT]["p50"] <= summary[Stage.CONVERT]["p99"]
+    # timings of finished jobs are moved out of the in-flight records.
+    assert not dng.timings.records
+    assert len(dng.timings.finished) == 4
+
+
+def test_timing_history(tmp_path):
+    collector = TimingCollector(history=2)
+    jobs = [DNGJob(tmp_path / f"{i}.cr2") for i in range(3)]
+    for i, job in enumerate(jobs):
+        collector.add([job], Stage.CONVERT, float(i))
+        collector.pop(job)
+    assert [r.job for r in collector.finished] == jobs[1:]
+    assert collector.summary()[Stage.CONVERT]["total"] == 3.0
+
+
+@pytest.mark.asyncio()
+async def test_iter_convert(with_mock_source, mock_converter, mocker: MockFixture):
+    calls = iter(range(4))
+
+    def fail(sources):
+        if next(calls) == 0:
+            raise OSError("boom")
+
+    mock_converter.side_effect = fake_converter(mocker, fail)
+    dng = pydng.DNGConverter(with_mock_source, max_workers=1)
+    results = [r async for r in dng.iter_convert()]
+    assert sorted(r.job.source for r in results) == sorted(j.source for j in dng.job.jobs)
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1
+    assert isinstance(failed[0].error, OSError)
+    assert failed[0].outputs == []
+    for result in results:
+        assert Stage.SPAWN in result.timings.stages
+        if result.ok:
+            assert result.outputs == [result.job.destination]
+
+
+def test_batch_job_thumbnail_specs(with_mock_source):
+    specs = [ThumbnailOptions(max_size=256, name="grid"), ThumbnailOptions(name="thumb")]
+    batch_job = DNGBatchJob(source_directory=with_mock_source, thumbnails=specs)
+    job = batch_job.jobs[0]
+    assert [p.name for p in job.thumbnail_destinations] == [
+        job.source.with_suffix(".grid.jpg").name,
+        job.thumbnail_filename,
+    ]
+    assert DNGBatchJob(source_directory=with_mock_source).jobs[0].thumbnail_destinations == [
+        job.thumbnail_destination
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_convert_shared_image_executor(with_mock_source, mock_converter, mocker):
+    mocker.patch("pydngconverter.preview.extract_preview", return_value=b"jpeg")
+    active, peak, threads = [0], [0], set()
+
+    def render(image_bytes, outputs):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        active[0] -= 1
+
+    mocker.patch("pydngconverter.thumbnail.render_pyramid", side_effect=render)
+    dng = pydng.DNGConverter(
+        with_mock_source,
+        max_workers=4,
+        image_workers=1,
+        jpeg_preview=flags.JPEGPreview.EXTRACT,
+    )
+    results = [r async for r in dng.iter_convert()]
+    assert all(len(r.thumbnails) == 1 for r in results)
+    assert peak[0] == 1
+    assert len(threads) == 1
+    assert threads.pop().startswith("pydng-image")
+    assert dng._image_pool is None
+
+
+@pytest.mark.asyncio()
+async def test_convert_resume(with_mock_source, mock_converter, mocker: MockFixture):
+    calls = iter(range(4))
+
+    def fail(sources):
+        if next(calls) == 0:
+            raise OSError("boom")
+
+    mock_converter.side_effect = fake_converter(mocker, fail)
+    dng = pydng.DNGConverter(with_mock_source, max_workers=1, use_journal=True)
+    await dng.convert()
+    assert dng.journal_path.exists()
+    mock_converter.reset_mock()
+    mock_converter.side_effect = fake_converter(mocker)
+    dng = pydng.DNGConverter(with_mock_source, max_workers=1, resume=True)
+    await dng.convert()
+    # only the failed job is redone.
+    assert mock_converter.call_count == 1
+    mock_converter.reset_mock()
+    await dng.convert()
+    mock_converter.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_convert_isolates_failed_batch(with_mock_source, mock_converter, mocker):
+    poison = with_mock_source / "mockfile1.cr2"
+
+    mock_converter.side_effect = fake_converter(mocker, lambda s: 1 if poison in s else 0)
+    dng = pydng.DNGConverter(with_mock_source, batch_size=4, retries=1, retry_backoff=0)
+    results = {r.job.source: r async for r in dng.iter_convert()}
+    # 1 batch, 4 individual conversions, 1 retry of poison file.
+    assert mock_converter.call_count == 6
+    assert isinstance(results[poison].error, process.ProcessError)
+    assert sum(r.ok for r in results.values()) == 3
+
+
+@pytest.mark.skipif(not compat.Platform.get().is_nix, reason="Requires wine.")
+@pytest.mark.asyncio()
+async def test_convert_persistent_wine(with_mock_source, mock_converter, mocker: MockFixture):
+    server = mocker.patch("pydngconverter.compat.WineServer").return_value
+    server.running = True
+    server.env = {"WINEPREFIX": "/prefix"}
+    async with pydng.DNGConverter(with_mock_source, persistent_wine=True) as dng:
+        server.start.assert_not_called()
+        await dng.convert()
+        server.start.assert_called_once()
+        server.stop.assert_called_once()
+    assert server.stop.call_count == 2
+    assert all(c.kwargs["env"] == server.env for c in mock_converter.call_args_list)
+
+
+@pytest.mark.asyncio()
+async def test_convert_retries_invalid_output(with_mock_source, mock_converter, mocker):
+    target = with_mock_source / "mockfile2.cr2"
+    attempts = []
+
+    def corrupt(source):
+        if source == target:
+            attempts.append(source)
+            return len(attempts) == 1
+        return False
+
+    mock_converter.side_effect = fake_converter(mocker, corrupt=corrupt)
+    dng = pydng.DNGConverter(with_mock_source, batch_size=4, retry_backoff=0)
+    results = [r async for r in dng.iter_convert()]
+    assert all(r.ok for r in results)
+    # batch, then only the invalid output is retried.
+    assert mock_converter.call_count == 2
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio()
+async def test_convert_staged(with_mock_source, mock_converter, tmp_path):
+    scratch = tmp_path / "scratch"
+    dest = tmp_path / "dest"
+    dng = pydng.DNGConverter(with_mock_source, dest=dest, batch_size=2, staging_dir=scratch)
+    results = [r async for r in dng.iter_convert()]
+    assert all(r.ok for r in results)
+    for job in dng.job.jobs:
+        assert job.destination.parent == dest
+        assert job.destination.read_bytes() == make_dng()
+    for call in mock_converter.call_args_list:
+        # converter reads and writes within scratch.
+        assert all(str(scratch) in arg for arg in map(str, call.args[1:]) if arg.startswith("/"))
+    assert not list(scratch.iterdir())
+
+
+@pytest.mark.asyncio()
+async def test_convert_staged_batch_over_capacity(with_mock_source, mock_converter, tmp_path):
+    for path in with_mock_source.iterdir():
+        path.write_bytes(bytes(1000))
+    dng = pydng.DNGConverter(
+        with_mock_source,
+        max_workers=2,
+        batch_size=4,
+        staging_dir=tmp_path / "scratch",
+        staging_capacity=3000,
+    )
+    results = await asyncio.wait_for(dng.convert(), 10)
+    assert len(results) == 4
+    assert mock_converter.call_count == 1
+
+
+@pytest.mark.asyncio()
+async def test_convert_dedup(with_mock_source, mock_converter, tmp_path):
+    for i, content in enumerate([b"a", b"b", b"a", b"a"]):
+        (with_mock_source / f"mockfile{i}.cr2").write_bytes(content * 100)
+    dest = tmp_path / "dest"
+    dng = pydng.DNGConverter(with_mock_source, dest=dest, deduplicate=True)
+    results = [r async for r in dng.iter_convert()]
+    assert mock_converter.call_count == 2
+    assert len(results) == 4
+    assert all(r.ok for r in results)
+    primary = dest / "mockfile0.dng"
+    for i in (2, 3):
+        duplicate = dest / f"mockfile{i}.dng"
+        assert duplicate.read_bytes() == make_dng()
+        assert duplicate.stat().st_ino == primary.stat().st_ino
+    assert dng.fingerprint_cache_path.exists()
+
+
+@pytest.mark.asyncio()
+async def test_iter_watch(with_mock_source, mock_converter):
+    for path in with_mock_source.iterdir():
+        path.write_bytes(path.name.encode())
+    dng = pydng.DNGConverter(with_mock_source)
+    until = asyncio.Event()
+    results = []
+    async for result in dng.iter_watch(
+        debounce=0.05, poll_interval=0.01, backend=watch.WatchBackend.POLL, until=until
+    ):
+        results.append(result)
+        if len(results) == 4:
+            # files arriving while watching are converted as well.
+            (with_mock_source / "card").mkdir()
+            (with_mock_source / "card" / "new.cr2").write_bytes(b"new")
+        if len(results) == 5:
+            until.set()
+    assert all(r.ok for r in results)
+    assert results[-1].destination == with_mock_source / "card" / "new.dng"
+    assert mock_converter.call_count == 5
+
+
+@pytest.mark.asyncio()
+async def test_iter_watch_flushes_manifest(with_mock_source, mock_converter, mocker: MockFixture):
+    mocker.patch("pydngconverter.main.MANIFEST_FLUSH_INTERVAL", 0.01)
+    for path in with_mock_source.iterdir():
+        path.write_bytes(path.name.encode())
+    dng = pydng.DNGConverter(with_mock_source, incremental=True)
+    results = 0
+    watching = dng.iter_watch(debounce=0.05, poll_interval=0.01, backend=watch.WatchBackend.POLL)
+    async for _ in watching:
+        results += 1
+        if results < 4:
+            continue
+        # recorded while still watching, not only once stopped.
+        entries = {}
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if dng.manifest_path.exists():
+                entries = json.loads(dng.manifest_path.read_text())["entries"]
+            if len(entries) == 4:
+                break
+        assert len(entries) == 4
+        break
+
+
+def test_batch_job_multiple_sources(with_mock_source, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "extra.cr2").write_bytes(b"raw")
+    job = DNGBatchJob(
+        source_directory=with_mock_source,
+        # overlapping sources are only converted once.
+        sources=[with_mock_source, other / "extra.cr2", with_mock_source / "mockfile0.cr2"],
+    )
+    assert len(job.jobs) == 5
+    assert job.jobs[4].destination == other / "extra.dng"
+
+
+def test_setup_logging():
+    log = logging.getLogger("pydngconverter")
+    first, second = logging.NullHandler(), logging.NullHandler()
+    try:
+        pydng.setup_logging(handler=first)
+        pydng.setup_logging(logging.DEBUG, handler=second)
+        assert second in log.handlers
+        assert first not in log.handlers
+        assert log.level == logging.DEBUG
+    finally:
+        log.removeHandler(second)
+        log.setLevel(logging.NOTSET)
+
+
+@pytest.mark.asyncio()
+async def test_convert_incremental_failed_reconversion(with_mock_source, mock_converter, mocker):
+    dng = pydng.DNGConverter(with_mock_source, incremental=True, retries=0)
+    await dng.convert()
+    source = dng.job.jobs[0].source
+    source.write_bytes(b"changed")
+
+    def _fail(sources):
+        if source.name in [s.name for s in sources]:
+            raise process.ProcessTimeout("timed out")
+
+    mock_converter.side_effect = fake_converter(mocker, fail=_fail)
+    results = [r async for r in dng.iter_convert()]
+    assert [r.ok for r in results] == [False]
+    # the stale output of the previous run does not make the source current.
+    mock_converter.side_effect = fake_converter(mocker)
+    mock_converter.reset_mock()
+    results = [r async for r in dng.iter_convert()]
+    assert [(r.job.source, r.ok) for r in results] == [(source, True)]
+    assert mock_converter.call_count == 1
+
+
+@pytest.mark.asyncio()
+async def test_convert_colliding_destinations(with_mock_source, mock_converter, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "mockfile0.cr2").write_bytes(b"other")
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    dng = pydng.DNGConverter([with_mock_source, other], dest=dest, lazy_scan=True)
+    results = {r.job.source: r async for r in dng.iter_convert()}
+    # the first source keeps its output, instead of being overwritten.
+    assert results[with_mock_source / "mockfile0.cr2"].ok
+    assert isinstance(results[other / "mockfile0.cr2"].error, FileExistsError)
+    assert mock_converter.call_count == 4
@@ -0,0 +1,104 @@
+"""Scheduler module unit tests."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pytest_mock import MockFixture
+
+from pydngconverter import scheduler
+from pydngconverter.dngconverter import DNGJob
+
+
+@pytest.fixture()
+def mock_psutil(mocker: MockFixture):
+    mock = mocker.patch.object(scheduler, "psutil")
+    mock.cpu_count.return_value = 4
+    mock.getloadavg.return_value = (1.0, 1.0, 1.0)
+    mock.swap_memory.return_value = SimpleNamespace(sout=0)
+
+    def _set(available=0.5, load=1.0, sout=0):
+        mock.virtual_memory.return_value = SimpleNamespace(available=available * 100, total=100)
+        mock.getloadavg.return_value = (load, load, load)
+        mock.swap_memory.return_value = SimpleNamespace(sout=sout)
+
+    _set()
+    return _set
+
+
+def test_sample_shrinks_on_low_memory(mock_psutil):
+    limiter = scheduler.AdaptiveLimiter(1, 8, initial=4)
+    mock_psutil(available=0.05)
+    assert limiter.sample() == 3
+
+
+def test_sample_shrinks_when_swapping(mock_psutil):
+    limiter = scheduler.AdaptiveLimiter(1, 8, initial=4)
+    assert limiter.sample() == 4
+    mock_psutil(sout=4096)
+    assert limiter.sample() == 3
+
+
+def test_sample_grows_when_saturated(mock_psutil):
+    limiter = scheduler.AdaptiveLimiter(1, 8, initial=4)
+    assert limiter.sample() == 4
+    limiter.active = 4
+    assert limiter.sample() == 5
+    # not while system is loaded.
+    mock_psutil(load=8.0)
+    assert limiter.sample() == 4
+    limiter.limit = 8
+    mock_psutil()
+    assert limiter.sample() == 8
+
+
+@pytest.mark.asyncio()
+async def test_limiter_bounds_concurrency():
+    limiter = scheduler.AdaptiveLimiter(1, 4, initial=2)
+    peak = 0
+
+    async def _task():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(_task() for _ in range(6)))
+    assert peak == 2
+    await limiter.set_limit(3)
+    await asyncio.gather(*(_task() for _ in range(6)))
+    assert peak == 3
+
+
+def test_order_jobs(tmp_path):
+    sizes = {"a.cr2": 10, "b.cr2": 300, "c.cr3": 250, "d.cr2": 50}
+    jobs = []
+    for name, size in sizes.items():
+        (tmp_path / name).write_bytes(bytes(size))
+        jobs.append(DNGJob(tmp_path / name))
+    assert scheduler.order_jobs(jobs) == jobs
+    ordered = scheduler.order_jobs(jobs, scheduler.SchedulePolicy.LARGEST_FIRST)
+    assert [j.source.name for j in ordered] == ["c.cr3", "b.cr2", "d.cr2", "a.cr2"]
+
+
+def test_order_jobs_by_destination_root(tmp_path):
+    jobs = []
+    for root, sizes in {"x": [10, 300], "y": [500, 20], "z": [100]}.items():
+        (tmp_path / root).mkdir()
+        for i, size in enumerate(sizes):
+            source = tmp_path / root / f"{i}.cr2"
+            source.write_bytes(bytes(size))
+            jobs.append(DNGJob(source))
+    ordered = scheduler.order_jobs(jobs, scheduler.SchedulePolicy.LARGEST_FIRST)
+    # largest first within each root, without interleaving roots.
+    assert [j.source.stat().st_size for j in ordered] == [500, 20, 300, 10, 100]
+
+
+@pytest.mark.parametrize("kind", list(scheduler.ExecutorKind))
+def test_create_executor(kind):
+    executor = scheduler.create_executor(kind, 2)
+    try:
+        assert executor.submit(pow, 2, 10).result() == 1024
+        assert executor._max_workers == 2
+    finally:
+        executor.shutdown()
@@ -0,0 +1,77 @@
+"""Staging module unit tests."""
+
+import threading
+
+import pytest
+
+from pydngconverter import staging
+from pydngconverter.dngconverter import DNGJob
+
+
+def test_stage_and_commit(tmp_path):
+    source = tmp_path / "src" / "IMG_0001.CR2"
+    source.parent.mkdir()
+    source.write_bytes(b"raw" * 10)
+    job = DNGJob(source, destination_root=tmp_path / "dest")
+    job.destination_root.mkdir()
+    stager = staging.Stager(tmp_path / "scratch", capacity=1024).open()
+    staged = stager.stage(job)
+    assert staged.source.read_bytes() == source.read_bytes()
+    assert stager.used == 30 * staging.RESERVE_FACTOR
+    output = staged.output(job.destination)
+    output.write_bytes(b"dng")
+    stager.commit(output, job.destination)
+    assert job.destination.read_bytes() == b"dng"
+    assert not output.exists()
+    stager.discard(job)
+    assert stager.used == 0
+    assert not staged.source.exists()
+    stager.close()
+    assert not list((tmp_path / "scratch").iterdir())
+
+
+def test_reserve_blocks_at_capacity():
+    stager = staging.Stager("unused", capacity=100)
+    assert stager.reserve(80)
+    stop = threading.Event()
+    reserved = []
+    thread = threading.Thread(target=lambda: reserved.append(stager.reserve(40, stop)))
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive()
+    stager.release(80)
+    thread.join(2)
+    assert reserved == [True]
+    # oversized reservations pass once nothing else is reserved,
+    # and give up when stopped.
+    stop.set()
+    assert not stager.reserve(100, stop)
+    stager.release(40)
+    assert stager.reserve(1000)
+
+
+def test_stage_batch_over_capacity(tmp_path):
+    jobs = []
+    for i in range(3):
+        source = tmp_path / f"IMG_{i}.CR2"
+        source.write_bytes(bytes(100))
+        jobs.append(DNGJob(source))
+    stager = staging.Stager(tmp_path / "scratch", capacity=300).open()
+    # reserved at once, so a batch larger than the capacity is staged on its own.
+    staged = stager.stage_batch(jobs)
+    assert [s.source.name for s in staged] == [j.source.name for j in jobs]
+    assert stager.used == 600
+    stop = threading.Event()
+    stop.set()
+    assert stager.stage_batch(jobs[:1], stop) is None
+    for job in jobs:
+        stager.discard(job)
+    assert stager.used == 0
+    # failed batches release everything reserved for them.
+    jobs[2].source.unlink()
+    jobs.append(DNGJob(tmp_path / "missing.CR2"))
+    with pytest.raises(FileNotFoundError):
+        stager.stage_batch(jobs)
+    assert stager.used == 0
+    assert stager.get(jobs[0]) is None
+    stager.close()
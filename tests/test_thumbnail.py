@@ -0,0 +1,68 @@
+"""Thumbnail module unit tests."""
+
+import pytest
+from pytest_mock import MockFixture
+
+from pydngconverter import thumbnail
+from tests.conftest import make_jpeg
+
+
+@pytest.mark.parametrize(
+    ("options", "expect"),
+    [
+        (thumbnail.ThumbnailOptions(), (600, 400)),
+        (thumbnail.ThumbnailOptions(scale=0.5), (3000, 2000)),
+        (thumbnail.ThumbnailOptions(max_size=300), (300, 200)),
+        (thumbnail.ThumbnailOptions(max_size=10000), (6000, 4000)),
+    ],
+)
+def test_target_size(options, expect):
+    assert options.target_size(6000, 4000) == expect
+
+
+@pytest.mark.parametrize(
+    ("target", "expect"),
+    [((600, 400), 8), ((751, 400), 4), ((1600, 1000), 2), ((3001, 2000), 1)],
+)
+def test_draft_scale(target, expect):
+    assert thumbnail.draft_scale((6000, 4000), target) == expect
+
+
+def test_render_hints_reduced_decode(mocker: MockFixture, tmp_path):
+    image = mocker.MagicMock()
+    image.options = {}
+    image_cls = mocker.patch("pydngconverter.thumbnail.Image")
+    image_cls.return_value.__enter__.return_value = image
+    jpeg = make_jpeg(dimensions=(6000, 4000))
+    options = thumbnail.ThumbnailOptions(max_size=1000, quality=70)
+    thumbnail.render(jpeg, tmp_path / "thumb.jpg", options)
+    assert image.options["jpeg:size"] == "1500x1000"
+    image.read.assert_called_once_with(blob=jpeg)
+    image.resize.assert_called_once_with(1000, 666)
+    assert image.compression_quality == 70
+    image.save.assert_called_once_with(filename=str(tmp_path / "thumb.jpg"))
+
+
+def test_render_pyramid_single_decode(mocker: MockFixture, tmp_path):
+    image = mocker.MagicMock()
+    image.options = {}
+    image_cls = mocker.patch("pydngconverter.thumbnail.Image")
+    image_cls.return_value.__enter__.return_value = image
+    jpeg = make_jpeg(dimensions=(6000, 4000))
+    outputs = [
+        (tmp_path / "grid.jpg", thumbnail.ThumbnailOptions(max_size=256, name="grid")),
+        (tmp_path / "medium.jpg", thumbnail.ThumbnailOptions(max_size=2048, name="medium")),
+        (tmp_path / "preview.jpg", thumbnail.ThumbnailOptions(max_size=1024, name="preview")),
+    ]
+    thumbnail.render_pyramid(jpeg, outputs)
+    image.read.assert_called_once_with(blob=jpeg)
+    assert image.options["jpeg:size"] == "3000x2000"
+    assert image.resize.call_args_list == [
+        mocker.call(2048, 1365),
+        mocker.call(1024, 682),
+        mocker.call(256, 170),
+    ]
+    assert image.save.call_args_list == [
+        mocker.call(filename=str(tmp_path / name))
+        for name in ("medium.jpg", "preview.jpg", "grid.jpg")
+    ]
@@ -0,0 +1,35 @@
+"""Verify module unit tests."""
+
+import pytest
+
+from pydngconverter import verify
+from tests.conftest import make_dng
+
+
+@pytest.mark.parametrize("tiled", [False, True])
+def test_verify_dng(tmp_path, tiled):
+    path = tmp_path / "image.dng"
+    path.write_bytes(make_dng(tiled=tiled))
+    verify.verify_dng(path)
+
+
+@pytest.mark.parametrize(
+    ("data", "match"),
+    [
+        pytest.param(b"", "empty", id="empty"),
+        pytest.param(b"not a dng", "byte order", id="garbage"),
+        pytest.param(make_dng()[:-1], "exceeds file", id="truncated-data"),
+        pytest.param(make_dng()[:20], "truncated ifd", id="truncated-ifd"),
+        pytest.param(make_dng(dng_version=False), "DNGVersion", id="plain-tiff"),
+    ],
+)
+def test_verify_dng_invalid(tmp_path, data, match):
+    path = tmp_path / "image.dng"
+    path.write_bytes(data)
+    with pytest.raises(verify.VerificationError, match=match):
+        verify.verify_dng(path)
+
+
+def test_verify_dng_missing(tmp_path):
+    with pytest.raises(verify.VerificationError, match="unreadable"):
+        verify.verify_dng(tmp_path / "missing.dng")
@@ -0,0 +1,76 @@
+"""Watch module unit tests."""
+
+import threading
+
+import pytest
+
+from pydngconverter import watch
+
+
+def test_debouncer_waits_for_stable_files(tmp_path):
+    path = tmp_path / "IMG_0001.CR2"
+    path.write_bytes(b"raw")
+    empty = tmp_path / "IMG_0002.CR2"
+    empty.touch()
+    debouncer = watch.Debouncer(window=1.0)
+    assert debouncer.update([path, empty], now=0.0) == []
+    # empty files are dropped, a new write restarts the window.
+    assert len(debouncer) == 1
+    path.write_bytes(b"raw" * 2)
+    assert debouncer.update(now=0.9) == []
+    assert debouncer.update(now=1.5) == []
+    assert debouncer.update(now=2.0) == [path]
+    assert len(debouncer) == 0
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        watch.WatchBackend.POLL,
+        pytest.param(
+            watch.WatchBackend.INOTIFY,
+            marks=pytest.mark.skipif(
+                not watch.InotifyWatcher.available(), reason="Requires inotify."
+            ),
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+async def test_watcher_reports_changes(tmp_path, backend):
+    existing = tmp_path / "existing.cr2"
+    existing.write_bytes(b"raw")
+    async with watch.create_watcher(tmp_path, backend, interval=0.01) as watcher:
+        assert await watcher.wait(1.0) == [existing]
+        (tmp_path / "card").mkdir()
+        new = tmp_path / "card" / "new.cr2"
+        new.write_bytes(b"raw")
+        changed = set()
+        for _ in range(20):
+            changed.update(await watcher.wait(0.05))
+            if new in changed:
+                break
+        assert changed == {new}
+        assert await watcher.wait(0.05) == []
+
+
+@pytest.mark.skipif(not watch.InotifyWatcher.available(), reason="Requires inotify.")
+@pytest.mark.asyncio()
+async def test_inotify_overflow_rescans(tmp_path, mocker):
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    async with watch.InotifyWatcher(tmp_path) as watcher:
+        path = nested / "IMG_0001.cr2"
+        path.write_bytes(b"raw")
+        assert await watcher.wait(1.0) == [path]
+        # the tree is rescanned in the executor, not on the event loop.
+        threads = []
+        scan = watch._scan
+        mocker.patch.object(
+            watch,
+            "_scan",
+            side_effect=lambda root: threads.append(threading.get_ident()) or scan(root),
+        )
+        watcher._event(-1, watch.IN_Q_OVERFLOW, b"")
+        assert await watcher.wait(1.0) == [path]
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()